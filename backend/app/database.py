@@ -5,9 +5,16 @@ Povezivanje i inicijalizacija ArangoDB baze podataka - Podrška za više baza po
 
 from arango import ArangoClient
 from arango.database import StandardDatabase
+from fastapi import Header, HTTPException
+from collections import OrderedDict
+from typing import Dict, Optional
 import os
+import threading
 from dotenv import load_dotenv
 
+from app.services.audit_partitions import migrate_legacy_collection
+from app.services.topology_revision import TOPOLOGY_CHANGES_COLLECTION
+
 load_dotenv()
 
 # Konfiguracija
@@ -17,7 +24,27 @@ ARANGO_PASSWORD = os.getenv('ARANGO_PASSWORD', '')  # Prazna lozinka za lokalnu
 GRAPH_NAME = 'network_topology'
 DEVICES_COLLECTION = 'devices'
 CONNECTIONS_COLLECTION = 'connections'
+# Krajevi konekcija (uređaj + port) koji moraju biti jedinstveni
+PORT_INDEX_FIELDS = [['_from', 'src_port'], ['_to', 'dst_port']]
 AUDIT_LOG_COLLECTION = 'audit_log'
+AUDIT_COUNTERS_COLLECTION = 'audit_counters'
+DATABASE_PREFIX = 'netgraph_'
+# Maksimalan broj otvorenih handle-ova baza podataka u pulu (LRU)
+DB_HANDLE_POOL_SIZE = int(os.getenv('DB_HANDLE_POOL_SIZE', '32'))
+# HTTP zaglavlje kojim klijent bira bazu podataka za pojedinačni zahtev
+DATABASE_HEADER = 'X-NetGraph-Database'
+
+
+class DatabaseNotFound(LookupError):
+    """Baza podataka ne postoji na serveru"""
+
+    def __init__(self, db_name: str):
+        self.db_name = db_name
+        super().__init__(f"Database '{db_name}' does not exist")
+
+
+class SchemaInitializationError(RuntimeError):
+    """Kreiranje kolekcija, grafa ili indeksa baze nije uspelo (baza postoji)"""
 
 
 class ArangoDBConnection:
@@ -28,6 +55,10 @@ class ArangoDBConnection:
     _sys_db = None
     _current_db: StandardDatabase = None
     _current_db_name = None
+    _pool: OrderedDict = None
+    _pool_lock = None
+    # Brave inicijalizacije šeme po bazi (samo dok se baza otvara)
+    _init_locks: Dict[str, threading.Lock] = None
     
     def __new__(cls):
         if cls._instance is None:
@@ -37,6 +68,10 @@ class ArangoDBConnection:
     def __init__(self):
         if self._client is None:
             self._connect_client()
+        if self._pool is None:
+            ArangoDBConnection._pool = OrderedDict()
+            ArangoDBConnection._pool_lock = threading.Lock()
+            ArangoDBConnection._init_locks = {}
     
     def _connect_client(self):
         """Uspostavljanje veze sa ArangoDB sistemskom bazom podataka"""
@@ -51,21 +86,27 @@ class ArangoDBConnection:
             raise
     
     def connect_to_database(self, db_name: str):
-        """Povezivanje sa određenom bazom podataka i inicijalizacija šeme"""
+        """
+        Povezivanje sa određenom bazom podataka i inicijalizacija šeme
+        
+        Klijenti biraju bazu po zahtevu (zaglavlje X-NetGraph-Database), pa
+        povezivanje ne menja podrazumevanu bazu drugim klijentima. Podrazumevana
+        baza (za zahteve bez zaglavlja, zajednička za sve takve klijente) se
+        postavlja samo pri prvom povezivanju.
+        """
         try:
             # Provera da li baza podataka postoji
             if not self._sys_db.has_database(db_name):
                 raise Exception(f"Database '{db_name}' does not exist")
             
-            # Povezivanje sa bazom podataka
-            self._current_db = self._client.db(db_name, username=ARANGO_USER, password=ARANGO_PASSWORD)
-            self._current_db_name = db_name
-            
-            # Inicijalizacija kolekcija ako je potrebno
-            self._initialize_schema()
+            # Povezivanje sa bazom podataka (handle iz pula, šema se inicijalizuje pri otvaranju)
+            db = self.get_database(db_name, verify=False)
+            if self._current_db is None:
+                self._current_db = db
+                self._current_db_name = db_name
             
             print(f"Connected to database: {db_name}")
-            return self._current_db
+            return db
         except Exception as e:
             print(f"Failed to connect to database '{db_name}': {e}")
             raise
@@ -110,6 +151,9 @@ class ArangoDBConnection:
             self._sys_db.delete_database(db_name)
             print(f"Database '{db_name}' deleted")
             
+            with self._pool_lock:
+                self._pool.pop(db_name, None)
+            
             # Brisanje trenutne veze ako smo obrisali aktivnu bazu podataka
             if self._current_db_name == db_name:
                 self._current_db = None
@@ -118,6 +162,61 @@ class ArangoDBConnection:
             print(f"Failed to delete database '{db_name}': {e}")
             raise
     
+    def get_database(self, db_name: str, verify: bool = True) -> StandardDatabase:
+        """
+        Dobijanje handle-a baze podataka iz LRU pula
+        
+        Argumenti:
+            db_name: Ime baze podataka
+            verify: Provera postojanja baze pri prvom otvaranju
+            
+        Vraća:
+            StandardDatabase handle (deljen između zahteva za istu bazu)
+            
+        Izuzeci:
+            DatabaseNotFound ako baza ne postoji, SchemaInitializationError ako
+            inicijalizacija šeme ne uspe
+        """
+        with self._pool_lock:
+            db = self._pool.get(db_name)
+            if db is not None:
+                self._pool.move_to_end(db_name)
+                return db
+            init_lock = self._init_locks.setdefault(db_name, threading.Lock())
+        
+        # Šemu inicijalizuje samo prvi zahtev za bazu, istovremeni zahtevi čekaju na njega
+        with init_lock:
+            with self._pool_lock:
+                db = self._pool.get(db_name)
+                if db is not None:
+                    self._pool.move_to_end(db_name)
+                    return db
+            
+            if verify and not self._sys_db.has_database(db_name):
+                self._release_init_lock(db_name, init_lock)
+                raise DatabaseNotFound(db_name)
+            
+            db = self._client.db(db_name, username=ARANGO_USER, password=ARANGO_PASSWORD)
+            try:
+                self._initialize_schema(db)
+            except Exception as e:
+                # Brava ostaje - sledeći pokušaj se i dalje izvršava samo u jednom zahtevu
+                raise SchemaInitializationError(f"Failed to initialize database '{db_name}': {e}") from e
+            
+            with self._pool_lock:
+                self._pool[db_name] = db
+                self._pool.move_to_end(db_name)
+                while len(self._pool) > DB_HANDLE_POOL_SIZE:
+                    self._pool.popitem(last=False)
+            self._release_init_lock(db_name, init_lock)
+            return db
+    
+    def _release_init_lock(self, db_name: str, init_lock: threading.Lock):
+        """Brava inicijalizacije nije potrebna kada je baza u pulu (ili ne postoji)"""
+        with self._pool_lock:
+            if self._init_locks.get(db_name) is init_lock:
+                del self._init_locks[db_name]
+    
     @property
     def db(self):
         """Dobijanje trenutne veze sa bazom podataka"""
@@ -130,14 +229,14 @@ class ArangoDBConnection:
         """Dobijanje imena trenutne baze podataka"""
         return self._current_db_name
     
-    def _initialize_schema(self):
+    def _initialize_schema(self, db: StandardDatabase):
         """Automatsko kreiranje kolekcija, grafa i indeksa ako ne postoje"""
-        if self._current_db is None:
+        if db is None:
             return
         
         # Kreiranje kolekcije čvorova (uređaja)
-        if not self._current_db.has_collection(DEVICES_COLLECTION):
-            devices_col = self._current_db.create_collection(DEVICES_COLLECTION)
+        if not db.has_collection(DEVICES_COLLECTION):
+            devices_col = db.create_collection(DEVICES_COLLECTION)
             print(f"Collection '{DEVICES_COLLECTION}' created")
             
             # Kreiranje indeksa na kolekciji uređaja
@@ -147,8 +246,8 @@ class ArangoDBConnection:
             print(f"Indexes created on '{DEVICES_COLLECTION}'")
         
         # Kreiranje edge kolekcije (konekcija)
-        if not self._current_db.has_collection(CONNECTIONS_COLLECTION):
-            connections_col = self._current_db.create_collection(CONNECTIONS_COLLECTION, edge=True)
+        if not db.has_collection(CONNECTIONS_COLLECTION):
+            connections_col = db.create_collection(CONNECTIONS_COLLECTION, edge=True)
             print(f"Edge collection '{CONNECTIONS_COLLECTION}' created")
             
             # Kreiranje indeksa na konekcijama
@@ -156,21 +255,37 @@ class ArangoDBConnection:
             connections_col.add_hash_index(fields=['status'], unique=False)
             print(f"Indexes created on '{CONNECTIONS_COLLECTION}'")
         
-        # Kreiranje kolekcije za evidenciju revizije (skladište dokumenata za praćenje promena)
-        if not self._current_db.has_collection(AUDIT_LOG_COLLECTION):
-            audit_col = self._current_db.create_collection(AUDIT_LOG_COLLECTION)
-            print(f"Collection '{AUDIT_LOG_COLLECTION}' created")
-            
-            # Kreiranje indeksa na evidenciji revizije
-            audit_col.add_hash_index(fields=['action'], unique=False)
-            audit_col.add_hash_index(fields=['entity_type'], unique=False)
-            audit_col.add_hash_index(fields=['entity_id'], unique=False)
-            audit_col.add_skiplist_index(fields=['timestamp'], unique=False)
-            print(f"Indexes created on '{AUDIT_LOG_COLLECTION}'")
+        # Jedinstveni indeksi krajeva konekcija: jedan kabl po portu, a pretraga porta
+        # (_from/_to + port) ide preko indeksa. Kreiranje je idempotentno pa se primenjuje
+        # i na postojeće baze; ne uspeva ako baza već sadrži dupliran port.
+        connections_col = db.collection(CONNECTIONS_COLLECTION)
+        for fields in PORT_INDEX_FIELDS:
+            try:
+                connections_col.add_persistent_index(fields=fields, unique=True, sparse=True)
+            except Exception as e:
+                print(f"⚠️ Failed to create unique port index {fields} on '{CONNECTIONS_COLLECTION}': {e}")
+        
+        # Evidencija revizije se čuva u mesečnim particijama (audit_log_YYYY_MM) koje se
+        # kreiraju pri upisu; unosi iz stare nepodeljene kolekcije audit_log se premeštaju u njih
+        try:
+            migrate_legacy_collection(db)
+        except Exception as e:
+            print(f"⚠️ Failed to migrate legacy audit log: {e}")
+        
+        # Kolekcija materijalizovanih brojača revizije (statistika bez skeniranja)
+        if not db.has_collection(AUDIT_COUNTERS_COLLECTION):
+            db.create_collection(AUDIT_COUNTERS_COLLECTION)
+            print(f"Collection '{AUDIT_COUNTERS_COLLECTION}' created")
+        
+        # Izmene topologije po reviziji (delta sinhronizacija klijenata)
+        if not db.has_collection(TOPOLOGY_CHANGES_COLLECTION):
+            changes_col = db.create_collection(TOPOLOGY_CHANGES_COLLECTION)
+            changes_col.add_persistent_index(fields=['revision'], unique=True)
+            print(f"Collection '{TOPOLOGY_CHANGES_COLLECTION}' created")
         
         # Kreiranje definicije grafa
-        if not self._current_db.has_graph(GRAPH_NAME):
-            graph = self._current_db.create_graph(GRAPH_NAME)
+        if not db.has_graph(GRAPH_NAME):
+            graph = db.create_graph(GRAPH_NAME)
             
             # Definisanje edge definicije (konekcije povezuju uređaje sa uređajuma)
             graph.create_edge_definition(
@@ -186,22 +301,38 @@ class ArangoDBConnection:
 arango_connection = ArangoDBConnection()
 
 
-def get_db() -> StandardDatabase:
+def get_db(x_netgraph_database: Optional[str] = Header(None)) -> StandardDatabase:
     """
     Injekcija zavisnosti za FastAPI rute
     Upotreba: db: StandardDatabase = Depends(get_db)
+    
+    Baza se bira po zahtevu zaglavljem X-NetGraph-Database, tako da korisnici
+    različitih projekata rade paralelno; bez zaglavlja koristi se podrazumevana
+    baza (prva povezana preko /api/databases/connect), zajednička za sve
+    klijente bez zaglavlja.
     """
-    return arango_connection.db
+    if not x_netgraph_database:
+        return arango_connection.db
+    
+    if not x_netgraph_database.startswith(DATABASE_PREFIX):
+        raise HTTPException(status_code=400, detail=f"Database name must start with '{DATABASE_PREFIX}'")
+    try:
+        return arango_connection.get_database(x_netgraph_database)
+    except DatabaseNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        # Baza postoji ali nije dostupna (server, inicijalizacija šeme) - klijent može da ponovi zahtev
+        raise HTTPException(status_code=503, detail=str(e))
 
 
-def get_devices_collection():
-    """Dobijanje kolekcije uređaja iz trenutne baze podataka"""
-    return arango_connection.db.collection(DEVICES_COLLECTION)
+def get_devices_collection(db: StandardDatabase = None):
+    """Dobijanje kolekcije uređaja iz zadate (ili trenutne) baze podataka"""
+    return (db or arango_connection.db).collection(DEVICES_COLLECTION)
 
 
-def get_connections_collection():
-    """Dobijanje kolekcije konekcija iz trenutne baze podataka"""
-    return arango_connection.db.collection(CONNECTIONS_COLLECTION)
+def get_connections_collection(db: StandardDatabase = None):
+    """Dobijanje kolekcije konekcija iz zadate (ili trenutne) baze podataka"""
+    return (db or arango_connection.db).collection(CONNECTIONS_COLLECTION)
 
 
 def list_databases():
@@ -224,7 +355,13 @@ def connect_to_database(db_name: str):
 
 def delete_database(db_name: str):
     """Brisanje baze podataka"""
-    return arango_connection.delete_database(db_name)
+    from app.services.topology_cache import topology_cache
+    from app.services.audit_partitions import forget_database
+
+    result = arango_connection.delete_database(db_name)
+    topology_cache.invalidate(db_name)
+    forget_database(db_name)
+    return result
 
 
 def get_current_database_name():
@@ -232,13 +369,18 @@ def get_current_database_name():
     return arango_connection.current_database_name
 
 
-def get_audit_log_collection():
-    """Dobijanje kolekcije evidencije revizije"""
-    db = arango_connection.db
-    return db.collection(AUDIT_LOG_COLLECTION)
+def get_audit_log_collection(db: StandardDatabase = None):
+    """Dobijanje stare, nepodeljene kolekcije evidencije revizije (novi unosi idu u mesečne particije)"""
+    return (db or arango_connection.db).collection(AUDIT_LOG_COLLECTION)
+
 
+def _audit_sync(sync: Optional[bool]) -> bool:
+    from app.services.audit_writer import AUDIT_WRITER_MODE
+    return AUDIT_WRITER_MODE == 'sync' if sync is None else sync
 
-def log_audit_event(action: str, entity_type: str, entity_id: str, entity_data: dict, user: str = "system"):
+
+def log_audit_event(action: str, entity_type: str, entity_id: str, entity_data: dict, user: str = "system",
+                    db: StandardDatabase = None, sync: Optional[bool] = None):
     """
     Beleženje događaja revizije u kolekciju evidencije revizije
     
@@ -248,25 +390,44 @@ def log_audit_event(action: str, entity_type: str, entity_id: str, entity_data:
         entity_id: ID ili ključ entiteta
         entity_data: Snimak podataka entiteta
         user: Korisnik koji je izvršio radnju
+        db: Baza podataka zahteva (podrazumevano trenutna baza)
+        sync: True - upis pre povratka (trajnost), False - pozadinski upis u grupama,
+              None - prema AUDIT_WRITER_MODE
     """
-    from datetime import datetime
+    from app.services.audit_writer import make_audit_entry
     
     try:
-        audit_col = get_audit_log_collection()
-        
-        audit_entry = {
-            'action': action,
-            'entity_type': entity_type,
-            'entity_id': entity_id,
-            'entity_data': entity_data,
-            'user': user,
-            'timestamp': datetime.utcnow().isoformat(),
-            'database': arango_connection.current_database_name
-        }
-        
-        result = audit_col.insert(audit_entry)
-        return result
+        db = db or arango_connection.db
+        audit_entry = make_audit_entry(action, entity_type, entity_id, entity_data, db.name, user=user)
+        return log_audit_events([audit_entry], db=db, sync=sync)
     except Exception as e:
         print(f"⚠️ Failed to log audit event: {e}")
         # Ne podiži grešku - beleženje revizije ne bi trebalo da prekine glavne operacije
         return None
+
+
+def log_audit_events(entries: list, db: StandardDatabase = None, sync: Optional[bool] = None):
+    """
+    Masovno beleženje već formiranih audit dokumenata
+    
+    Argumenti:
+        entries: Lista audit dokumenata
+        db: Baza podataka zahteva (podrazumevano trenutna baza)
+        sync: Isto kao kod log_audit_event
+        
+    Vraća:
+        Rezultat insert_many u sinhronom režimu, inače da li su svi događaji prihvaćeni u red
+    """
+    from app.services.audit_writer import audit_writer, write_audit_entries
+    
+    db = db or arango_connection.db
+    if not entries:
+        return None
+    if _audit_sync(sync):
+        return write_audit_entries(db, entries)
+    accepted = audit_writer.submit(db, entries)
+    if not accepted:
+        # Upozorenje po zahtevu (brojač odbačenih je samo u /api/audit-log/stats)
+        kinds = sorted({f"{e.get('action')}/{e.get('entity_type')}" for e in entries})
+        print(f"⚠️ Audit events ({', '.join(kinds)}) for '{db.name}' were dropped, audit queue is full")
+    return accepted
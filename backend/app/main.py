@@ -3,16 +3,33 @@
 FastAPI Glavna Aplikacija - NetGraph Provisioner
 """
 
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel, Field, ValidationError, ConfigDict
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+from typing import List, Dict, Any, Optional, Iterator, Tuple, Callable
+import json
 
-from app.database import get_db, get_devices_collection, get_connections_collection, list_databases, create_database, connect_to_database, get_current_database_name, log_audit_event, get_audit_log_collection
+from app.database import get_db, get_devices_collection, list_databases, create_database, connect_to_database, get_current_database_name, log_audit_events
+from app.services.audit_writer import audit_writer, audit_partition_for, insert_audit_entry, make_audit_entry
+from app.services.audit_counters import read_counters, rebuild_counters
+from app.services.audit_query import fetch_page, decode_cursor, normalize_timestamp, MAX_PAGE_SIZE
+from app.services.audit_partitions import archive_expired
+from app.services.audit_delta import record_topology_version, key_delta, latest_version, reconstruct_topology_keys
 from app.services.graph_service import GraphService
-from app.services.config_generator import generate_config_from_graph
+from app.services.aql import execute_aql
+from app.services.bulk_ingest import dict_validator, parse_body
+from app.services.metrics import MetricsMiddleware, METRICS_ENABLED, metrics_response
+from app.services.responses import FastJSONResponse, CompressionMiddleware, COMPRESSION_ENABLED
+from app.services.slow_queries import slow_query_log, SLOW_QUERY_LOG_SIZE
+from app.services.config_generator import ConfigGenerator, iter_config_from_graph, shutdown_render_pool, render_cache, CONFIG_RENDER_WORKERS
+from app.services.topology_diff import diff_documents, summarize_diff, find_port_conflicts
+from app.services.topology_cache import topology_cache, TopologySnapshot
+from app.services.path_engine import PathEngine
+from app.services.topology_delete import cascade_delete, EntityNotFound
+from app.services.topology_revision import read_revision, bump_revision, read_changes, etag_matches, TOPOLOGY_CHANGES_COLLECTION
+from app.services.transactions import run_in_transaction
+from app.services.timestamps import utc_now
 from arango.database import StandardDatabase
 
 # Inicijalizacija FastAPI aplikacije
@@ -29,8 +46,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# gzip/brotli kompresija većih odgovora (unutar merenja latencije, da se i ona meri)
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Latencija zahteva po ruti (Prometheus, /metrics)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 
 # Pydantic Modeli
 class Port(BaseModel):
@@ -130,6 +156,21 @@ class TopologySave(BaseModel):
     devices: List[DeviceCreate]
     connections: List[ConnectionCreate]
 
+
+# Validator koji telo TopologySave vraća kao rečnike spremne za upis (kompajlira se jednom)
+topology_save_validator = dict_validator(TopologySave)
+
+
+async def topology_save_body(request: Request) -> Dict[str, List[Dict[str, Any]]]:
+    """Telo zahteva za čuvanje topologije - JSON se parsira i validira u jednom prolazu"""
+    return parse_body(await request.body(), request.headers.get('content-type'), TopologySave, topology_save_validator)
+
+
+class BulkDeleteRequest(BaseModel):
+    device_keys: List[str] = []
+    connection_keys: List[str] = []
+    strict: bool = False  # Ako neki ključ ne postoji, ništa se ne briše (404)
+
 class DatabaseCreate(BaseModel):
     name: str
     description: Optional[str] = ""
@@ -138,6 +179,15 @@ class DatabaseCreate(BaseModel):
 class ConfigExportRequest(BaseModel):
     format: str = "cisco"  # cisco, diagram, json
     start_device_key: Optional[str] = None
+    parallel: bool = False  # Paralelno renderovanje uređaja u pulu procesa
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    """Gašenje pozadinskih resursa"""
+    audit_writer.stop()
+    slow_query_log.stop()
+    shutdown_render_pool()
 
 
 # Root endpoint
@@ -146,6 +196,36 @@ def read_root():
     return {"message": "NetGraph Provisioner API", "version": "1.0.0"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Prometheus metrike: latencija ruta i AQL upita po imenu, serverska statistika upita"""
+    body, content_type = metrics_response()
+    # Content-Type već sadrži charset, pa se ne prosleđuje kao media_type
+    return Response(content=body, headers={'Content-Type': content_type})
+
+
+@app.get("/api/debug/slow-queries")
+def get_slow_queries(limit: int = 50, name: Optional[str] = None):
+    """
+    Evidencija sporih AQL upita (uključuje se sa SLOW_QUERY_THRESHOLD_MS)
+    
+    Svaki zapis sadrži upit, trajanje, statistiku kursora i plan izvršavanja:
+    korišćene indekse, kolekcije koje se čitaju punim prolazom i, u režimu
+    'profile', broj dokumenata i vreme po čvoru plana.
+    """
+    limit = max(1, min(limit, SLOW_QUERY_LOG_SIZE))
+    return {
+        **slow_query_log.stats(),
+        "slow_queries": slow_query_log.records(limit, name)
+    }
+
+@app.delete("/api/debug/slow-queries")
+def clear_slow_queries():
+    """Brisanje evidencije sporih upita"""
+    slow_query_log.clear()
+    return {"message": "Slow query log cleared"}
+
+
 # Endpointi za upravljanje bazom podataka
 @app.get("/api/databases")
 def list_all_databases():
@@ -179,7 +259,7 @@ def create_new_database(database: DatabaseCreate):
 
 @app.post("/api/databases/connect")
 def connect_database(database_name: str):
-    """Povezivanje sa određenom bazom podataka"""
+    """Povezivanje sa određenom bazom podataka (klijent je zatim bira zaglavljem X-NetGraph-Database)"""
     try:
         connect_to_database(database_name)
         return {
@@ -190,10 +270,10 @@ def connect_database(database_name: str):
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.get("/api/databases/current")
-def get_current_db():
-    """Dobijanje trenutno povezane baze podataka"""
+def get_current_db(x_netgraph_database: Optional[str] = Header(None)):
+    """Dobijanje baze podataka zahteva (zaglavlje X-NetGraph-Database) ili trenutno povezane baze"""
     try:
-        db_name = get_current_database_name()
+        db_name = x_netgraph_database or get_current_database_name()
         if db_name:
             return {"database": db_name}
         else:
@@ -220,236 +300,330 @@ def health_check(db: StandardDatabase = Depends(get_db)):
 # Operacije sa uređajima
 @app.delete("/api/devices/{device_key}")
 def delete_device(device_key: str, db: StandardDatabase = Depends(get_db)):
-    """Brisanje uređaja i čišćenje konekcija/IP adresa"""
+    """Brisanje uređaja i čišćenje konekcija/IP adresa (jedna transakcija na serveru)"""
     try:
-        devices_col = get_devices_collection()
-        
-        # Prvo provera da li uređaj postoji
-        device = devices_col.get(device_key)
-        if not device:
-            raise HTTPException(status_code=404, detail=f"Device '{device_key}' not found")
-        
-        # 1. Pronalazak svih konekcija ka ovom uređaju
-        query = """
-        FOR e IN connections
-            FILTER e._from == CONCAT('devices/', @key) OR e._to == CONCAT('devices/', @key)
-            RETURN e
-        """
-        cursor = db.aql.execute(query, bind_vars={'key': device_key})
-        connections = [doc for doc in cursor]
-        
-        # 2. Za svaku konekciju, pronalazak SUSEDA i brisanje IP adrese njegovog porta
-        for conn in connections:
-            # Određivanje ID-a suseda i porta suseda
-            is_from = conn['_from'] == f'devices/{device_key}'
-            neighbor_id = conn['_to'] if is_from else conn['_from']
-            neighbor_key = neighbor_id.split('/')[-1]
-            neighbor_port_name = conn['dst_port'] if is_from else conn['src_port']
-            
-            # Dobavljanje susednog uređaja
-            neighbor = devices_col.get(neighbor_key)
-            
-            if neighbor and 'ports' in neighbor:
-                updated_ports = []
-                data_changed = False
-                for p in neighbor['ports']:
-                    if p['name'] == neighbor_port_name and p.get('ip_address'):
-                        # Brisanje IP adrese
-                        p['ip_address'] = ""
-                        p['subnet_mask'] = ""
-                        data_changed = True
-                    updated_ports.append(p)
-                
-                if data_changed:
-                    neighbor['ports'] = updated_ports
-                    devices_col.update(neighbor)
-            
-            # Brisanje same konekcije
-            db.aql.execute("REMOVE @conn IN connections", bind_vars={'conn': conn['_key']})
-
-        # 3. Brisanje samog uređaja
-        devices_col.delete(device_key)
+        # Događaj revizije se upisuje u transakciji brisanja
+        result = cascade_delete(db, device_keys=[device_key], audit=lambda result: {
+            'action': 'delete',
+            'entity_type': 'device',
+            'entity_id': device_key,
+            'entity_data': result['deleted_devices'][0]
+        })
         
-        # Beleženje događaja revizije
-        log_audit_event('delete', 'device', device_key, device)
+        # Dopunjavanje keša topologije umesto ponovnog učitavanja
+        topology_cache.apply_changes(
+            db.name,
+            revision=result['revision'],
+            upsert_devices=result['updated_devices'],
+            remove_devices=[device_key],
+            remove_connections=[conn['_key'] for conn in result['removed_connections']]
+        )
         
         return {"message": "Device and associated connections deleted", "key": device_key}
     
-    except HTTPException:
-        raise
+    except EntityNotFound:
+        raise HTTPException(status_code=404, detail=f"Device '{device_key}' not found")
     except Exception as e:
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/devices/{device_key}/ports/{port_name}/connections")
+def get_port_connections(device_key: str, port_name: str, db: StandardDatabase = Depends(get_db)):
+    """Konekcije na portu uređaja (provera zauzetosti porta preko indeksa)"""
+    try:
+        connections = GraphService(db).find_port_connections(device_key, port_name)
+        return {
+            "device": device_key,
+            "port": port_name,
+            "in_use": len(connections) > 0,
+            "connections": connections
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 
 # Operacije sa konekcijama
 @app.delete("/api/connections/{connection_key}")
 def delete_connection(connection_key: str, db: StandardDatabase = Depends(get_db)):
     """Brisanje konekcije i brisanje IP adresa na oba porta"""
     try:
-        connections_col = get_connections_collection()
-        devices_col = get_devices_collection()
+        # Događaj revizije se upisuje u transakciji brisanja
+        result = cascade_delete(db, connection_keys=[connection_key], audit=lambda result: {
+            'action': 'delete',
+            'entity_type': 'connection',
+            'entity_id': connection_key,
+            'entity_data': result['removed_connections'][0]
+        })
         
-        conn = connections_col.get(connection_key)
-        if not conn:
-            raise HTTPException(status_code=404, detail="Connection not found")
-            
-        # Pomoćna funkcija za brisanje IP adrese porta
-        def clear_device_port(device_id, port_name):
-            key = device_id.split('/')[-1]
-            device = devices_col.get(key)
-            if device and 'ports' in device:
-                updated_ports = []
-                changed = False
-                for p in device['ports']:
-                    if p['name'] == port_name and p.get('ip_address'):
-                        p['ip_address'] = ""
-                        p['subnet_mask'] = ""
-                        changed = True
-                    updated_ports.append(p)
-                if changed:
-                    device['ports'] = updated_ports
-                    devices_col.update(device)
-
-        # Brisanje IP adresa na oba kraja
-        clear_device_port(conn['_from'], conn['src_port'])
-        clear_device_port(conn['_to'], conn['dst_port'])
-
-        # Brisanje konekcije
-        connections_col.delete(connection_key)
-        
-        # Beleženje događaja revizije
-        log_audit_event('delete', 'connection', connection_key, conn)
+        topology_cache.apply_changes(
+            db.name,
+            revision=result['revision'],
+            upsert_devices=result['updated_devices'],
+            remove_connections=[connection_key]
+        )
         
         return {"message": "Connection deleted an IPs cleared", "key": connection_key}
     
+    except EntityNotFound:
+        raise HTTPException(status_code=404, detail="Connection not found")
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+def _bulk_delete_audit(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Zbirni audit unos masovnog brisanja"""
+    deleted_device_keys = [d['_key'] for d in result['deleted_devices']]
+    removed_connection_keys = [c['_key'] for c in result['removed_connections']]
+    return {
+        'action': 'bulk_delete',
+        'entity_type': 'topology',
+        'entity_id': 'bulk_delete',
+        'entity_data': {
+            'device_count': len(deleted_device_keys),
+            'connection_count': len(removed_connection_keys),
+            'device_keys': deleted_device_keys,
+            'connection_keys': removed_connection_keys,
+            'updated_device_keys': [d['_key'] for d in result['updated_devices']]
+        }
+    }
+
+
+# Masovno brisanje uređaja i konekcija
+@app.post("/api/topology/delete")
+def bulk_delete(request: BulkDeleteRequest, db: StandardDatabase = Depends(get_db)):
+    """
+    Brisanje više uređaja (sa njihovim konekcijama) i konekcija u jednoj transakciji
+    
+    IP adrese na portovima preostalih uređaja se brišu u istom prolazu, a u
+    reviziju se upisuje jedan zbirni unos.
+    """
+    if not request.device_keys and not request.connection_keys:
+        raise HTTPException(status_code=400, detail="No device or connection keys given")
+    
+    try:
+        # Jedan zbirni događaj revizije, upisan u transakciji brisanja
+        result = cascade_delete(
+            db,
+            device_keys=request.device_keys,
+            connection_keys=request.connection_keys,
+            strict=request.strict,
+            audit=_bulk_delete_audit
+        )
+    except EntityNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    deleted_device_keys = [d['_key'] for d in result['deleted_devices']]
+    removed_connection_keys = [c['_key'] for c in result['removed_connections']]
+    missing_devices = sorted(set(request.device_keys) - set(deleted_device_keys))
+    missing_connections = sorted(set(request.connection_keys) - set(removed_connection_keys))
+    
+    topology_cache.apply_changes(
+        db.name,
+        revision=result['revision'],
+        upsert_devices=result['updated_devices'],
+        remove_devices=deleted_device_keys,
+        remove_connections=removed_connection_keys
+    )
+    
+    return {
+        "message": "Devices and connections deleted",
+        "devices_deleted": len(deleted_device_keys),
+        "connections_deleted": len(removed_connection_keys),
+        "devices_updated": len(result['updated_devices']),
+        "missing_devices": missing_devices,
+        "missing_connections": missing_connections
+    }
+
+
+def _raise_on_errors(results):
+    """insert_many/replace_many ne podižu grešku za pojedinačne dokumente - prva greška prekida transakciju"""
+    for result in results:
+        if isinstance(result, Exception):
+            raise result
+
+
+def _save_topology_transaction(txn: StandardDatabase, devices_list: List[Dict[str, Any]],
+                               connections_list: List[Dict[str, Any]], current_time: str,
+                               audit_partition: str, db_name: str) -> Dict[str, Any]:
+    """
+    Upis topologije unutar otvorene transakcije (bez potvrde)
+
+    Audit unos masovnog čuvanja (sa verzijom topologije) se upisuje u istoj
+    transakciji, pa verzija ne može da nedostaje u istoriji ako je čuvanje potvrđeno.
+
+    Argumenti:
+        audit_partition: Particija za audit unos (audit_partition_for; u skupu za upis)
+        db_name: Ime baze za audit unos
+
+    Vraća:
+        Rečnik sa 'devices_diff', 'connections_diff' i 'revision'
+    """
+    # Povezivanje kolekcija sa transakcijom
+    devices_col = txn.collection('devices')
+    connections_col = txn.collection('connections')
+
+    # Dobavljanje postojećih ključeva i heševa sadržaja (unutar transakcije radi konzistentnosti)
+    existing_query = """
+    FOR doc IN @@collection
+        RETURN {_key: doc._key, content_hash: doc.content_hash, created_at: doc.created_at}
+    """
+    existing_devices = {
+        doc['_key']: doc for doc in execute_aql(txn, 'save.existing', existing_query, bind_vars={'@collection': 'devices'})
+    }
+    existing_connections = {
+        doc['_key']: doc for doc in execute_aql(txn, 'save.existing', existing_query, bind_vars={'@collection': 'connections'})
+    }
+
+    # Poređenje sa stanjem u bazi - samo stvarne izmene idu u bazu
+    devices_diff = diff_documents(devices_list, existing_devices)
+    connections_diff = diff_documents(connections_list, existing_connections)
+
+    for diff in (devices_diff, connections_diff):
+        for doc in diff['insert']:
+            doc['created_at'] = current_time
+        for doc in diff['update']:
+            doc.setdefault('created_at', current_time)
+            doc['updated_at'] = current_time
+
+    remove_query = "FOR key IN @keys REMOVE key IN @@collection"
+
+    # Izmenjene konekcije se brišu i ponovo unose: jedinstveni indeksi portova se
+    # proveravaju po operaciji, pa bi zamena portova između dve konekcije
+    # (replace jedne po jedne) privremeno prijavila konflikt
+    connections_rewrite = connections_diff['remove'] + [c['_key'] for c in connections_diff['update']]
+
+    # Brisanje uklonjenih entiteta (AQL unutar transakcije)
+    if connections_rewrite:
+        execute_aql(txn, 'save.remove', remove_query, bind_vars={'keys': connections_rewrite, '@collection': 'connections'})
+    if devices_diff['remove']:
+        execute_aql(txn, 'save.remove', remove_query, bind_vars={'keys': devices_diff['remove'], '@collection': 'devices'})
+
+    # Unos novih i zamena izmenjenih dokumenata
+    # Koristimo insert_many koji je stabilniji unutar transakcija od import_bulk
+    if devices_diff['insert']:
+        _raise_on_errors(devices_col.insert_many(devices_diff['insert'], overwrite=True))
+    if devices_diff['update']:
+        _raise_on_errors(devices_col.replace_many(devices_diff['update']))
+
+    if connections_diff['insert'] or connections_diff['update']:
+        _raise_on_errors(connections_col.insert_many(connections_diff['insert'] + connections_diff['update']))
+
+    # Nova verzija topologije za reviziju (delta ključeva ili kontrolna tačka; bez verzije ako se ključevi nisu promenili)
+    # Prethodni skup ključeva je već pročitan za poređenje (existing_*)
+    topology_version = record_topology_version(
+        txn,
+        key_delta(existing_devices, [d['_key'] for d in devices_list]),
+        key_delta(existing_connections, [c['_key'] for c in connections_list])
+    )
+    insert_audit_entry(txn, audit_partition, make_audit_entry('bulk_save', 'topology', 'full_topology', {
+        'device_count': len(devices_list),
+        'connection_count': len(connections_list),
+        **topology_version,
+        'devices_changes': summarize_diff(devices_diff),
+        'connections_changes': summarize_diff(connections_diff)
+    }, db_name, current_time))
+
+    # Nova revizija topologije (ETag) samo ako je nešto stvarno upisano
+    changed_documents = any(
+        diff['insert'] or diff['update'] or diff['remove'] for diff in (devices_diff, connections_diff)
+    )
+    if changed_documents:
+        revision = bump_revision(
+            txn,
+            upserted_devices=[d['_key'] for d in devices_diff['insert'] + devices_diff['update']],
+            removed_devices=devices_diff['remove'],
+            upserted_connections=[c['_key'] for c in connections_diff['insert'] + connections_diff['update']],
+            removed_connections=connections_diff['remove']
+        )
+    else:
+        revision = read_revision(txn).number
+
+    return {
+        'devices_diff': devices_diff,
+        'connections_diff': connections_diff,
+        'revision': revision
+    }
+
+
+def _created_audit_entries(devices_diff: Dict[str, Any], connections_diff: Dict[str, Any],
+                           current_time: str, db_name: str) -> List[Dict[str, Any]]:
+    """Audit dokumenti za novokreirane uređaje i konekcije"""
+    new_audit_entries = []
+
+    # Detekcija novih uređaja
+    for device in devices_diff['insert']:
+        new_audit_entries.append({
+            'action': 'create',
+            'entity_type': 'device',
+            'entity_id': device['_key'],
+            'entity_data': {
+                'hostname': device['hostname'],
+                'type': device['device_type'],
+                'ip': device['ip_address']
+            },
+            'user': 'system',
+            'timestamp': current_time,
+            'database': db_name
+        })
+
+    # Detekcija novih konekcija
+    for conn in connections_diff['insert']:
+        new_audit_entries.append({
+            'action': 'create',
+            'entity_type': 'connection',
+            'entity_id': conn['_key'],
+            'entity_data': {
+                'from_device': conn['_from'].split('/')[-1],
+                'to_device': conn['_to'].split('/')[-1],
+                'src_port': conn['src_port'],
+                'dst_port': conn['dst_port'],
+                'cable_type': conn['cable_type']
+            },
+            'user': 'system',
+            'timestamp': current_time,
+            'database': db_name
+        })
+    return new_audit_entries
+
+
 # Operacije topologije (Masovno čuvanje)
 @app.post("/api/topology/save")
-def save_topology(topology: TopologySave, db: StandardDatabase = Depends(get_db)):
-    """Čuvanje celokupne topologije (uređaji + konekcije) u trenutnu bazu podataka - Transakciono"""
+def save_topology(topology: Dict[str, List[Dict[str, Any]]] = Depends(topology_save_body),
+                  db: StandardDatabase = Depends(get_db)):
+    """Čuvanje celokupne topologije (uređaji + konekcije) u trenutnu bazu podataka - Transakciono i inkrementalno"""
     try:
-        # 0. Dobavljanje postojećih ključeva za detekciju novih entiteta (za audit log)
-        try:
-            cursor_d = db.aql.execute("FOR d IN devices RETURN d._key")
-            existing_device_keys = set([k for k in cursor_d])
-            
-            cursor_c = db.aql.execute("FOR c IN connections RETURN c._key")
-            existing_connection_keys = set([k for k in cursor_c])
-        except Exception:
-            # Ako kolekcije još ne postoje (prvo snimanje), skupovi su prazni
-            existing_device_keys = set()
-            existing_connection_keys = set()
-
         # 1. Priprema podataka za masovni unos
-        devices_list = []
-        for device in topology.devices:
-            d = device.model_dump(by_alias=True)
-            d['created_at'] = datetime.now().isoformat()
-            devices_list.append(d)
-        
-        connections_list = []
-        for connection in topology.connections:
-            c = connection.model_dump(by_alias=True)
-            c['created_at'] = datetime.now().isoformat()
-            connections_list.append(c)
+        devices_list = topology['devices']
+        connections_list = topology['connections']
+        current_time = utc_now()
+
+        # Jedan kabl po portu (u oba smera) - proverava se pre bilo kakvog upisa
+        port_conflicts = find_port_conflicts(connections_list)
+        if port_conflicts:
+            raise HTTPException(status_code=409, detail={
+                "message": "Ports are used by more than one connection",
+                "conflicts": port_conflicts
+            })
 
         # 2. Izvršavanje transakcije na serveru
         # Koristimo Python-Arango Stream Transactions (ne Javascript)
-        txn = db.begin_transaction(write=['devices', 'connections'])
-        try:
-            # Povezivanje kolekcija sa transakcijom
-            devices_col = txn.collection('devices')
-            connections_col = txn.collection('connections')
-            
-            # Brisanje postojećih podataka (AQL unutar transakcije)
-            txn.aql.execute("FOR d IN devices REMOVE d IN devices")
-            txn.aql.execute("FOR c IN connections REMOVE c IN connections")
-            
-            # Unos novih podataka (Bulk Insert)
-            # Koristimo insert_many koji je stabilniji unutar transakcija od import_bulk
-            if devices_list:
-                devices_col.insert_many(devices_list, overwrite=True)
-            
-            if connections_list:
-                connections_col.insert_many(connections_list, overwrite=True)
-                
-            # Potvrda transakcije
-            txn.commit_transaction()
-            
-            # 3. Detekcija i beleženje novokreiranih entiteta (Audit Log)
-            # Ovo radimo nakon uspešne transakcije
-            new_audit_entries = []
-            current_time = datetime.now().isoformat()
-            db_name = get_current_database_name()
-
-            # Detekcija novih uređaja
-            for device in topology.devices:
-                if device.key not in existing_device_keys:
-                    new_audit_entries.append({
-                        'action': 'create',
-                        'entity_type': 'device',
-                        'entity_id': device.key,
-                        'entity_data': {
-                            'hostname': device.hostname,
-                            'type': device.device_type,
-                            'ip': device.ip_address
-                        },
-                        'user': 'system',
-                        'timestamp': current_time,
-                        'database': db_name
-                    })
-
-            # Detekcija novih konekcija
-            for conn in topology.connections:
-                if conn.key not in existing_connection_keys:
-                    new_audit_entries.append({
-                        'action': 'create',
-                        'entity_type': 'connection',
-                        'entity_id': conn.key,
-                        'entity_data': {
-                            'from_device': conn.from_device.split('/')[-1] if '/' in conn.from_device else conn.from_device,
-                            'to_device': conn.to_device.split('/')[-1] if '/' in conn.to_device else conn.to_device,
-                            'src_port': conn.src_port,
-                            'dst_port': conn.dst_port,
-                            'cable_type': conn.cable_type
-                        },
-                        'user': 'system',
-                        'timestamp': current_time,
-                        'database': db_name
-                    })
-            
-            # Masovni unos audit logova ako ih ima
-            if new_audit_entries:
-                try:
-                    audit_col = get_audit_log_collection()
-                    audit_col.import_bulk(new_audit_entries)
-                except Exception as e:
-                    print(f"Failed to save granular audit logs: {e}")
-
-        except Exception as e:
-            # Poništavanje transakcije u slučaju greške
-            txn.abort_transaction()
-            raise e
-        
-        # Beleženje masovnog čuvanja topologije u reviziju (uspešna transakcija)
-        log_audit_event('bulk_save', 'topology', 'full_topology', {
-            'device_count': len(devices_list),
-            'connection_count': len(connections_list),
-            'device_keys': [d['_key'] for d in devices_list],
-            'connection_keys': [c['_key'] for c in connections_list]
-        })
-        
-        return {
-            "message": "Topology saved successfully (Transaction Committed)",
-            "devices_created": len(devices_list),
-            "connections_created": len(connections_list)
-        }
+        # Pri konfliktu sa istovremenim upisom (dokument revizije) transakcija se ponavlja
+        # Audit unos čuvanja se upisuje u istoj transakciji (particija u skupu za upis)
+        audit_partition = audit_partition_for(db, current_time)
+        saved = run_in_transaction(
+            db,
+            ['devices', 'connections', 'audit_counters', TOPOLOGY_CHANGES_COLLECTION, audit_partition],
+            lambda txn: _save_topology_transaction(txn, devices_list, connections_list, current_time,
+                                                   audit_partition, db.name)
+        )
     
+    except HTTPException:
+        raise
     except ValidationError as e:
         import traceback
         traceback.print_exc()
@@ -459,43 +633,215 @@ def save_topology(topology: TopologySave, db: StandardDatabase = Depends(get_db)
         traceback.print_exc()
         raise HTTPException(status_code=400, detail=str(e))
 
+    # 3. Rad posle potvrđene transakcije - greške ovde ne smeju da prijave neuspeh čuvanja
+    topology_cache.invalidate(db.name)
+    devices_diff = saved['devices_diff']
+    connections_diff = saved['connections_diff']
+
+    # Detekcija i beleženje novokreiranih entiteta (Audit Log)
+    audit_complete = True
+    try:
+        # Masovni unos audit logova ako ih ima (pozadinski pisac, u grupama); False - deo je odbačen (pun red)
+        audit_complete = log_audit_events(
+            _created_audit_entries(devices_diff, connections_diff, current_time, db.name), db=db
+        ) is not False
+    except Exception as e:
+        audit_complete = False
+        print(f"⚠️ Failed to save granular audit logs: {e}")
+
+    devices_summary = summarize_diff(devices_diff)
+    connections_summary = summarize_diff(connections_diff)
+
+    unchanged = devices_summary['unchanged'] + connections_summary['unchanged']
+    changed = sum(devices_summary.values()) + sum(connections_summary.values()) - unchanged
+
+    return {
+        "message": "Topology saved successfully (Transaction Committed)",
+        "devices_created": len(devices_list),
+        "connections_created": len(connections_list),
+        "devices": devices_summary,
+        "connections": connections_summary,
+        "changed": changed,
+        "unchanged": unchanged,
+        "revision": saved['revision'],
+        "audit_complete": audit_complete
+    }
+
+
+def _revision_headers(db: StandardDatabase, revision) -> Dict[str, str]:
+    """ETag po reviziji topologije; no-cache - klijent uvek proverava ETag (If-None-Match)"""
+    return {"ETag": revision.etag(db.name), "Cache-Control": "no-cache"}
+
 
 # Endpoint za učitavanje topologije
-@app.get("/api/graph/topology")
-def get_full_topology(start_device_key: Optional[str] = None, db: StandardDatabase = Depends(get_db)):
-    """Dobijanje pune topologije iz trenutne baze podataka"""
+@app.get("/api/graph/topology", response_class=FastJSONResponse)
+def get_full_topology(
+    start_device_key: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: StandardDatabase = Depends(get_db)
+):
+    """Dobijanje pune topologije iz trenutne baze podataka (ETag = revizija topologije)"""
     try:
-        devices_col = get_devices_collection()
-        connections_col = get_connections_collection()
+        # Revizija se čita pre snimka - sadržaj nikad nije stariji od ETag-a
+        revision = read_revision(db)
+        headers = _revision_headers(db, revision)
+        if etag_matches(if_none_match, headers['ETag']):
+            return Response(status_code=304, headers=headers)
         
-        devices = list(devices_col.all())
-        connections = list(connections_col.all())
+        snapshot = topology_cache.get(db, revision.number)
         
-        return {"topology": {"devices": devices, "connections": connections}}
+        devices = list(snapshot.devices.values())
+        connections = list(snapshot.connections.values())
+        
+        return FastJSONResponse({
+            "topology": {"devices": devices, "connections": connections},
+            "revision": revision.number,
+            "epoch": revision.epoch
+        }, headers=headers)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/graph/changes", response_class=FastJSONResponse)
+def get_topology_changes(since: int, epoch: Optional[int] = None, db: StandardDatabase = Depends(get_db)):
+    """
+    Izmene topologije posle zadate revizije (delta sinhronizacija)
+    
+    Query Parametri:
+    - since: Revizija koju klijent ima (revision iz /api/graph/topology ili prethodnog poziva)
+    - epoch: epoch iz istog odgovora (opciono) - razlikuje ponovo kreiranu bazu istog imena
+    
+    Vraća dodate/izmenjene uređaje i konekcije (trenutni dokumenti) i ključeve
+    obrisanih. Ako izmene za traženi opseg nisu sačuvane (revizija starija od
+    TOPOLOGY_CHANGES_RETENTION, druga baza, revizija iz budućnosti), vraća
+    full_reload: true i klijent treba da učita /api/graph/topology.
+    """
+    try:
+        revision = read_revision(db)
+        response = {"database": db.name, "since": since, "revision": revision.number, "epoch": revision.epoch}
+        
+        changes = None
+        if (epoch is None or epoch == revision.epoch) and 0 <= since <= revision.number:
+            changes = read_changes(db, since, revision.number)
+        
+        if changes is None:
+            return FastJSONResponse({**response, "full_reload": True})
+        return FastJSONResponse({**response, "full_reload": False, **changes})
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _stream_topology_chunks(graph_service: GraphService, format: str, batch_size: int):
+    """
+    Generator delova odgovora za strimovanje topologije
+    
+    Argumenti:
+        graph_service: Servis nad bazom iz koje se čita
+        format: 'ndjson' (jedan dokument po liniji) ili 'json' (isti oblik kao /api/graph/topology)
+        batch_size: Broj dokumenata po paketu kursora i po delu odgovora
+    """
+    if format == "json":
+        yield '{"topology": {"devices": ['
+    
+    for section, collection in (("device", "devices"), ("connection", "connections")):
+        if format == "json" and section == "connection":
+            yield '], "connections": ['
+        
+        chunk = []
+        first = True
+        for doc in graph_service.stream_collection(collection, batch_size):
+            if format == "ndjson":
+                chunk.append(json.dumps({"type": section, "data": doc}) + "\n")
+            else:
+                chunk.append(("" if first else ", ") + json.dumps(doc))
+                first = False
+            
+            if len(chunk) >= batch_size:
+                yield "".join(chunk)
+                chunk = []
+        
+        if chunk:
+            yield "".join(chunk)
+    
+    if format == "json":
+        yield ']}}'
+
+
+@app.get("/api/graph/topology/stream")
+def stream_full_topology(format: str = "ndjson", batch_size: int = 1000, db: StandardDatabase = Depends(get_db)):
+    """
+    Strimovanje pune topologije direktno iz serverskih kursora
+    
+    Query Parametri:
+    - format: ndjson (podrazumevano) - linije {"type": "device"|"connection", "data": {...}}
+              json - isti oblik kao /api/graph/topology, šalje se u delovima
+    - batch_size: Veličina paketa kursora (podrazumevano: 1000, max: 10000)
+    """
+    if format not in ("ndjson", "json"):
+        raise HTTPException(status_code=400, detail=f"Unknown format: {format}")
+    
+    batch_size = max(1, min(batch_size, 10000))
+    media_types = {
+        "ndjson": "application/x-ndjson",
+        "json": "application/json"
+    }
+    
+    return StreamingResponse(
+        _stream_topology_chunks(GraphService(db), format, batch_size),
+        media_type=media_types[format]
+    )
+
+
 # Izvoz konfiguracije
+def _iter_export_devices(db: StandardDatabase, format: str,
+                         snapshot: Optional[TopologySnapshot]) -> Tuple[Iterator[Dict], Callable[[Dict], Optional[str]]]:
+    """
+    Izvor uređaja za izvoz: snimak iz keša ako već postoji, inače serverski kursor
+    Za 'diagram' uređaji se vraćaju grupisani po slojevima (ruteri, svičevi, serveri)
+    
+    Argumenti:
+        snapshot: Aktuelan snimak iz keša (topology_cache.peek sa revizijom) ili None
+    
+    Vraća:
+        (iterator uređaja, funkcija ključa sadržaja za keš renderovanja)
+    """
+    if snapshot is not None:
+        def source(device_type=None):
+            return snapshot.iter_port_connection_map(device_type=device_type)
+        
+        def key_func(device):
+            return snapshot.render_key(device['_key'])
+    else:
+        graph_service = GraphService(db)
+        
+        def source(device_type=None):
+            return graph_service.iter_port_connection_map(device_type=device_type, with_render_key=render_cache.enabled)
+        
+        def key_func(device):
+            # Ključ izračunat u AQL-u se uklanja pre renderovanja
+            return device.pop('_render_key', None)
+    
+    if format != "diagram":
+        return source(), key_func
+    
+    def by_layer():
+        for layer, _ in ConfigGenerator.DIAGRAM_LAYERS:
+            yield from source(layer)
+    
+    return by_layer(), key_func
+
+
 @app.post("/api/export/config")
 def export_config(request: ConfigExportRequest, db: StandardDatabase = Depends(get_db)):
     """
     Generisanje konfiguracionog fajla iz topologije
     Podržava: cisco, diagram, json
+    
+    Konfiguracija se strimuje uređaj po uređaj, bez građenja celog teksta u memoriji.
     """
     try:
-        graph_service = GraphService(db)
-        
-        # Dobavljanje podataka topologije
-        devices_data = graph_service.get_port_connection_map()
-        
-        if not devices_data:
-            raise HTTPException(status_code=404, detail="No devices found in topology")
-        
-        # Generisanje konfiguracije u traženom formatu
-        config_content = generate_config_from_graph(devices_data, request.format)
-        
         # Postavljanje odgovarajućeg tipa sadržaja
         content_types = {
             "cisco": "text/plain",
@@ -509,11 +855,25 @@ def export_config(request: ConfigExportRequest, db: StandardDatabase = Depends(g
             "json": "topology.json"
         }
         
-        return Response(
-            content=config_content,
-            media_type=content_types.get(request.format, "text/plain"),
+        if request.format not in content_types:
+            raise ValueError(f"Unknown format: {request.format}")
+        
+        # Snimak iz keša samo ako sadrži trenutnu reviziju (upisi drugih procesa), inače čitanje iz baze
+        snapshot = topology_cache.peek(db.name, read_revision(db).number)
+        device_count = len(snapshot.devices) if snapshot is not None else get_devices_collection(db).count()
+        if not device_count:
+            raise HTTPException(status_code=404, detail="No devices found in topology")
+        
+        # Generisanje konfiguracije u traženom formatu (iz keša ili direktno iz kursora)
+        workers = CONFIG_RENDER_WORKERS if request.parallel else 0
+        devices_data, key_func = _iter_export_devices(db, request.format, snapshot)
+        config_chunks = iter_config_from_graph(devices_data, request.format, workers, key_func)
+        
+        return StreamingResponse(
+            config_chunks,
+            media_type=content_types[request.format],
             headers={
-                "Content-Disposition": f"attachment; filename={filenames.get(request.format, 'config.txt')}"
+                "Content-Disposition": f"attachment; filename={filenames[request.format]}"
             }
         )
     
@@ -523,9 +883,15 @@ def export_config(request: ConfigExportRequest, db: StandardDatabase = Depends(g
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/export/cache")
+def get_export_cache_stats():
+    """Statistika keša renderovanih konfiguracija (pogoci, promašaji, veličina)"""
+    return {"cache": render_cache.stats()}
+
+
 # Mrežna Statistika
-@app.get("/api/statistics/network")
-def get_network_statistics(db: StandardDatabase = Depends(get_db)):
+@app.get("/api/statistics/network", response_class=FastJSONResponse)
+def get_network_statistics(if_none_match: Optional[str] = Header(None), db: StandardDatabase = Depends(get_db)):
     """
     Dobijanje sveobuhvatne statistike mrežne topologije koristeći AQL agregacije
     
@@ -538,20 +904,46 @@ def get_network_statistics(db: StandardDatabase = Depends(get_db)):
     - Najpovezaniji uređaji (top 5)
     - Izolovani uređaji (bez konekcija)
     - Dubina mreže (max skokova)
+    
+    ETag je revizija topologije; If-None-Match sa istom revizijom vraća 304
     """
     try:
-        devices_col = get_devices_collection()
-        connections_col = get_connections_collection()
+        revision = read_revision(db)
+        headers = _revision_headers(db, revision)
+        if etag_matches(if_none_match, headers['ETag']):
+            return Response(status_code=304, headers=headers)
         
         # Složen AQL upit agregacije
         query = """
-        LET total_devices = LENGTH(FOR d IN devices RETURN 1)
-        LET total_connections = LENGTH(FOR c IN connections RETURN 1)
+        LET total_connections = LENGTH(connections)
+        
+        // Stepen povezanosti iz jednog prolaza kroz konekcije (oba kraja svake konekcije)
+        LET degrees = (
+            FOR c IN connections
+                FOR endpoint IN [c._from, c._to]
+                    COLLECT device_id = endpoint WITH COUNT INTO degree
+                    RETURN [device_id, degree]
+        )
+        LET degree_by_id = ZIP(degrees[*][0], degrees[*][1])
+        
+        // Jedan prolaz kroz uređaje; sve agregacije ispod rade nad ovim nizom
+        LET device_rows = (
+            FOR d IN devices
+                RETURN {
+                    device_key: d._key,
+                    hostname: d.hostname,
+                    device_type: d.device_type,
+                    connection_count: degree_by_id[d._id] || 0,
+                    port_count: LENGTH(d.ports || []),
+                    vlan_count: LENGTH(d.vlans || []),
+                    route_count: LENGTH(d.static_routes || [])
+                }
+        )
         
         // Uređaji po tipu
         LET devices_by_type = (
-            FOR d IN devices
-                COLLECT device_type = d.device_type WITH COUNT INTO count
+            FOR dr IN device_rows
+                COLLECT device_type = dr.device_type WITH COUNT INTO count
                 SORT count DESC
                 RETURN {
                     type: device_type,
@@ -570,61 +962,35 @@ def get_network_statistics(db: StandardDatabase = Depends(get_db)):
                 }
         )
         
-        // Stepen povezanosti po uređaju (ulazne + izlazne konekcije)
-        LET device_connections = (
-            FOR d IN devices
-                LET outgoing = LENGTH(
-                    FOR c IN connections
-                        FILTER c._from == d._id
-                        RETURN 1
-                )
-                LET incoming = LENGTH(
-                    FOR c IN connections
-                        FILTER c._to == d._id
-                        RETURN 1
-                )
-                LET total = outgoing + incoming
-                RETURN {
-                    device_key: d._key,
-                    hostname: d.hostname,
-                    device_type: d.device_type,
-                    connection_count: total
-                }
-        )
-        
         // Najpovezaniji uređaji (top 5)
         LET most_connected = (
-            FOR dc IN device_connections
-                SORT dc.connection_count DESC
+            FOR dr IN device_rows
+                SORT dr.connection_count DESC
                 LIMIT 5
-                RETURN dc
+                RETURN KEEP(dr, 'device_key', 'hostname', 'device_type', 'connection_count')
         )
         
         // Izolovani uređaji (bez konekcija)
         LET isolated_devices = (
-            FOR dc IN device_connections
-                FILTER dc.connection_count == 0
+            FOR dr IN device_rows
+                FILTER dr.connection_count == 0
                 RETURN {
-                    key: dc.device_key,
-                    hostname: dc.hostname,
-                    type: dc.device_type
+                    key: dr.device_key,
+                    hostname: dr.hostname,
+                    type: dr.device_type
                 }
         )
         
         // Prosečan broj konekcija po uređaju
-        LET avg_connections = AVG(
-            FOR dc IN device_connections
-                RETURN dc.connection_count
-        )
+        LET avg_connections = AVG(device_rows[*].connection_count)
         
         // Statistika portova
         LET port_stats = (
-            FOR d IN devices
-                LET port_count = LENGTH(d.ports || [])
-                COLLECT device_type = d.device_type
+            FOR dr IN device_rows
+                COLLECT device_type = dr.device_type
                 AGGREGATE 
-                    total_ports = SUM(port_count),
-                    avg_ports = AVG(port_count),
+                    total_ports = SUM(dr.port_count),
+                    avg_ports = AVG(dr.port_count),
                     device_count = LENGTH(1)
                 RETURN {
                     device_type: device_type,
@@ -636,13 +1002,12 @@ def get_network_statistics(db: StandardDatabase = Depends(get_db)):
         
         // VLAN statistika
         LET vlan_stats = (
-            FOR d IN devices
-                FILTER LENGTH(d.vlans || []) > 0
-                LET vlan_count = LENGTH(d.vlans)
-                COLLECT device_type = d.device_type
+            FOR dr IN device_rows
+                FILTER dr.vlan_count > 0
+                COLLECT device_type = dr.device_type
                 AGGREGATE 
                     devices_with_vlans = LENGTH(1),
-                    total_vlans = SUM(vlan_count)
+                    total_vlans = SUM(dr.vlan_count)
                 RETURN {
                     device_type: device_type,
                     devices_with_vlans: devices_with_vlans,
@@ -652,13 +1017,12 @@ def get_network_statistics(db: StandardDatabase = Depends(get_db)):
         
         // Statistika statičkih ruta
         LET route_stats = (
-            FOR d IN devices
-                FILTER LENGTH(d.static_routes || []) > 0
-                LET route_count = LENGTH(d.static_routes)
-                COLLECT device_type = d.device_type
+            FOR dr IN device_rows
+                FILTER dr.route_count > 0
+                COLLECT device_type = dr.device_type
                 AGGREGATE 
                     devices_with_routes = LENGTH(1),
-                    total_routes = SUM(route_count)
+                    total_routes = SUM(dr.route_count)
                 RETURN {
                     device_type: device_type,
                     devices_with_routes: devices_with_routes,
@@ -668,7 +1032,7 @@ def get_network_statistics(db: StandardDatabase = Depends(get_db)):
         
         RETURN {
             overview: {
-                total_devices: total_devices,
+                total_devices: LENGTH(device_rows),
                 total_connections: total_connections,
                 average_connections_per_device: avg_connections,
                 isolated_device_count: LENGTH(isolated_devices)
@@ -683,13 +1047,15 @@ def get_network_statistics(db: StandardDatabase = Depends(get_db)):
         }
         """
         
-        cursor = db.aql.execute(query)
-        stats = next(cursor)
+        # Rezultat se računa jednom po generaciji topologije baze (svaki upis ga poništava)
+        stats = topology_cache.memoize(
+            db.name, 'statistics', lambda: next(execute_aql(db, 'statistics', query)), revision.number
+        )
         
-        return {
+        return FastJSONResponse({
             "statistics": stats,
-            "database": get_current_database_name()
-        }
+            "database": db.name
+        }, headers=headers)
     
     except Exception as e:
         import traceback
@@ -698,150 +1064,78 @@ def get_network_statistics(db: StandardDatabase = Depends(get_db)):
 
 
 # Analiza Mrežnih Putanja
-@app.get("/api/paths/analyze")
+@app.get("/api/paths/analyze", response_class=FastJSONResponse)
 def analyze_paths(
     source_key: str,
     target_key: str,
+    alternatives: int = 5,
     db: StandardDatabase = Depends(get_db)
 ):
     """
-    Pronalazak svih mogućih putanja između dva uređaja sa analizom troškova
+    Pronalazak putanja između dva uređaja sa analizom troškova
     
     Vraća:
     - shortest_path: Putanja sa minimalnim brojem skokova (zelena)
     - cheapest_path: Putanja sa najnižom cenom na osnovu brzine kabla (crvena)
-    - alternative_paths: Druge održive putanje (žuta)
+    - alternative_paths: Druge održive putanje bez petlji (žuta), Yen-ov algoritam
     
-    Računanje troškova:
+    Računanje troškova (podesivo kroz PATH_SPEED_COSTS / PATH_UNKNOWN_SPEED_COST):
     - 10G = 1, 25G = 1, 40G = 1, 100G = 1 (visoka brzina, niska cena)
     - 1G = 5 (standardna cena)
     - 100M = 10 (viša cena)
     - 10M = 20 (najviša cena)
     """
     try:
-        devices_col = get_devices_collection()
+        # Revizija baze: snimak stariji od upisa drugog procesa se ponovo učitava
+        snapshot = topology_cache.get(db, read_revision(db).number)
         
         # Provera da oba uređaja postoje
-        source = devices_col.get(source_key)
-        target = devices_col.get(target_key)
+        source = snapshot.devices.get(source_key)
+        target = snapshot.devices.get(target_key)
         
         if not source:
             raise HTTPException(status_code=404, detail=f"Source device '{source_key}' not found")
         if not target:
             raise HTTPException(status_code=404, detail=f"Target device '{target_key}' not found")
+        if source_key == target_key:
+            raise HTTPException(status_code=400, detail="Source and target devices must be different")
         
-        source_id = f"devices/{source_key}"
-        target_id = f"devices/{target_key}"
+        # Pretraga nad listom susedstva u memoriji (Dijkstra / Yen)
+        engine = PathEngine(snapshot)
+        alternatives = max(0, min(alternatives, 20))
         
-        # Debug: Provera da li konekcije postoje
-        connections_col = get_connections_collection()
-        all_connections = list(connections_col.all())
-        print(f"\n=== PATH ANALYSIS DEBUG ===")
-        print(f"Source: {source_id} ({source.get('hostname')})")
-        print(f"Target: {target_id} ({target.get('hostname')})")
-        print(f"Total connections in DB: {len(all_connections)}")
-        for conn in all_connections:
-            print(f"  {conn['_from']} -> {conn['_to']} (ports: {conn.get('src_port')} -> {conn.get('dst_port')})")
+        shortest = engine.shortest_path(source_key, target_key)
+        cheapest = engine.cheapest_path(source_key, target_key)
         
-        # AQL upit za pronalazak svih putanja sa različitim strategijama
-        query = """
-        LET source_id = @source_id
-        LET target_id = @target_id
-        
-        // Pronalazak SVIH putanja između izvora i cilja (limit dubine za sprečavanje beskonačnih petlji)
-        // Korišćenje ANY umesto OUTBOUND da bi se omogućio dvosmerni prolaz (mrežni kablovi rade u oba smera)
-        LET all_paths = (
-            FOR v, e, p IN 1..10 ANY source_id GRAPH 'network_topology'
-                FILTER v._id == target_id
-                LIMIT 20
-                RETURN {
-                    vertices: p.vertices,
-                    edges: p.edges,
-                    hop_count: LENGTH(p.edges)
-                }
-        )
-        
-        // Računanje troškova za svaku putanju na osnovu brzine kabla
-        LET paths_with_cost = (
-            FOR path IN all_paths
-                LET total_cost = SUM(
-                    FOR edge IN path.edges
-                        LET speed = edge.speed || "1G"
-                        LET cost = (
-                            speed == "10G" OR speed == "25G" OR speed == "40G" OR speed == "100G" ? 1 :
-                            speed == "1G" ? 5 :
-                            speed == "100M" ? 10 :
-                            20
-                        )
-                        RETURN cost
-                )
-                RETURN MERGE(path, {
-                    total_cost: total_cost,
-                    avg_cost: total_cost / path.hop_count
-                })
-        )
+        # Alternativne putanje: sledeće najbolje putanje bez petlji, bez najkraće i najjeftinije
+        ranked = engine.k_shortest_paths(source_key, target_key, alternatives + 2) if shortest else []
+        primary = {p.connections for p in (shortest, cheapest) if p}
+        alternative_paths = [p for p in ranked if p.connections not in primary][:alternatives]
         
-        // Pronalazak najkraće putanje (minimalni broj skokova)
-        LET shortest = (
-            FOR path IN paths_with_cost
-                SORT path.hop_count ASC, path.total_cost ASC
-                LIMIT 1
-                RETURN path
-        )[0]
-        
-        // Pronalazak najjeftinije putanje (minimalna cena)
-        LET cheapest = (
-            FOR path IN paths_with_cost
-                SORT path.total_cost ASC, path.hop_count ASC
-                LIMIT 1
-                RETURN path
-        )[0]
-        
-        // Pronalazak alternativnih putanja (ne najkraćih, ne najjeftinijih, sortiranih po kvalitetu)
-        LET alternatives = (
-            FOR path IN paths_with_cost
-                FILTER path != shortest AND path != cheapest
-                SORT path.hop_count ASC, path.total_cost ASC
-                LIMIT 5
-                RETURN path
-        )
-        
-        RETURN {
-            source: DOCUMENT(source_id),
-            target: DOCUMENT(target_id),
-            shortestPath: shortest,
-            cheapestPath: cheapest,
-            alternativePaths: alternatives,
-            totalPathsFound: LENGTH(all_paths)
-        }
-        """
-        
-        cursor = db.aql.execute(query, bind_vars={
-            'source_id': source_id,
-            'target_id': target_id
-        })
-        
-        result = next(cursor)
+        all_found = primary | {p.connections for p in alternative_paths}
         
         # Formatiranje putanja za frontend
-        def format_path(path_data):
-            if not path_data:
+        def format_path(path):
+            if not path:
                 return None
             
+            vertices = [snapshot.devices[key] for key in path.devices]
+            edges = [snapshot.connections[key] for key in path.connections]
+            
             # Izgradnja mape ključeva uređaja ka hostname-ovima
-            device_map = {v['_key']: v['hostname'] for v in path_data['vertices']}
+            device_map = {v['_key']: v['hostname'] for v in vertices}
             
             return {
-                'hops': path_data['hop_count'],
-                'cost': path_data['total_cost'],
-                'avg_cost': round(path_data['avg_cost'], 2),
+                'hops': path.hops,
+                'cost': path.cost,
+                'avg_cost': round(path.cost / path.hops, 2),
                 'devices': [
                     {
                         'key': v['_key'],
                         'hostname': v['hostname'],
                         'device_type': v['device_type']
                     }
-                    for v in path_data['vertices']
+                    for v in vertices
                 ],
                 'connections': [
                     {
@@ -855,27 +1149,27 @@ def analyze_paths(
                         'speed': e.get('speed', '1G'),
                         'cable_type': e.get('cable_type', 'unknown')
                     }
-                    for e in path_data['edges']
+                    for e in edges
                 ]
             }
         
-        return {
+        return FastJSONResponse({
             'source': {
-                'key': result['source']['_key'],
-                'hostname': result['source']['hostname'],
-                'device_type': result['source']['device_type']
+                'key': source['_key'],
+                'hostname': source['hostname'],
+                'device_type': source['device_type']
             },
             'target': {
-                'key': result['target']['_key'],
-                'hostname': result['target']['hostname'],
-                'device_type': result['target']['device_type']
+                'key': target['_key'],
+                'hostname': target['hostname'],
+                'device_type': target['device_type']
             },
-            'shortest_path': format_path(result['shortestPath']),
-            'cheapest_path': format_path(result['cheapestPath']),
-            'alternative_paths': [format_path(p) for p in result['alternativePaths']],
-            'total_paths_found': result['totalPathsFound'],
-            'database': get_current_database_name()
-        }
+            'shortest_path': format_path(shortest),
+            'cheapest_path': format_path(cheapest),
+            'alternative_paths': [format_path(p) for p in alternative_paths],
+            'total_paths_found': len(all_found),
+            'database': db.name
+        })
     
     except HTTPException:
         raise
@@ -891,48 +1185,47 @@ def get_audit_log(
     limit: int = 100,
     action: Optional[str] = None,
     entity_type: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    cursor: Optional[str] = None,
     db: StandardDatabase = Depends(get_db)
 ):
     """
-    Preuzimanje unosa evidencije revizije sa opcionim filtriranjem
+    Preuzimanje unosa evidencije revizije sa opcionim filtriranjem i straničenjem
     
     Query Parametri:
-    - limit: Maksimalan broj unosa za vraćanje (podrazumevano: 100, max: 1000)
+    - limit: Veličina stranice (podrazumevano: 100, max: 1000)
     - action: Filtriranje po tipu radnje (create, update, delete, bulk_save)
     - entity_type: Filtriranje po tipu entiteta (device, connection, topology)
+    - since / until: Vremenski opseg [since, until) u ISO 8601 formatu
+    - cursor: Vrednost next_cursor iz prethodnog odgovora (sledeća, starija stranica)
     """
     try:
-        audit_col = get_audit_log_collection()
-        
-        # Izgradnja AQL upita sa filterima
-        filters = []
-        bind_vars = {'limit': min(limit, 1000)}
-        
-        if action:
-            filters.append("doc.action == @action")
-            bind_vars['action'] = action
-        
-        if entity_type:
-            filters.append("doc.entity_type == @entity_type")
-            bind_vars['entity_type'] = entity_type
-        
-        filter_clause = " AND ".join(filters) if filters else "true"
-        
-        query = f"""
-        FOR doc IN {audit_col.name}
-            FILTER {filter_clause}
-            SORT doc.timestamp DESC
-            LIMIT @limit
-            RETURN doc
-        """
+        page_size = max(1, min(limit, MAX_PAGE_SIZE))
+        since = normalize_timestamp(since, 'since')
+        until = normalize_timestamp(until, 'until')
+        if cursor is not None:
+            decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        # Događaji koji još čekaju u redu pozadinskog pisca se prvo upisuju
+        audit_writer.flush()
         
-        cursor = db.aql.execute(query, bind_vars=bind_vars)
-        entries = [doc for doc in cursor]
+        # Čitaju se samo mesečne particije koje se preklapaju sa opsegom
+        entries, next_cursor = fetch_page(
+            db, page_size,
+            action=action, entity_type=entity_type,
+            since=since, until=until, cursor=cursor
+        )
         
         return {
             "total": len(entries),
             "entries": entries,
-            "database": get_current_database_name()
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
+            "database": db.name
         }
     
     except Exception as e:
@@ -941,58 +1234,119 @@ def get_audit_log(
 
 @app.get("/api/audit-log/stats")
 def get_audit_log_stats(db: StandardDatabase = Depends(get_db)):
-    """Dobijanje statistike i rezimea evidencije revizije"""
+    """
+    Dobijanje statistike i rezimea evidencije revizije
+    
+    Ukupni brojevi se čitaju iz materijalizovanih brojača (jedan dokument),
+    a poslednje aktivnosti iz najnovije particije - bez skeniranja evidencije.
+    """
     try:
-        audit_col = get_audit_log_collection()
-        
-        # Agregacija statistike koristeći AQL
-        query = """
-        LET total = LENGTH(FOR doc IN @@collection RETURN 1)
-        
-        LET by_action = (
-            FOR doc IN @@collection
-                COLLECT action = doc.action WITH COUNT INTO count
-                RETURN {action: action, count: count}
-        )
+        audit_writer.flush()
+        counters = read_counters(db)
         
-        LET by_entity = (
-            FOR doc IN @@collection
-                COLLECT entity_type = doc.entity_type WITH COUNT INTO count
-                RETURN {entity_type: entity_type, count: count}
-        )
-        
-        LET recent = (
-            FOR doc IN @@collection
-                SORT doc.timestamp DESC
-                LIMIT 10
-                RETURN {
-                    action: doc.action,
-                    entity_type: doc.entity_type,
-                    entity_id: doc.entity_id,
-                    timestamp: doc.timestamp
-                }
-        )
+        latest, _ = fetch_page(db, 10)
+        recent = [
+            {
+                'action': doc.get('action'),
+                'entity_type': doc.get('entity_type'),
+                'entity_id': doc.get('entity_id'),
+                'timestamp': doc.get('timestamp')
+            }
+            for doc in latest
+        ]
         
-        RETURN {
-            total: total,
-            by_action: by_action,
-            by_entity_type: by_entity,
-            recent_activity: recent
+        stats = {
+            'total': counters['total'],
+            'by_action': [
+                {'action': action, 'count': count}
+                for action, count in sorted(counters['by_action'].items())
+            ],
+            'by_entity_type': [
+                {'entity_type': entity_type, 'count': count}
+                for entity_type, count in sorted(counters['by_entity_type'].items())
+            ],
+            'recent_activity': recent
         }
-        """
-        
-        cursor = db.aql.execute(query, bind_vars={'@collection': audit_col.name})
-        stats = next(cursor)
         
         return {
             "statistics": stats,
-            "database": get_current_database_name()
+            "writer": audit_writer.stats(),
+            "database": db.name
         }
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/audit-log/stats/rebuild")
+def rebuild_audit_log_stats(db: StandardDatabase = Depends(get_db)):
+    """Ponovno izračunavanje brojača revizije iz audit particija (popravka odstupanja)"""
+    try:
+        audit_writer.flush()
+        counters = rebuild_counters(db)
+        return {
+            "message": "Audit counters rebuilt",
+            "total": counters['total'],
+            "database": db.name
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/audit-log/topology")
+def get_topology_version(
+    version: Optional[int] = None,
+    at: Optional[str] = None,
+    db: StandardDatabase = Depends(get_db)
+):
+    """
+    Rekonstrukcija skupa ključeva topologije iz istorije masovnih čuvanja
+    
+    Query Parametri:
+    - version: Verzija topologije (redni broj čuvanja)
+    - at: ISO 8601 vreme - verzija poslednjeg čuvanja pre tog trenutka
+    Bez parametara vraća se poslednja verzija.
+    """
+    try:
+        at = normalize_timestamp(at, 'at')
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        audit_writer.flush()
+        if version is None:
+            version = latest_version(db, before=at)
+            if version is None:
+                raise HTTPException(status_code=404, detail="No topology versions recorded")
+        
+        result = reconstruct_topology_keys(db, version)
+        return {**result, "database": db.name}
+    except HTTPException:
+        raise
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/audit-log/archive")
+def archive_audit_log(db: StandardDatabase = Depends(get_db)):
+    """
+    Arhiviranje mesečnih particija starijih od perioda zadržavanja (AUDIT_RETENTION_MONTHS)
+    u kompresovani NDJSON (AUDIT_ARCHIVE_DIR) i njihovo brisanje iz baze
+    """
+    try:
+        audit_writer.flush()
+        archived = archive_expired(db)
+        return {
+            "message": f"Archived {len(archived)} audit partitions",
+            "archived": archived,
+            "database": db.name
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
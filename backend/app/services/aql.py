@@ -0,0 +1,68 @@
+# backend/app/services/aql.py
+"""
+Izvršavanje AQL upita sa merenjem
+Svaki upit ima ime (npr. 'statistics', 'port_map') pod kojim se beleže
+trajanje, broj izvršavanja i serverska statistika kursora; upiti duži od
+praga idu i u evidenciju sporih upita
+"""
+
+import time
+from typing import Dict, Any, Iterator, Optional
+
+from arango.cursor import Cursor
+
+from app.services.metrics import record_aql, record_aql_error
+from app.services.slow_queries import slow_query_log
+
+
+def execute_aql(db, name: str, query: str, bind_vars: Optional[Dict[str, Any]] = None, **kwargs) -> Cursor:
+    """
+    Izvršavanje imenovanog AQL upita (db.aql.execute) uz beleženje metrika
+
+    Za upite koji nisu stream, rezultat i statistika stižu u prvom odgovoru
+    servera, pa se beleže odmah. Stream upiti se čitaju kroz iter_aql.
+
+    Argumenti:
+        db: Baza podataka ili transakcija
+        name: Ime upita u metrikama
+        query: AQL upit
+        bind_vars: Bind parametri
+        kwargs: Ostali argumenti za db.aql.execute (batch_size, stream...)
+
+    Vraća:
+        Kursor rezultata
+    """
+    start = time.perf_counter()
+    try:
+        cursor = db.aql.execute(query, bind_vars=bind_vars, **kwargs)
+    except Exception:
+        record_aql_error(name)
+        raise
+    if not kwargs.get('stream'):
+        elapsed = time.perf_counter() - start
+        record_aql(name, elapsed, cursor.statistics())
+        slow_query_log.observe(db, name, query, bind_vars, elapsed, cursor.statistics())
+    return cursor
+
+
+def iter_aql(db, name: str, query: str, bind_vars: Optional[Dict[str, Any]] = None,
+             batch_size: int = 1000) -> Iterator:
+    """
+    Imenovani AQL upit preko serverskog (stream) kursora
+
+    Trajanje se meri do poslednjeg pročitanog paketa, a statistika kursora
+    stiže sa poslednjim paketom. Kursor se zatvara i kada čitalac prekine ranije.
+    """
+    start = time.perf_counter()
+    cursor = execute_aql(db, name, query, bind_vars, batch_size=batch_size, stream=True)
+    try:
+        for doc in cursor:
+            yield doc
+    except Exception:
+        record_aql_error(name)
+        raise
+    finally:
+        cursor.close(ignore_missing=True)
+        elapsed = time.perf_counter() - start
+        record_aql(name, elapsed, cursor.statistics())
+        slow_query_log.observe(db, name, query, bind_vars, elapsed, cursor.statistics())
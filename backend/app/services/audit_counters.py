@@ -0,0 +1,172 @@
+# backend/app/services/audit_counters.py
+"""
+Materijalizovani brojači evidencije revizije
+Jedan dokument po bazi sa ukupnim brojem događaja i brojevima po radnji i tipu
+entiteta; ažurira se u istoj transakciji kao i upis audit događaja, a umanjuje
+pri arhiviranju mesečne particije
+
+Ponovno izračunavanje (npr. posle ručnih izmena u audit_log):
+    python -m app.services.audit_counters netgraph_<ime>
+"""
+
+import sys
+from collections import Counter
+from typing import List, Dict, Any
+
+from arango.database import StandardDatabase
+
+from app.services.aql import execute_aql
+
+AUDIT_COUNTERS_COLLECTION = 'audit_counters'
+COUNTERS_KEY = 'totals'
+
+# Dodavanje delte postojećim brojačima (UPSERT kreira dokument pri prvom upisu)
+INCREMENT_QUERY = """
+UPSERT { _key: @key }
+    INSERT { _key: @key, total: @total, by_action: @by_action, by_entity_type: @by_entity_type }
+    UPDATE {
+        total: OLD.total + @total,
+        by_action: MERGE(OLD.by_action, ZIP(
+            ATTRIBUTES(@by_action),
+            (FOR name IN ATTRIBUTES(@by_action) RETURN (OLD.by_action[name] || 0) + @by_action[name])
+        )),
+        by_entity_type: MERGE(OLD.by_entity_type, ZIP(
+            ATTRIBUTES(@by_entity_type),
+            (FOR name IN ATTRIBUTES(@by_entity_type) RETURN (OLD.by_entity_type[name] || 0) + @by_entity_type[name])
+        ))
+    }
+    IN @@counters
+"""
+
+# Oznake arhiviranja (brojači umanjeni pre brisanja particije) - posle ponovnog računanja ne važe
+CLEAR_ARCHIVE_MARKERS_QUERY = """
+FOR c IN @@counters
+    FILTER STARTS_WITH(c._key, @prefix)
+    REMOVE c IN @@counters
+"""
+
+# Brojanje iz jedne audit kolekcije (pun prolaz, za popravku i arhiviranje)
+REBUILD_QUERY = """
+LET actions = (
+    FOR doc IN @@collection
+        COLLECT action = doc.action WITH COUNT INTO count
+        RETURN [TO_STRING(action), count]
+)
+LET entity_types = (
+    FOR doc IN @@collection
+        COLLECT entity_type = doc.entity_type WITH COUNT INTO count
+        RETURN [TO_STRING(entity_type), count]
+)
+RETURN {
+    total: LENGTH(@@collection),
+    by_action: ZIP(actions[*][0], actions[*][1]),
+    by_entity_type: ZIP(entity_types[*][0], entity_types[*][1])
+}
+"""
+
+
+def _name(value: Any) -> str:
+    # Isto kao TO_STRING u AQL-u (null postaje prazan string)
+    return '' if value is None else str(value)
+
+
+def count_entries(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Delta brojača za grupu audit događaja"""
+    return {
+        'total': len(entries),
+        'by_action': dict(Counter(_name(e.get('action')) for e in entries)),
+        'by_entity_type': dict(Counter(_name(e.get('entity_type')) for e in entries))
+    }
+
+
+def apply_delta(db: StandardDatabase, delta: Dict[str, Any]):
+    """
+    Dodavanje delte brojačima
+
+    Argumenti:
+        db: Baza podataka ili transakcija (TransactionDatabase)
+        delta: Rečnik sa 'total', 'by_action' i 'by_entity_type' (vrednosti mogu biti negativne)
+    """
+    execute_aql(db, 'audit.counters_increment', INCREMENT_QUERY, bind_vars={
+        '@counters': AUDIT_COUNTERS_COLLECTION,
+        'key': COUNTERS_KEY,
+        **delta
+    })
+
+
+def increment_counters(db: StandardDatabase, entries: List[Dict[str, Any]]):
+    """
+    Ažuriranje brojača za upisane događaje
+
+    Argumenti:
+        db: Baza podataka ili transakcija (TransactionDatabase) u kojoj se upisuju događaji
+        entries: Upisani audit dokumenti
+    """
+    apply_delta(db, count_entries(entries))
+
+
+def negate(delta: Dict[str, Any]) -> Dict[str, Any]:
+    """Suprotna delta (za unose koji napuštaju bazu, npr. arhivirana particija)"""
+    return {
+        'total': -delta['total'],
+        'by_action': {name: -count for name, count in delta['by_action'].items()},
+        'by_entity_type': {name: -count for name, count in delta['by_entity_type'].items()}
+    }
+
+
+def collection_counts(db: StandardDatabase, collection: str) -> Dict[str, Any]:
+    """Brojevi unosa jedne audit kolekcije (pun prolaz kroz tu kolekciju)"""
+    return next(execute_aql(db, 'audit.counters_rebuild', REBUILD_QUERY, bind_vars={'@collection': collection}))
+
+
+def rebuild_counters(db: StandardDatabase) -> Dict[str, Any]:
+    """
+    Ponovno izračunavanje brojača iz svih audit kolekcija (ispravljanje odstupanja)
+
+    Vraća:
+        Novi dokument brojača
+    """
+    from app.services.audit_partitions import list_partitions, LEGACY_AUDIT_COLLECTION, ARCHIVE_MARKER_PREFIX
+
+    collections = list_partitions(db)
+    if db.has_collection(LEGACY_AUDIT_COLLECTION):
+        collections.append(LEGACY_AUDIT_COLLECTION)
+
+    counters = {'total': 0, 'by_action': Counter(), 'by_entity_type': Counter()}
+    for collection in collections:
+        counts = collection_counts(db, collection)
+        counters['total'] += counts['total']
+        counters['by_action'].update(counts['by_action'])
+        counters['by_entity_type'].update(counts['by_entity_type'])
+
+    counters = {
+        'total': counters['total'],
+        'by_action': dict(counters['by_action']),
+        'by_entity_type': dict(counters['by_entity_type'])
+    }
+    counters_col = db.collection(AUDIT_COUNTERS_COLLECTION)
+    counters_col.insert({'_key': COUNTERS_KEY, **counters}, overwrite=True)
+    execute_aql(db, 'audit.counters_clear_markers', CLEAR_ARCHIVE_MARKERS_QUERY, bind_vars={
+        '@counters': AUDIT_COUNTERS_COLLECTION,
+        'prefix': ARCHIVE_MARKER_PREFIX
+    })
+    return counters
+
+
+def read_counters(db: StandardDatabase) -> Dict[str, Any]:
+    """Čitanje brojača (jedan dokument po ključu); ako ne postoje, prave se iz audit kolekcija"""
+    counters = db.collection(AUDIT_COUNTERS_COLLECTION).get(COUNTERS_KEY)
+    if counters is None:
+        counters = rebuild_counters(db)
+    return counters
+
+
+if __name__ == "__main__":
+    from app.database import arango_connection
+
+    if len(sys.argv) != 2:
+        print("Usage: python -m app.services.audit_counters <database_name>")
+        sys.exit(1)
+
+    result = rebuild_counters(arango_connection.get_database(sys.argv[1]))
+    print(f"Audit counters rebuilt: {result}")
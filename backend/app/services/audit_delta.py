@@ -0,0 +1,179 @@
+# backend/app/services/audit_delta.py
+"""
+Delta zapis izmena skupa ključeva topologije u evidenciji revizije
+Umesto punih lista ključeva, svaki upis koji dodaje ili uklanja uređaje ili
+konekcije (bulk_save, delete, bulk_delete) nosi verziju topologije i samo
+dodate i uklonjene ključeve; pune liste (kontrolne tačke) se upisuju svakih
+AUDIT_CHECKPOINT_INTERVAL verzija. Delta se izvodi iz stanja kolekcija u
+transakciji upisa, a audit unos sa verzijom se upisuje u istoj transakciji,
+tako da u istoriji ne može da nedostaje verzija.
+"""
+
+import os
+from typing import List, Dict, Any, Iterable, Optional
+
+from arango.database import StandardDatabase
+
+from app.services.aql import execute_aql
+from app.services.audit_counters import AUDIT_COUNTERS_COLLECTION
+from app.services.audit_partitions import list_partitions
+
+# Svaka N-ta verzija topologije se beleži kao puna kontrolna tačka
+AUDIT_CHECKPOINT_INTERVAL = int(os.getenv('AUDIT_CHECKPOINT_INTERVAL', '20'))
+# Dokument sa brojem poslednje verzije topologije (samo broj, bez ključeva)
+TOPOLOGY_STATE_KEY = 'topology_keys'
+# Radnje čiji audit unosi nose verziju topologije
+TOPOLOGY_VERSION_ACTIONS = ['bulk_save', 'delete', 'bulk_delete']
+
+KEYS_QUERY = "FOR doc IN @@collection RETURN doc._key"
+
+
+def key_delta(previous: Iterable[str], current: Iterable[str]) -> Dict[str, List[str]]:
+    """Dodati i uklonjeni ključevi između dva skupa"""
+    previous = set(previous)
+    current = set(current)
+    return {'added': sorted(current - previous), 'removed': sorted(previous - current)}
+
+
+def removed_keys(keys: Iterable[str]) -> Dict[str, List[str]]:
+    """Delta u kojoj su ključevi samo uklonjeni (brisanje)"""
+    return {'added': [], 'removed': sorted(set(keys))}
+
+
+def apply_key_delta(keys: set, delta: Dict[str, List[str]]) -> set:
+    return (keys - set(delta['removed'])) | set(delta['added'])
+
+
+def _current_keys(txn: StandardDatabase, collection: str) -> List[str]:
+    return sorted(execute_aql(txn, 'audit.topology_keys', KEYS_QUERY, bind_vars={'@collection': collection}))
+
+
+def record_topology_version(txn: StandardDatabase, devices: Dict[str, List[str]], connections: Dict[str, List[str]],
+                            interval: int = AUDIT_CHECKPOINT_INTERVAL) -> Dict[str, Any]:
+    """
+    Sledeća verzija topologije i njen zapis za audit unos upisa
+
+    Poziva se unutar transakcije upisa, posle izmena kolekcija, a vraćena polja
+    idu u entity_data audit unosa koji se upisuje u istoj transakciji. Upis koji
+    ne menja skup ključeva ne pravi novu verziju. Stanje sadrži samo broj
+    verzije; pune liste ključeva za kontrolnu tačku se čitaju iz kolekcija.
+
+    Argumenti:
+        txn: Transakcija upisa (mora imati audit_counters u skupu za upis)
+        devices, connections: Dodati i uklonjeni ključevi ({'added', 'removed'}, key_delta)
+        interval: Razmak između kontrolnih tačaka
+
+    Vraća:
+        Polja za entity_data: 'version', 'snapshot' ('checkpoint' ili 'delta') i
+        pune liste ključeva odnosno delte 'devices' / 'connections'; prazan rečnik
+        ako se skup ključeva nije promenio (unos bez verzije)
+    """
+    state_col = txn.collection(AUDIT_COUNTERS_COLLECTION)
+    state = state_col.get(TOPOLOGY_STATE_KEY)
+
+    if state is not None and not any(devices.values()) and not any(connections.values()):
+        return {}
+
+    version = state['version'] + 1 if state else 1
+
+    if state is None or interval <= 1 or (version - 1) % interval == 0:
+        data = {
+            'version': version,
+            'snapshot': 'checkpoint',
+            'device_keys': _current_keys(txn, 'devices'),
+            'connection_keys': _current_keys(txn, 'connections')
+        }
+    else:
+        data = {
+            'version': version,
+            'snapshot': 'delta',
+            'devices': devices,
+            'connections': connections
+        }
+
+    state_col.insert({'_key': TOPOLOGY_STATE_KEY, 'version': version}, overwrite=True)
+    return data
+
+
+def _versioned_entries(db: StandardDatabase, filter_clause: str, bind_vars: Dict[str, Any], sort: str, limit: Optional[int]):
+    """Audit unosi sa verzijom topologije iz svih particija (od najnovije), sa dodatnim filterom"""
+    limit_clause = "LIMIT @limit" if limit is not None else ""
+    query = f"""
+        FOR doc IN @@collection
+            FILTER doc.action IN @actions AND doc.entity_data.version != null
+            FILTER {filter_clause}
+            SORT doc.entity_data.version {sort}
+            {limit_clause}
+            RETURN doc
+    """
+    entries = []
+    for partition in list_partitions(db):
+        params = {**bind_vars, '@collection': partition, 'actions': TOPOLOGY_VERSION_ACTIONS}
+        if limit is not None:
+            params['limit'] = limit - len(entries)
+        entries.extend(execute_aql(db, 'audit.topology_versions', query, bind_vars=params))
+        if limit is not None and len(entries) >= limit:
+            break
+    return entries
+
+
+def latest_version(db: StandardDatabase, before: Optional[str] = None) -> Optional[int]:
+    """Poslednja zabeležena verzija topologije (opciono samo pre zadatog ISO vremena)"""
+    if before is None:
+        found = _versioned_entries(db, "true", {}, 'DESC', 1)
+    else:
+        found = _versioned_entries(db, "doc.timestamp < @before", {'before': before}, 'DESC', 1)
+    return found[0]['entity_data']['version'] if found else None
+
+
+def reconstruct_topology_keys(db: StandardDatabase, version: int) -> Dict[str, Any]:
+    """
+    Rekonstrukcija skupa ključeva topologije za zadatu verziju
+
+    Polazi od poslednje kontrolne tačke pre verzije i primenjuje delte redom.
+
+    Izuzeci:
+        LookupError ako kontrolna tačka ili neka od delti nedostaje
+        (npr. arhivirana particija ili odbačen audit događaj)
+    """
+    checkpoint = _versioned_entries(
+        db, "doc.entity_data.snapshot == 'checkpoint' AND doc.entity_data.version <= @version",
+        {'version': version}, 'DESC', 1
+    )
+    if not checkpoint:
+        raise LookupError(f"No audit checkpoint found for topology version {version}")
+    checkpoint = checkpoint[0]
+    base_version = checkpoint['entity_data']['version']
+
+    deltas = _versioned_entries(
+        db, "doc.entity_data.version > @base AND doc.entity_data.version <= @version",
+        {'base': base_version, 'version': version}, 'ASC', None
+    )
+    deltas.sort(key=lambda doc: doc['entity_data']['version'])
+
+    device_keys = set(checkpoint['entity_data']['device_keys'])
+    connection_keys = set(checkpoint['entity_data']['connection_keys'])
+    expected = base_version + 1
+    timestamp = checkpoint['timestamp']
+    for doc in deltas:
+        data = doc['entity_data']
+        if data['version'] != expected:
+            raise LookupError(f"Audit history is missing topology version {expected}")
+        if data['snapshot'] == 'checkpoint':
+            device_keys = set(data['device_keys'])
+            connection_keys = set(data['connection_keys'])
+        else:
+            device_keys = apply_key_delta(device_keys, data['devices'])
+            connection_keys = apply_key_delta(connection_keys, data['connections'])
+        timestamp = doc['timestamp']
+        expected += 1
+    if expected != version + 1:
+        raise LookupError(f"Audit history is missing topology version {expected}")
+
+    return {
+        'version': version,
+        'timestamp': timestamp,
+        'checkpoint_version': base_version,
+        'device_keys': sorted(device_keys),
+        'connection_keys': sorted(connection_keys)
+    }
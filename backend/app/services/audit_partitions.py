@@ -0,0 +1,305 @@
+# backend/app/services/audit_partitions.py
+"""
+Vremenska podela evidencije revizije
+Svaki mesec ima svoju kolekciju (audit_log_YYYY_MM); meseci stariji od
+perioda zadržavanja se arhiviraju u kompresovani NDJSON na disku i brišu
+
+Ručno pokretanje arhiviranja:
+    python -m app.services.audit_partitions archive netgraph_<ime>
+"""
+
+import gzip
+import json
+import os
+import re
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional
+
+from arango.database import StandardDatabase
+
+from app.services.aql import execute_aql, iter_aql
+from app.services.timestamps import to_utc
+from app.services.transactions import run_in_transaction
+
+LEGACY_AUDIT_COLLECTION = 'audit_log'
+PARTITION_PREFIX = 'audit_log_'
+PARTITION_PATTERN = re.compile(r'^audit_log_(\d{4})_(\d{2})$')
+
+# Broj meseci koji se čuvaju u bazi (uključujući tekući); 0 isključuje arhiviranje
+AUDIT_RETENTION_MONTHS = int(os.getenv('AUDIT_RETENTION_MONTHS', '12'))
+# Direktorijum za arhivu (jedan poddirektorijum po bazi podataka)
+AUDIT_ARCHIVE_DIR = os.getenv('AUDIT_ARCHIVE_DIR', 'audit_archive')
+
+# Particije za koje je poznato da postoje (izbegava proveru pri svakom upisu)
+_known_partitions = set()
+_known_lock = threading.Lock()
+# Baze čije se particije upravo arhiviraju u pozadini
+_archiving = set()
+_archiving_lock = threading.Lock()
+# Oznaka u audit_counters: brojači su već umanjeni za particiju koja još nije obrisana
+ARCHIVE_MARKER_PREFIX = 'archive_pending_'
+
+
+def _month_partition(month: str) -> str:
+    """Ime mesečne kolekcije za mesec 'YYYY-MM'"""
+    return f"{PARTITION_PREFIX}{month[0:4]}_{month[5:7]}"
+
+
+def partition_for(timestamp: str) -> str:
+    """
+    Ime mesečne kolekcije za ISO vreme, po UTC mesecu
+    ('2025-03-14T10:00:00+00:00' -> 'audit_log_2025_03', '2025-04-01T01:00:00+02:00' -> 'audit_log_2025_03')
+    """
+    try:
+        utc = to_utc(timestamp)
+    except ValueError:
+        # Vreme koje nije ISO 8601 se deli po prefiksu (kao ranije)
+        return _month_partition(timestamp)
+    return f"{PARTITION_PREFIX}{utc.year:04d}_{utc.month:02d}"
+
+
+def partition_bounds(name: str) -> tuple:
+    """
+    Vremenski opseg particije [početak, kraj) kao ISO stringovi (UTC)
+
+    Granice su bez zone: kao prefiks su manje ili jednake svakom vremenu tog
+    trenutka, pa važe i za unose sa '+00:00' i za starije unose bez zone.
+    """
+    year, month = (int(part) for part in PARTITION_PATTERN.match(name).groups())
+    next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return f"{year:04d}-{month:02d}-01T00:00:00", f"{next_year:04d}-{next_month:02d}-01T00:00:00"
+
+
+def list_partitions(db: StandardDatabase) -> List[str]:
+    """Sve mesečne audit kolekcije baze, od najnovije ka najstarijoj"""
+    names = [c['name'] for c in db.collections() if PARTITION_PATTERN.match(c['name'])]
+    return sorted(names, reverse=True)
+
+
+def partitions_for_range(db: StandardDatabase, since: Optional[str] = None, until: Optional[str] = None,
+                         latest: Optional[str] = None) -> List[str]:
+    """
+    Particije koje se preklapaju sa opsegom [since, until), od najnovije ka najstarijoj
+
+    Argumenti:
+        db: Baza podataka
+        since, until: Opcione ISO granice opsega
+        latest: Opciono najkasnije vreme koje se traži (uključivo, npr. vreme iz kursora)
+    """
+    selected = []
+    for name in list_partitions(db):
+        start, end = partition_bounds(name)
+        if until is not None and start >= until:
+            continue
+        if latest is not None and start > latest:
+            continue
+        if since is not None and end <= since:
+            continue
+        selected.append(name)
+    return selected
+
+
+def _create_partition(db: StandardDatabase, name: str):
+    collection = db.create_collection(name)
+    collection.add_hash_index(fields=['action'], unique=False)
+    collection.add_hash_index(fields=['entity_type'], unique=False)
+    collection.add_hash_index(fields=['entity_id'], unique=False)
+    collection.add_persistent_index(fields=['timestamp', '_key'], unique=False)
+    print(f"Audit partition '{name}' created")
+
+
+def ensure_partitions(db: StandardDatabase, names) -> bool:
+    """
+    Kreiranje particija koje još ne postoje
+
+    Vraća:
+        True ako je kreirana bar jedna nova particija (početak novog meseca)
+    """
+    created = False
+    for name in names:
+        with _known_lock:
+            if (db.name, name) in _known_partitions:
+                continue
+        if not db.has_collection(name):
+            try:
+                _create_partition(db, name)
+                created = True
+            except Exception:
+                # Particiju je u međuvremenu mogao da kreira drugi proces
+                if not db.has_collection(name):
+                    raise
+        with _known_lock:
+            _known_partitions.add((db.name, name))
+    return created
+
+
+def forget_database(db_name: str):
+    """Brisanje poznatih particija obrisane baze iz keša"""
+    with _known_lock:
+        for entry in [e for e in _known_partitions if e[0] == db_name]:
+            _known_partitions.discard(entry)
+
+
+def migrate_legacy_collection(db: StandardDatabase):
+    """
+    Premeštanje unosa iz nepodeljene kolekcije audit_log u mesečne particije
+
+    Izvršava se pri otvaranju baze; posle premeštanja audit_log ostaje prazan.
+    Unosi bez vremena ostaju u audit_log.
+    """
+    if not db.has_collection(LEGACY_AUDIT_COLLECTION):
+        return
+    legacy = db.collection(LEGACY_AUDIT_COLLECTION)
+    if legacy.count() == 0:
+        return
+
+    months = list(execute_aql(db, 'audit.migrate_months', """
+        FOR doc IN @@legacy
+            FILTER IS_STRING(doc.timestamp) AND LENGTH(doc.timestamp) >= 7
+            COLLECT month = SUBSTRING(doc.timestamp, 0, 7)
+            RETURN month
+    """, bind_vars={'@legacy': LEGACY_AUDIT_COLLECTION}))
+
+    for month in months:
+        name = _month_partition(month)
+        if not PARTITION_PATTERN.match(name):
+            continue
+        ensure_partitions(db, [name])
+        start, end = partition_bounds(name)
+        txn = db.begin_transaction(write=[LEGACY_AUDIT_COLLECTION, name])
+        try:
+            bind_vars = {'@legacy': LEGACY_AUDIT_COLLECTION, 'start': start, 'end': end}
+            execute_aql(txn, 'audit.migrate_insert', """
+                FOR doc IN @@legacy
+                    FILTER doc.timestamp >= @start AND doc.timestamp < @end
+                    INSERT UNSET(doc, '_id', '_rev') INTO @@partition OPTIONS { overwriteMode: 'ignore' }
+            """, bind_vars={**bind_vars, '@partition': name})
+            execute_aql(txn, 'audit.migrate_remove', """
+                FOR doc IN @@legacy
+                    FILTER doc.timestamp >= @start AND doc.timestamp < @end
+                    REMOVE doc IN @@legacy
+            """, bind_vars=bind_vars)
+            txn.commit_transaction()
+        except Exception:
+            txn.abort_transaction()
+            raise
+    print(f"Migrated legacy audit log of '{db.name}' into {len(months)} monthly partitions")
+
+
+def expired_partitions(db: StandardDatabase, now: Optional[datetime] = None,
+                       retention_months: int = AUDIT_RETENTION_MONTHS) -> List[str]:
+    """Particije starije od perioda zadržavanja"""
+    if retention_months <= 0:
+        return []
+    # Meseci particija su UTC meseci
+    if now is None:
+        now = datetime.now(timezone.utc)
+    elif now.tzinfo is not None:
+        now = now.astimezone(timezone.utc)
+    # Indeks prvog meseca koji se zadržava (tekući mesec je uključen u period)
+    first_kept = now.year * 12 + (now.month - 1) - (retention_months - 1)
+    oldest_kept = _month_partition(f"{first_kept // 12:04d}-{first_kept % 12 + 1:02d}")
+    return [name for name in list_partitions(db) if name < oldest_kept]
+
+
+def archive_partition(db: StandardDatabase, name: str, archive_dir: str = AUDIT_ARCHIVE_DIR) -> Dict[str, Any]:
+    """
+    Izvoz particije u gzip NDJSON i brisanje kolekcije
+
+    Fajl se prvo piše pod privremenim imenom, tako da prekinuto arhiviranje
+    nikad ne ostavi nepotpunu arhivu pod konačnim imenom niti obrisanu particiju.
+
+    Brojači se umanjuju pre brisanja kolekcije, u istoj transakciji u kojoj se
+    upisuje oznaka arhiviranja. Ako se arhiviranje prekine, ponovljeno
+    arhiviranje vidi oznaku i ne umanjuje brojače drugi put; rebuild_counters
+    briše oznake jer brojače računa iz postojećih kolekcija.
+
+    Vraća:
+        Rečnik sa putanjom arhive i brojem arhiviranih unosa
+    """
+    from app.services.audit_counters import AUDIT_COUNTERS_COLLECTION, collection_counts, apply_delta, negate
+
+    directory = os.path.join(archive_dir, db.name)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{name}.ndjson.gz")
+    temp_path = path + '.tmp'
+
+    marker_key = ARCHIVE_MARKER_PREFIX + name
+    counters_col = db.collection(AUDIT_COUNTERS_COLLECTION)
+    if counters_col.get(marker_key) is None:
+        counts = collection_counts(db, name)
+
+        def subtract(txn):
+            apply_delta(txn, negate(counts))
+            txn.collection(AUDIT_COUNTERS_COLLECTION).insert({'_key': marker_key, 'partition': name, 'counts': counts})
+
+        run_in_transaction(db, [AUDIT_COUNTERS_COLLECTION], subtract)
+
+    written = 0
+    documents = iter_aql(
+        db, 'audit.archive',
+        "FOR doc IN @@collection SORT doc.timestamp, doc._key RETURN UNSET(doc, '_id', '_rev')",
+        {'@collection': name}, batch_size=1000
+    )
+    with gzip.open(temp_path, 'wt', encoding='utf-8') as archive:
+        for doc in documents:
+            archive.write(json.dumps(doc, ensure_ascii=False))
+            archive.write('\n')
+            written += 1
+    os.replace(temp_path, path)
+
+    db.delete_collection(name, ignore_missing=True)
+    with _known_lock:
+        _known_partitions.discard((db.name, name))
+    counters_col.delete(marker_key, ignore_missing=True)
+
+    print(f"Audit partition '{name}' archived to {path} ({written} entries)")
+    return {'partition': name, 'path': path, 'entries': written}
+
+
+def archive_expired(db: StandardDatabase, now: Optional[datetime] = None,
+                    retention_months: int = AUDIT_RETENTION_MONTHS,
+                    archive_dir: str = AUDIT_ARCHIVE_DIR) -> List[Dict[str, Any]]:
+    """Arhiviranje svih particija starijih od perioda zadržavanja"""
+    return [
+        archive_partition(db, name, archive_dir)
+        for name in expired_partitions(db, now, retention_months)
+    ]
+
+
+def schedule_archive(db: StandardDatabase):
+    """
+    Arhiviranje isteklih particija u pozadinskoj niti
+
+    Poziva se kada upis otvori novu particiju, tako da izvoz i kompresija starih
+    meseci nikad ne idu na putanji zahteva (sinhroni audit upis). Za istu bazu
+    radi najviše jedno arhiviranje.
+    """
+    with _archiving_lock:
+        if db.name in _archiving:
+            return
+        _archiving.add(db.name)
+
+    def run():
+        try:
+            archive_expired(db)
+        except Exception as e:
+            print(f"⚠️ Failed to archive expired audit partitions of '{db.name}': {e}")
+        finally:
+            with _archiving_lock:
+                _archiving.discard(db.name)
+
+    threading.Thread(target=run, name=f'audit-archive-{db.name}', daemon=True).start()
+
+
+if __name__ == "__main__":
+    from app.database import arango_connection
+
+    if len(sys.argv) != 3 or sys.argv[1] != 'archive':
+        print("Usage: python -m app.services.audit_partitions archive <database_name>")
+        sys.exit(1)
+
+    results = archive_expired(arango_connection.get_database(sys.argv[2]))
+    print(f"Archived {len(results)} partitions")
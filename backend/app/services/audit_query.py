@@ -0,0 +1,165 @@
+# backend/app/services/audit_query.py
+"""
+Upiti nad evidencijom revizije
+Straničenje pomoću kursora (keyset) po paru (timestamp, _key), uz filtere
+po radnji, tipu entiteta i vremenskom opsegu - sve kroz bind parametre.
+Čitaju se samo mesečne particije koje se preklapaju sa traženim opsegom.
+"""
+
+import base64
+import json
+from typing import Dict, Any, Optional, Tuple, List
+
+from arango.database import StandardDatabase
+
+from app.services.aql import execute_aql
+from app.services.audit_partitions import partitions_for_range
+from app.services.timestamps import to_utc
+
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(timestamp: str, key: str) -> str:
+    """Neproziran kursor za sledeću stranicu (poslednji vraćeni unos)"""
+    raw = json.dumps([timestamp, key], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    Dekodiranje kursora
+
+    Vraća:
+        Par (timestamp, _key)
+
+    Izuzeci:
+        ValueError ako kursor nije ispravan
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(value, list) or len(value) != 2 or not all(isinstance(part, str) for part in value):
+        raise ValueError("Invalid cursor")
+    timestamp, key = value
+    return timestamp, key
+
+
+def normalize_timestamp(value: Optional[str], name: str) -> Optional[str]:
+    """
+    Provera ISO 8601 vremena iz upita (since/until/at); vraća ga u UTC-u, u istom
+    formatu kao audit unosi (vreme bez zone se smatra UTC-om)
+    """
+    if value is None:
+        return None
+    try:
+        return to_utc(value).isoformat()
+    except ValueError:
+        raise ValueError(f"Invalid '{name}' timestamp, expected ISO 8601")
+
+
+def build_page_query(
+    collection: str,
+    limit: int,
+    action: Optional[str] = None,
+    entity_type: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    cursor: Optional[str] = None
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Izgradnja AQL upita za jednu stranicu evidencije (najnoviji unosi prvi)
+
+    Tekst upita zavisi samo od toga koji su filteri zadati, a ne od njihovih
+    vrednosti, pa ArangoDB može ponovo da koristi plan. Kursor se pretvara u
+    opseg nad indeksom na timestamp-u (doc.timestamp <= @cursor_ts) uz
+    razrešavanje jednakih vremena po _key, tako da svaka stranica košta isto
+    bez obzira na dubinu.
+
+    Argumenti:
+        collection: Ime audit kolekcije
+        limit: Veličina stranice (upit vraća limit + 1 unos radi detekcije sledeće stranice)
+        action, entity_type: Opcioni filteri
+        since, until: Opcioni vremenski opseg [since, until)
+        cursor: Kursor iz prethodne stranice
+
+    Vraća:
+        Par (upit, bind_vars)
+    """
+    filters = []
+    bind_vars: Dict[str, Any] = {'@collection': collection, 'limit': limit + 1}
+
+    if since is not None:
+        filters.append("doc.timestamp >= @since")
+        bind_vars['since'] = since
+    if until is not None:
+        filters.append("doc.timestamp < @until")
+        bind_vars['until'] = until
+    if cursor is not None:
+        cursor_ts, cursor_key = decode_cursor(cursor)
+        filters.append("doc.timestamp <= @cursor_ts")
+        filters.append("(doc.timestamp < @cursor_ts OR doc._key < @cursor_key)")
+        bind_vars['cursor_ts'] = cursor_ts
+        bind_vars['cursor_key'] = cursor_key
+    if action:
+        filters.append("doc.action == @action")
+        bind_vars['action'] = action
+    if entity_type:
+        filters.append("doc.entity_type == @entity_type")
+        bind_vars['entity_type'] = entity_type
+
+    filter_lines = "".join(f"\n            FILTER {condition}" for condition in filters)
+    query = f"""
+        FOR doc IN @@collection{filter_lines}
+            SORT doc.timestamp DESC, doc._key DESC
+            LIMIT @limit
+            RETURN doc
+        """
+    return query, bind_vars
+
+
+def split_page(entries: list, limit: int) -> Tuple[list, Optional[str]]:
+    """Odsecanje viška unosa i pravljenje kursora za sledeću stranicu"""
+    if len(entries) <= limit:
+        return entries, None
+    page = entries[:limit]
+    last = page[-1]
+    return page, encode_cursor(last['timestamp'], last['_key'])
+
+
+def fetch_page(
+    db: StandardDatabase,
+    limit: int,
+    action: Optional[str] = None,
+    entity_type: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Jedna stranica evidencije preko mesečnih particija
+
+    Particije se čitaju od najnovije ka najstarijoj i samo dok se stranica ne
+    popuni. Pošto particija zavisi od vremena, redosled (timestamp, _key) preko
+    particija ostaje isti kao unutar jedne kolekcije. Kursor dodatno odseca
+    particije novije od poslednjeg vraćenog unosa.
+
+    Vraća:
+        Par (unosi, kursor sledeće stranice ili None)
+    """
+    latest = decode_cursor(cursor)[0] if cursor is not None else None
+
+    entries: List[Dict[str, Any]] = []
+    for partition in partitions_for_range(db, since, until, latest):
+        needed = limit + 1 - len(entries)
+        if needed <= 0:
+            break
+        query, bind_vars = build_page_query(
+            partition, needed - 1,
+            action=action, entity_type=entity_type,
+            since=since, until=until, cursor=cursor
+        )
+        entries.extend(execute_aql(db, 'audit.page', query, bind_vars=bind_vars))
+
+    return split_page(entries, limit)
@@ -0,0 +1,291 @@
+# backend/app/services/audit_writer.py
+"""
+Asinhrono beleženje revizije
+Događaji se stavljaju u red u memoriji procesa, a pozadinska nit ih upisuje
+u grupama (jedna transakcija sa brojačima) kada se skupi dovoljno događaja ili istekne interval
+"""
+
+import os
+import queue
+import threading
+import time
+from typing import List, Dict, Any, Optional
+
+from arango.database import StandardDatabase
+
+from app.services.audit_counters import AUDIT_COUNTERS_COLLECTION, increment_counters
+from app.services.audit_partitions import partition_for, ensure_partitions, schedule_archive
+from app.services.timestamps import utc_now
+from app.services.transactions import run_in_transaction
+
+# Režim beleženja: 'async' (pozadinski upis) ili 'sync' (upis na putanji zahteva)
+AUDIT_WRITER_MODE = os.getenv('AUDIT_WRITER_MODE', 'async').lower()
+# Maksimalan broj događaja u jednom grupnom upisu
+AUDIT_BATCH_SIZE = int(os.getenv('AUDIT_BATCH_SIZE', '500'))
+# Najduže čekanje (u sekundama) pre upisa nepotpune grupe
+AUDIT_FLUSH_INTERVAL = float(os.getenv('AUDIT_FLUSH_INTERVAL', '0.5'))
+# Kapacitet reda; kada je pun, zahtev čeka najviše AUDIT_ENQUEUE_TIMEOUT pa se događaj odbacuje
+AUDIT_QUEUE_SIZE = int(os.getenv('AUDIT_QUEUE_SIZE', '10000'))
+AUDIT_ENQUEUE_TIMEOUT = float(os.getenv('AUDIT_ENQUEUE_TIMEOUT', '0.05'))
+# Najduže čekanje čitalaca evidencije na upis događaja iz reda (flush)
+AUDIT_FLUSH_TIMEOUT = float(os.getenv('AUDIT_FLUSH_TIMEOUT', '5'))
+
+_STOP = object()
+
+
+def group_by_partition(entries: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Raspodela audit događaja po mesečnim particijama (prema 'timestamp')"""
+    by_partition: Dict[str, List[Dict[str, Any]]] = {}
+    for entry in entries:
+        by_partition.setdefault(partition_for(entry['timestamp']), []).append(entry)
+    return by_partition
+
+
+def insert_audit_entries(txn: StandardDatabase, by_partition: Dict[str, List[Dict[str, Any]]]) -> Dict[str, list]:
+    """
+    Upis događaja i ažuriranje brojača unutar otvorene transakcije
+
+    insert_many ne podiže grešku za pojedinačne dokumente, pa brojači rastu
+    samo za stvarno upisane događaje.
+
+    Argumenti:
+        txn: Transakcija (particije i audit_counters u skupu za upis)
+        by_partition: Događaji po particiji (group_by_partition; particije moraju postojati)
+
+    Vraća:
+        Rezultati insert_many po particiji (greška pojedinačnog dokumenta je izuzetak u listi)
+    """
+    result = {}
+    inserted = []
+    for name, partition_entries in by_partition.items():
+        result[name] = txn.collection(name).insert_many(partition_entries)
+        inserted.extend(
+            entry for entry, outcome in zip(partition_entries, result[name])
+            if not isinstance(outcome, Exception)
+        )
+    if inserted:
+        increment_counters(txn, inserted)
+    return result
+
+
+def make_audit_entry(action: str, entity_type: str, entity_id: str, entity_data: dict, db_name: str,
+                     timestamp: Optional[str] = None, user: str = "system") -> Dict[str, Any]:
+    """Audit dokument (vreme u UTC-u, podrazumevano trenutno)"""
+    return {
+        'action': action,
+        'entity_type': entity_type,
+        'entity_id': entity_id,
+        'entity_data': entity_data,
+        'user': user,
+        'timestamp': timestamp or utc_now(),
+        'database': db_name
+    }
+
+
+def audit_partition_for(db: StandardDatabase, timestamp: str) -> str:
+    """
+    Particija za audit unos koji se upisuje u transakciji druge operacije
+
+    Kolekcija mora postojati pre početka transakcije (skup za upis), pa se
+    ovde kreira ako je potrebno.
+    """
+    name = partition_for(timestamp)
+    if ensure_partitions(db, [name]):
+        schedule_archive(db)
+    return name
+
+
+def insert_audit_entry(txn: StandardDatabase, partition: str, entry: Dict[str, Any]):
+    """
+    Upis jednog audit unosa i brojača u transakciji operacije koju beleži
+
+    Izuzeci:
+        Greška upisa dokumenta - poništava celu operaciju
+    """
+    for outcome in insert_audit_entries(txn, {partition: [entry]})[partition]:
+        if isinstance(outcome, Exception):
+            raise outcome
+
+
+def write_audit_entries(db: StandardDatabase, entries: List[Dict[str, Any]]):
+    """
+    Upis audit događaja u mesečne particije i ažuriranje brojača u jednoj transakciji
+
+    Dokument brojača menjaju svi upisi, pa se transakcija pri konfliktu sa
+    istovremenim upisom ponavlja (run_in_transaction). Kada upis otvori novu
+    particiju (prvi događaj u mesecu), particije starije od perioda zadržavanja
+    se arhiviraju u pozadinskoj niti (schedule_archive).
+
+    Argumenti:
+        db: Baza podataka
+        entries: Lista audit dokumenata (svaki sa 'timestamp')
+
+    Vraća:
+        Rezultati insert_many po particiji (greška pojedinačnog dokumenta je izuzetak u listi)
+    """
+    by_partition = group_by_partition(entries)
+    new_partition = ensure_partitions(db, by_partition)
+
+    result = run_in_transaction(
+        db, list(by_partition) + [AUDIT_COUNTERS_COLLECTION],
+        lambda txn: insert_audit_entries(txn, by_partition)
+    )
+
+    errors = failed_results(result)
+    if errors:
+        print(f"⚠️ {len(errors)} of {len(entries)} audit events were not written to '{db.name}': {errors[0]}")
+
+    if new_partition:
+        schedule_archive(db)
+    return result
+
+
+def failed_results(result: Dict[str, list]) -> List[Exception]:
+    """Greške pojedinačnih dokumenata iz rezultata write_audit_entries"""
+    return [outcome for outcomes in result.values() for outcome in outcomes if isinstance(outcome, Exception)]
+
+
+class AuditWriter:
+    """
+    Pozadinski pisac evidencije revizije
+
+    Napomena: događaji u redu se gube ako proces padne pre upisa. Pozivaoci
+    kojima je potrebna garancija trajnosti koriste sinhroni upis (sync=True).
+    """
+
+    def __init__(self, batch_size: int = AUDIT_BATCH_SIZE, flush_interval: float = AUDIT_FLUSH_INTERVAL,
+                 queue_size: int = AUDIT_QUEUE_SIZE, enqueue_timeout: float = AUDIT_ENQUEUE_TIMEOUT):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        # Broj obrađenih događaja (upisanih ili neuspelih) - flush čeka na njega
+        self._processed = 0
+        self._processed_changed = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+        self._counters = {'enqueued': 0, 'written': 0, 'dropped': 0, 'failed': 0, 'batches': 0}
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def _ensure_started(self):
+        # Nit se pokreće lenjo, pri prvom događaju (i ponovo posle stop())
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+                self._thread.start()
+
+    def submit(self, db: StandardDatabase, entries: List[Dict[str, Any]]) -> bool:
+        """
+        Stavljanje događaja u red za upis
+
+        Argumenti:
+            db: Baza podataka u koju se događaji upisuju
+            entries: Lista audit dokumenata
+
+        Vraća:
+            True ako su svi događaji prihvaćeni, False ako je deo odbačen (pun red)
+        """
+        self._ensure_started()
+        accepted = True
+        for entry in entries:
+            try:
+                self._queue.put((db, entry), timeout=self.enqueue_timeout)
+                self._count('enqueued')
+            except queue.Full:
+                self._count('dropped')
+                accepted = False
+        if not accepted:
+            print(f"⚠️ Audit queue full, dropped events (total dropped: {self._counters['dropped']})")
+        return accepted
+
+    def _run(self):
+        while True:
+            batch = []
+            deadline = None
+            stop = False
+            while len(batch) < self.batch_size:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self._queue.task_done()
+                    stop = True
+                    break
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            if batch:
+                self._write(batch)
+                for _ in batch:
+                    self._queue.task_done()
+                with self._processed_changed:
+                    self._processed += len(batch)
+                    self._processed_changed.notify_all()
+            if stop:
+                return
+
+    def _write(self, batch: List[tuple]):
+        """Upis grupe, jedna transakcija po bazi podataka"""
+        by_database: Dict[str, tuple] = {}
+        for db, entry in batch:
+            by_database.setdefault(db.name, (db, []))[1].append(entry)
+
+        for db_name, (db, entries) in by_database.items():
+            try:
+                failed = len(failed_results(write_audit_entries(db, entries)))
+                self._count('written', len(entries) - failed)
+                self._count('failed', failed)
+                self._count('batches')
+            except Exception as e:
+                self._count('failed', len(entries))
+                print(f"⚠️ Failed to write {len(entries)} audit events to '{db_name}': {e}")
+
+    def flush(self, timeout: Optional[float] = AUDIT_FLUSH_TIMEOUT) -> bool:
+        """
+        Čekanje da se upišu događaji stavljeni u red pre poziva
+
+        Događaji koje drugi zahtevi dodaju za vreme čekanja se ne čekaju.
+
+        Argumenti:
+            timeout: Najduže čekanje u sekundama (None - bez ograničenja)
+
+        Vraća:
+            True ako su svi raniji događaji obrađeni (upisani ili neuspeli), False ako je vreme isteklo
+        """
+        with self._processed_changed:
+            target = self._counters['enqueued']
+            if self._processed >= target:
+                return True
+            if self._thread is None or not self._thread.is_alive():
+                return False
+            done = self._processed_changed.wait_for(lambda: self._processed >= target, timeout)
+        if not done:
+            print(f"⚠️ Audit flush timed out after {timeout}s, {self._queue.qsize()} events pending")
+        return done
+
+    def stop(self, timeout: float = 10.0):
+        """Upis preostalih događaja i zaustavljanje niti (poziva se pri gašenju)"""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+        if thread.is_alive():
+            print(f"⚠️ Audit writer did not finish within {timeout}s, {self._queue.qsize()} events pending")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        counters['queued'] = self._queue.qsize()
+        counters['mode'] = AUDIT_WRITER_MODE
+        return counters
+
+
+# Singleton instanca (jedna po procesu)
+audit_writer = AuditWriter()
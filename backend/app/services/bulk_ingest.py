@@ -0,0 +1,146 @@
+# backend/app/services/bulk_ingest.py
+"""
+Brza validacija velikih JSON tela zahteva
+Telo se parsira i validira u jednom prolazu (pydantic-core, bez Python JSON
+dekodera) direktno u rečnike spremne za upis - bez pravljenja Pydantic modela
+i model_dump po stavci. Šema rečnika se izvodi iz postojećih modela, tako da
+modeli ostaju jedini opis formata.
+
+Greške se ne prave na brzoj putanji: neispravno telo se ponovo validira kroz
+model na isti način kao FastAPI, pa je odgovor 422 identičan kao ranije.
+"""
+
+import copy
+import email.message
+import json
+import typing
+from typing import Any, Dict, Optional, Type
+
+from fastapi.dependencies.utils import get_missing_field_error
+from fastapi import HTTPException
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from pydantic_core import SchemaValidator, core_schema, PydanticUndefined
+
+
+def _annotation_schema(annotation: Any) -> core_schema.CoreSchema:
+    """Core šema tipa polja; ugnežđeni modeli postaju rečnici"""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return model_dict_schema(annotation)
+
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is list and len(args) == 1 and _contains_model(args[0]):
+        return core_schema.list_schema(_annotation_schema(args[0]))
+    if origin is typing.Union and type(None) in args and _contains_model(annotation):
+        (inner,) = [arg for arg in args if arg is not type(None)]
+        return core_schema.nullable_schema(_annotation_schema(inner))
+    if _contains_model(annotation):
+        raise TypeError(f"Unsupported annotation for dict validation: {annotation!r}")
+
+    # Tipovi bez modela se validiraju istom šemom kao u modelu
+    return TypeAdapter(annotation).core_schema
+
+
+def _contains_model(annotation: Any) -> bool:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return True
+    return any(_contains_model(arg) for arg in typing.get_args(annotation))
+
+
+def model_dict_schema(model: Type[BaseModel]) -> core_schema.CoreSchema:
+    """
+    Šema rečnika sa istim poljima, podrazumevanim vrednostima i alias-ima kao model
+
+    Ključevi izlaznog rečnika su alias-i (isto kao model_dump(by_alias=True)),
+    a višak polja se ignoriše kao kod modela sa extra='ignore'.
+    """
+    fields = {}
+    for name, field in model.model_fields.items():
+        key = field.alias or name
+        schema = _annotation_schema(field.annotation)
+        if field.default_factory is not None:
+            schema = core_schema.with_default_schema(schema, default_factory=field.default_factory)
+        elif field.default is not PydanticUndefined:
+            default = field.default
+            if isinstance(default, (list, dict, set)):
+                # Promenljive podrazumevane vrednosti se kopiraju po dokumentu (kao u modelu)
+                schema = core_schema.with_default_schema(schema, default_factory=lambda d=default: copy.deepcopy(d))
+            else:
+                schema = core_schema.with_default_schema(schema, default=default)
+        fields[key] = core_schema.typed_dict_field(schema, required=field.is_required())
+
+    return core_schema.typed_dict_schema(
+        fields,
+        extra_behavior=model.model_config.get('extra') or 'ignore',
+        cls_name=model.__name__
+    )
+
+
+def dict_validator(model: Type[BaseModel]) -> SchemaValidator:
+    """Kompajlirani validator koji vraća rečnike umesto instanci modela"""
+    return SchemaValidator(model_dict_schema(model))
+
+
+def _is_json(content_type: Optional[str]) -> bool:
+    # Isto pravilo kao FastAPI: bez Content-Type ili application/json / application/*+json
+    if not content_type:
+        return True
+    message = email.message.Message()
+    message['content-type'] = content_type
+    if message.get_content_maintype() != 'application':
+        return False
+    subtype = message.get_content_subtype()
+    return subtype == 'json' or subtype.endswith('+json')
+
+
+def parse_body(raw: bytes, content_type: Optional[str], model: Type[BaseModel],
+               validator: SchemaValidator) -> Dict[str, Any]:
+    """
+    Parsiranje i validacija tela zahteva u rečnik spreman za upis
+
+    Argumenti:
+        raw: Sirovo telo zahteva
+        content_type: Zaglavlje Content-Type
+        model: Pydantic model koji opisuje telo (za greške)
+        validator: Rezultat dict_validator(model)
+
+    Vraća:
+        Rečnik istog sadržaja kao model.model_validate(body).model_dump(by_alias=True)
+
+    Izuzeci:
+        RequestValidationError sa istim greškama koje bi FastAPI vratio za parametar tipa model
+        HTTPException: 400 ako telo nije moguće dekodirati (isto kao FastAPI)
+    """
+    if raw and _is_json(content_type):
+        try:
+            return validator.validate_json(raw)
+        except ValidationError:
+            pass
+
+    # Spora putanja, samo za neispravna tela: ponavlja FastAPI obradu tela korak po korak
+    if not raw:
+        raise RequestValidationError([get_missing_field_error(('body',))], body=None)
+    body: Any = raw
+    if _is_json(content_type):
+        try:
+            body = json.loads(raw)
+        except json.JSONDecodeError as e:
+            raise RequestValidationError([{
+                'type': 'json_invalid',
+                'loc': ('body', e.pos),
+                'msg': 'JSON decode error',
+                'input': {},
+                'ctx': {'error': e.msg}
+            }], body=e.doc) from e
+        except Exception as e:
+            raise HTTPException(status_code=400, detail="There was an error parsing the body") from e
+    if body is None:
+        raise RequestValidationError([get_missing_field_error(('body',))], body=body)
+    try:
+        instance = model.model_validate(body, from_attributes=True)
+    except ValidationError as e:
+        errors = [{**error, 'loc': ('body',) + tuple(error.get('loc', ()))} for error in e.errors()]
+        raise RequestValidationError(errors, body=body) from e
+    # Telo koje model prihvata a brza šema ne (ne bi trebalo da se desi) ide kroz model
+    return instance.model_dump(by_alias=True)
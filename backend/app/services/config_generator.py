@@ -4,15 +4,107 @@ Generator konfiguracionih fajlova
 Konvertuje ArangoDB graf podatke u mrežne konfiguracione fajlove
 """
 
-from typing import List, Dict, Any
+import json
+import multiprocessing
+import os
+import threading
+from collections import deque, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import List, Dict, Any, Iterable, Iterator, Tuple, Optional, Callable
 from datetime import datetime
 
+# Paralelno renderovanje (opciono): broj procesa i broj uređaja po delu posla
+# Mali podrazumevani pul - procesi dele CPU sa uvicorn worker-ima (0 = broj procesora)
+CONFIG_RENDER_WORKERS = int(os.getenv('CONFIG_RENDER_WORKERS', '2')) or (os.cpu_count() or 1)
+CONFIG_RENDER_SHARD_SIZE = int(os.getenv('CONFIG_RENDER_SHARD_SIZE', '250'))
+
+# Keš renderovanih blokova po uređaju (0 isključuje keš)
+CONFIG_RENDER_CACHE_ENTRIES = int(os.getenv('CONFIG_RENDER_CACHE_ENTRIES', '100000'))
+CONFIG_RENDER_CACHE_MB = int(os.getenv('CONFIG_RENDER_CACHE_MB', '256'))
+
+
+def _nested_json(value: Any, depth: int) -> str:
+    """JSON vrednost uvučena na zadatu dubinu (indent=2)"""
+    return json.dumps(value, indent=2).replace("\n", "\n" + "  " * depth)
+
 
 class ConfigGenerator:
     """Generisanje mrežnih konfiguracionih fajlova iz graf podataka"""
     
+    # Slojevi dijagrama (redosled je bitan)
+    DIAGRAM_LAYERS = [
+        ('router', "ROUTERS (Core Layer)"),
+        ('switch', "SWITCHES (Distribution/Access Layer)"),
+        ('server', "SERVERS (End Devices)"),
+    ]
+    
     @staticmethod
-    def generate_network_diagram_text(devices: List[Dict]) -> str:
+    def _join_blocks(blocks: Iterable[str]) -> Iterator[str]:
+        """
+        Spajanje blokova teksta (svaki blok su linije spojene sa "\n")
+        Rezultat spojen sa "".join je identičan "\n".join svih linija
+        """
+        first = True
+        for text in blocks:
+            yield text if first else "\n" + text
+            first = False
+    
+    @staticmethod
+    def render_diagram_device(device: Dict) -> str:
+        """Tekst dijagrama za jedan uređaj"""
+        lines = [f"[{device['hostname']}] {device['ip_address']}"]
+        if device['connections']:
+            for conn in device['connections']:
+                lines.append(f"  └─ {conn['my_port']} ──→ {conn['neighbor_hostname']}:{conn['neighbor_port']}")
+        return "\n".join(lines)
+    
+    @staticmethod
+    def render_json_device(device: Dict) -> str:
+        """JSON zapis jednog uređaja uvučen na nivo liste uređaja u izvozu"""
+        return "      " + _nested_json(device, 3)
+    
+    @staticmethod
+    def _diagram_blocks(devices: Iterable[Dict], workers: int = 0, key_func=None) -> Iterator[str]:
+        yield "\n".join(["Network Topology Diagram", "=" * 80, ""])
+        
+        titles = dict(ConfigGenerator.DIAGRAM_LAYERS)
+        current_layer = None
+        layer_devices = (d for d in devices if d['device_type'] in titles)
+        
+        for device, text in render_devices(layer_devices, "diagram", workers, key_func=key_func):
+            layer = device['device_type']
+            
+            # Početak novog sloja
+            if layer != current_layer:
+                if current_layer is not None:
+                    yield ""
+                yield titles[layer] + "\n" + "-" * 40
+                current_layer = layer
+            
+            yield text
+        
+        if current_layer is not None:
+            yield ""
+    
+    @staticmethod
+    def iter_network_diagram_text(devices: Iterable[Dict], workers: int = 0, key_func=None) -> Iterator[str]:
+        """
+        Generisanje ASCII dijagrama deo po deo (jedan deo po uređaju)
+        
+        Argumenti:
+            devices: Uređaji grupisani po slojevima redosledom DIAGRAM_LAYERS
+                     (ruteri, pa svičevi, pa serveri); ostali tipovi se preskaču
+            workers: Broj procesa za paralelno renderovanje (0 = serijski)
+            key_func: Ključ sadržaja uređaja za keš renderovanja (None = bez keša)
+            
+        Vraća:
+            Iterator delova teksta
+        """
+        return ConfigGenerator._join_blocks(ConfigGenerator._diagram_blocks(devices, workers, key_func))
+    
+    @staticmethod
+    def generate_network_diagram_text(devices: List[Dict], workers: int = 0) -> str:
         """
         Generisanje ASCII tekstualne reprezentacije mrežne topologije
         
@@ -22,250 +114,243 @@ class ConfigGenerator:
         Vraća:
             Tekstualni dijagram kao string
         """
-        output = []
-        output.append("Network Topology Diagram")
-        output.append("=" * 80)
-        output.append("")
-        
-        # Grupisanje po tipu
-        routers = [d for d in devices if d['device_type'] == 'router']
-        switches = [d for d in devices if d['device_type'] == 'switch']
-        servers = [d for d in devices if d['device_type'] == 'server']
-        
-        # Sloj rutera
-        if routers:
-            output.append("ROUTERS (Core Layer)")
-            output.append("-" * 40)
-            for router in routers:
-                output.append(f"[{router['hostname']}] {router['ip_address']}")
-                if router['connections']:
-                    for conn in router['connections']:
-                        output.append(f"  └─ {conn['my_port']} ──→ {conn['neighbor_hostname']}:{conn['neighbor_port']}")
-            output.append("")
-        
-        # Sloj svičeva
-        if switches:
-            output.append("SWITCHES (Distribution/Access Layer)")
-            output.append("-" * 40)
-            for switch in switches:
-                output.append(f"[{switch['hostname']}] {switch['ip_address']}")
-                if switch['connections']:
-                    for conn in switch['connections']:
-                        output.append(f"  └─ {conn['my_port']} ──→ {conn['neighbor_hostname']}:{conn['neighbor_port']}")
-            output.append("")
-        
-        # Sloj servera
-        if servers:
-            output.append("SERVERS (End Devices)")
-            output.append("-" * 40)
-            for server in servers:
-                output.append(f"[{server['hostname']}] {server['ip_address']}")
-                if server['connections']:
-                    for conn in server['connections']:
-                        output.append(f"  └─ {conn['my_port']} ──→ {conn['neighbor_hostname']}:{conn['neighbor_port']}")
-            output.append("")
-        
-        return "\n".join(output)
+        # Grupisanje po tipu (stabilno sortiranje čuva redosled unutar sloja)
+        order = {layer: i for i, (layer, _) in enumerate(ConfigGenerator.DIAGRAM_LAYERS)}
+        grouped = sorted(
+            (d for d in devices if d['device_type'] in order),
+            key=lambda d: order[d['device_type']]
+        )
+        return "".join(ConfigGenerator.iter_network_diagram_text(grouped, workers))
     
     @staticmethod
-    def generate_cisco_style_config(devices: List[Dict]) -> str:
+    def render_cisco_device(device: Dict) -> str:
         """
-        Generisanje Cisco IOS-stil konfiguracionih komandi
+        Cisco IOS-stil konfiguracija jednog uređaja
         
         Argumenti:
-            devices: Lista rečnika uređaja
+            device: Rečnik uređaja sa listom konekcija
             
         Vraća:
-            Cisco-stil konfiguraciju kao string
+            Linije konfiguracije spojene sa "\n"
         """
         output = []
-        output.append("! NetGraph Provisioner - Cisco IOS Style Configuration")
-        output.append(f"! Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        output.append("!")
+        output.append("!" + "=" * 70)
+        output.append(f"! Device: {device['hostname']}")
+        output.append("!" + "=" * 70)
         output.append("")
+        output.append(f"hostname {device['hostname']}")
+        output.append("!")
         
-        for device in devices:
-            output.append("!" + "=" * 70)
-            output.append(f"! Device: {device['hostname']}")
-            output.append("!" + "=" * 70)
-            output.append("")
-            output.append(f"hostname {device['hostname']}")
+        # Konfiguracija Router ID-a za ruting protokole (OSPF, EIGRP, BGP)
+        router_id = device.get('router_id')
+        if router_id and device['device_type'] in ['l3_switch', 'router']:
+            output.append(f"! Router ID for routing protocols")
+            output.append(f"router-id {router_id}")
             output.append("!")
-            
-            # Konfiguracija Router ID-a za ruting protokole (OSPF, EIGRP, BGP)
-            router_id = device.get('router_id')
-            if router_id and device['device_type'] in ['l3_switch', 'router']:
-                output.append(f"! Router ID for routing protocols")
-                output.append(f"router-id {router_id}")
-                output.append("!")
-            
-            # Omogućavanje IP rutiranja za L3 svičeve i rutere (za inter-VLAN rutiranje)
-            if device['device_type'] in ['l3_switch', 'router']:
-                output.append("ip routing")
+        
+        # Omogućavanje IP rutiranja za L3 svičeve i rutere (za inter-VLAN rutiranje)
+        if device['device_type'] in ['l3_switch', 'router']:
+            output.append("ip routing")
+            output.append("!")
+        
+        # Konfiguracija VLAN baze podataka (za svičeve i L3 svičeve)
+        vlans = device.get('vlans', [])
+        if vlans and device['device_type'] in ['switch', 'l3_switch']:
+            output.append("! VLAN Database")
+            for vlan in vlans:
+                vlan_id = vlan.get('vlan_id')
+                vlan_name = vlan.get('name', f'VLAN{vlan_id}')
+                vlan_status = vlan.get('status', 'active')
+                
+                output.append(f"vlan {vlan_id}")
+                output.append(f" name {vlan_name}")
+                if vlan_status == 'suspended':
+                    output.append(" shutdown")
                 output.append("!")
-            
-            # Konfiguracija VLAN baze podataka (za svičeve i L3 svičeve)
-            vlans = device.get('vlans', [])
-            if vlans and device['device_type'] in ['switch', 'l3_switch']:
-                output.append("! VLAN Database")
-                for vlan in vlans:
-                    vlan_id = vlan.get('vlan_id')
-                    vlan_name = vlan.get('name', f'VLAN{vlan_id}')
-                    vlan_status = vlan.get('status', 'active')
-                    
-                    output.append(f"vlan {vlan_id}")
-                    output.append(f" name {vlan_name}")
-                    if vlan_status == 'suspended':
-                        output.append(" shutdown")
-                    output.append("!")
-            
-            # Konfiguracija interfejsa
-            # Prvo, mapiraj sve definisane portove po imenu za lakšu pretragu
-            defined_ports = {p.get('name'): p for p in device.get('ports', [])}
-            
-            if device['connections']:
-                for conn in device['connections']:
-                    port_name = conn['my_port']
-                    port_config = defined_ports.get(port_name, {})
-                    
-                    output.append(f"interface {port_name}")
-                    output.append(f" description Connected to {conn['neighbor_hostname']} port {conn['neighbor_port']}")
-                    
-                    # Konfiguracija brzine i dupleksa iz konekcije
-                    speed_map = {
-                        '10M': '10', '100M': '100', '1G': '1000', 
-                        '10G': '10000', '25G': '25000', '40G': '40000', '100G': '100000'
-                    }
-                    conn_speed = conn.get('speed', '1G')
-                    conn_duplex = conn.get('duplex', 'auto')
-                    
-                    if conn_speed in speed_map:
-                        output.append(f" speed {speed_map[conn_speed]}")
-                    
-                    if conn_duplex != 'auto':
-                        output.append(f" duplex {conn_duplex}")
-                    elif conn_duplex == 'auto':
-                        output.append(" speed auto")
-                        output.append(" duplex auto")
-                    
-                    # 1. Provera da li je ovo L3 svič rutirani port
-                    if device['device_type'] == 'l3_switch' and port_config.get('is_routed'):
-                        output.append(" no switchport")
-                        if port_config.get('ip_address'):
-                            mask = port_config.get('subnet_mask', '255.255.255.0')
-                            output.append(f" ip address {port_config['ip_address']} {mask}")
-                    
-                    # 2. Provera za specifičnu Layer 3 IP na portu
-                    elif port_config.get('ip_address'):
+        
+        # Konfiguracija interfejsa
+        # Prvo, mapiraj sve definisane portove po imenu za lakšu pretragu
+        defined_ports = {p.get('name'): p for p in device.get('ports', [])}
+        
+        if device['connections']:
+            for conn in device['connections']:
+                port_name = conn['my_port']
+                port_config = defined_ports.get(port_name, {})
+                
+                output.append(f"interface {port_name}")
+                output.append(f" description Connected to {conn['neighbor_hostname']} port {conn['neighbor_port']}")
+                
+                # Konfiguracija brzine i dupleksa iz konekcije
+                speed_map = {
+                    '10M': '10', '100M': '100', '1G': '1000', 
+                    '10G': '10000', '25G': '25000', '40G': '40000', '100G': '100000'
+                }
+                conn_speed = conn.get('speed', '1G')
+                conn_duplex = conn.get('duplex', 'auto')
+                
+                if conn_speed in speed_map:
+                    output.append(f" speed {speed_map[conn_speed]}")
+                
+                if conn_duplex != 'auto':
+                    output.append(f" duplex {conn_duplex}")
+                elif conn_duplex == 'auto':
+                    output.append(" speed auto")
+                    output.append(" duplex auto")
+                
+                # 1. Provera da li je ovo L3 svič rutirani port
+                if device['device_type'] == 'l3_switch' and port_config.get('is_routed'):
+                    output.append(" no switchport")
+                    if port_config.get('ip_address'):
                         mask = port_config.get('subnet_mask', '255.255.255.0')
                         output.append(f" ip address {port_config['ip_address']} {mask}")
-                    
-                    # 3. Provera za Layer 2 VLAN konfiguraciju
-                    elif port_config.get('mode') == 'trunk':
-                        output.append(" switchport mode trunk")
-                        if port_config.get('vlan'):
-                            output.append(f" switchport trunk allowed vlan {port_config['vlan']}")
-                    elif port_config.get('mode') == 'access':
-                        output.append(" switchport mode access")
-                        if port_config.get('vlan'):
-                            output.append(f" switchport access vlan {port_config['vlan']}")
-                            
-                    # 4. Rezervna logika za stari menadžment IP samo za Rutere na prvom portu ako specifična IP nije postavljena
-                    elif device['device_type'] == 'router' and port_name in ['eth0', 'GigabitEthernet0/0'] and device.get('ip_address'):
-                         output.append(f" ip address {device['ip_address']} {device.get('subnet_mask', '255.255.255.0')}")
-                    
-                    output.append(" no shutdown")
-                    output.append("!")
-            
-            # Koristi 'ports' definiciju za generisanje subinterfejsa, SVI-jeva ili nepovezanih unapred konfigurisanih portova
-            for p_name, p_data in defined_ports.items():
-                # Preskoči ako je već obrađeno u petlji konekcija
-                if any(c['my_port'] == p_name for c in device['connections']):
-                    continue
                 
-                # Obrada Loopback interfejsa
-                if p_data.get('type') == 'loopback' or p_name.lower().startswith('loopback'):
-                    output.append(f"interface {p_name}")
-                    if p_data.get('description'):
-                        output.append(f" description {p_data['description']}")
-                    if p_data.get('ip_address'):
-                        mask = p_data.get('subnet_mask', '255.255.255.255')
-                        output.append(f" ip address {p_data['ip_address']} {mask}")
-                    output.append(" no shutdown")
-                    output.append("!")
-                    continue
+                # 2. Provera za specifičnu Layer 3 IP na portu
+                elif port_config.get('ip_address'):
+                    mask = port_config.get('subnet_mask', '255.255.255.0')
+                    output.append(f" ip address {port_config['ip_address']} {mask}")
                 
-                # Obrada SVI (Switch Virtual Interface)
-                if p_data.get('is_svi'):
-                    vlan_id = p_data.get('vlan_id') or p_name.replace('vlan', '')
-                    output.append(f"interface vlan {vlan_id}")
-                    if p_data.get('description'):
-                        output.append(f" description {p_data['description']}")
-                    if p_data.get('ip_address'):
-                        mask = p_data.get('subnet_mask', '255.255.255.0')
-                        output.append(f" ip address {p_data['ip_address']} {mask}")
-                    output.append(" no shutdown")
-                    output.append("!")
-                    continue
+                # 3. Provera za Layer 2 VLAN konfiguraciju
+                elif port_config.get('mode') == 'trunk':
+                    output.append(" switchport mode trunk")
+                    if port_config.get('vlan'):
+                        output.append(f" switchport trunk allowed vlan {port_config['vlan']}")
+                elif port_config.get('mode') == 'access':
+                    output.append(" switchport mode access")
+                    if port_config.get('vlan'):
+                        output.append(f" switchport access vlan {port_config['vlan']}")
+                        
+                # 4. Rezervna logika za stari menadžment IP samo za Rutere na prvom portu ako specifična IP nije postavljena
+                elif device['device_type'] == 'router' and port_name in ['eth0', 'GigabitEthernet0/0'] and device.get('ip_address'):
+                     output.append(f" ip address {device['ip_address']} {device.get('subnet_mask', '255.255.255.0')}")
                 
-                # Obrada subinterfejsa ili Layer 3 portova sa konfigurisanom IP
-                if '.' in p_name or p_data.get('ip_address') or p_data.get('vlan_id'):
-                     output.append(f"interface {p_name}")
-                     if p_data.get('description'):
-                         output.append(f" description {p_data['description']}")
-                     
-                     # Enkapsulacija subinterfejsa (za rutere)
-                     if ('.' in p_name or p_data.get('vlan_id')) and not p_data.get('is_svi'):
-                         # Koristi eksplicitni vlan_id ako je pružen, inače parsiraj iz imena
-                         vlan_id = p_data.get('vlan_id') or p_name.split('.')[-1]
-                         encap = p_data.get('encapsulation', 'dot1Q')
-                         output.append(f" encapsulation {encap} {vlan_id}")
+                output.append(" no shutdown")
+                output.append("!")
+        
+        # Koristi 'ports' definiciju za generisanje subinterfejsa, SVI-jeva ili nepovezanih unapred konfigurisanih portova
+        for p_name, p_data in defined_ports.items():
+            # Preskoči ako je već obrađeno u petlji konekcija
+            if any(c['my_port'] == p_name for c in device['connections']):
+                continue
+            
+            # Obrada Loopback interfejsa
+            if p_data.get('type') == 'loopback' or p_name.lower().startswith('loopback'):
+                output.append(f"interface {p_name}")
+                if p_data.get('description'):
+                    output.append(f" description {p_data['description']}")
+                if p_data.get('ip_address'):
+                    mask = p_data.get('subnet_mask', '255.255.255.255')
+                    output.append(f" ip address {p_data['ip_address']} {mask}")
+                output.append(" no shutdown")
+                output.append("!")
+                continue
+            
+            # Obrada SVI (Switch Virtual Interface)
+            if p_data.get('is_svi'):
+                vlan_id = p_data.get('vlan_id') or p_name.replace('vlan', '')
+                output.append(f"interface vlan {vlan_id}")
+                if p_data.get('description'):
+                    output.append(f" description {p_data['description']}")
+                if p_data.get('ip_address'):
+                    mask = p_data.get('subnet_mask', '255.255.255.0')
+                    output.append(f" ip address {p_data['ip_address']} {mask}")
+                output.append(" no shutdown")
+                output.append("!")
+                continue
+            
+            # Obrada subinterfejsa ili Layer 3 portova sa konfigurisanom IP
+            if '.' in p_name or p_data.get('ip_address') or p_data.get('vlan_id'):
+                 output.append(f"interface {p_name}")
+                 if p_data.get('description'):
+                     output.append(f" description {p_data['description']}")
+                 
+                 # Enkapsulacija subinterfejsa (za rutere)
+                 if ('.' in p_name or p_data.get('vlan_id')) and not p_data.get('is_svi'):
+                     # Koristi eksplicitni vlan_id ako je pružen, inače parsiraj iz imena
+                     vlan_id = p_data.get('vlan_id') or p_name.split('.')[-1]
+                     encap = p_data.get('encapsulation', 'dot1Q')
+                     output.append(f" encapsulation {encap} {vlan_id}")
 
-                     if p_data.get('ip_address'):
-                         mask = p_data.get('subnet_mask', '255.255.255.0')
-                         output.append(f" ip address {p_data['ip_address']} {mask}")
-                     
-                     output.append(" no shutdown")
-                     output.append("!")
+                 if p_data.get('ip_address'):
+                     mask = p_data.get('subnet_mask', '255.255.255.0')
+                     output.append(f" ip address {p_data['ip_address']} {mask}")
+                 
+                 output.append(" no shutdown")
+                 output.append("!")
 
-            # Konfiguracija statičkih ruta
-            static_routes = device.get('static_routes', [])
-            if static_routes:
-                output.append("! Static Routes")
-                for route in static_routes:
-                    dest_net = route.get('destination_network', '')
-                    mask = route.get('subnet_mask', '')
-                    next_hop = route.get('next_hop', '')
-                    exit_int = route.get('exit_interface', '')
-                    metric = route.get('metric', 1)
-                    description = route.get('description', '')
-                    
-                    if description:
-                        output.append(f"! {description}")
-                    
-                    # Build the route command
-                    route_cmd = f"ip route {dest_net} {mask}"
-                    
-                    # Dodaj next-hop i/ili izlazni interfejs
-                    if next_hop and exit_int:
-                        route_cmd += f" {exit_int} {next_hop}"
-                    elif next_hop:
-                        route_cmd += f" {next_hop}"
-                    elif exit_int:
-                        route_cmd += f" {exit_int}"
-                    
-                    # Dodaj metriku ako nije podrazumevana
-                    if metric and metric != 1:
-                        route_cmd += f" {metric}"
-                    
-                    output.append(route_cmd)
-                output.append("!")
+        # Konfiguracija statičkih ruta
+        static_routes = device.get('static_routes', [])
+        if static_routes:
+            output.append("! Static Routes")
+            for route in static_routes:
+                dest_net = route.get('destination_network', '')
+                mask = route.get('subnet_mask', '')
+                next_hop = route.get('next_hop', '')
+                exit_int = route.get('exit_interface', '')
+                metric = route.get('metric', 1)
+                description = route.get('description', '')
+                
+                if description:
+                    output.append(f"! {description}")
+                
+                # Build the route command
+                route_cmd = f"ip route {dest_net} {mask}"
+                
+                # Dodaj next-hop i/ili izlazni interfejs
+                if next_hop and exit_int:
+                    route_cmd += f" {exit_int} {next_hop}"
+                elif next_hop:
+                    route_cmd += f" {next_hop}"
+                elif exit_int:
+                    route_cmd += f" {exit_int}"
+                
+                # Dodaj metriku ako nije podrazumevana
+                if metric and metric != 1:
+                    route_cmd += f" {metric}"
+                
+                output.append(route_cmd)
+            output.append("!")
 
-            output.append("")
+        output.append("")
+        return "\n".join(output)
+    
+    @staticmethod
+    def iter_cisco_style_config(devices: Iterable[Dict], workers: int = 0, key_func=None) -> Iterator[str]:
+        """
+        Generisanje Cisco IOS-stil konfiguracije deo po deo (jedan deo po uređaju)
+        
+        Argumenti:
+            devices: Iterabla rečnika uređaja (lista ili kursor)
+            workers: Broj procesa za paralelno renderovanje (0 = serijski)
+            key_func: Ključ sadržaja uređaja za keš renderovanja (None = bez keša)
+            
+        Vraća:
+            Iterator delova teksta
+        """
+        def blocks():
+            yield "\n".join([
+                "! NetGraph Provisioner - Cisco IOS Style Configuration",
+                f"! Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+                "!",
+                ""
+            ])
+            for _, text in render_devices(devices, "cisco", workers, key_func=key_func):
+                yield text
+            yield "end"
         
-        output.append("end")
+        return ConfigGenerator._join_blocks(blocks())
+    
+    @staticmethod
+    def generate_cisco_style_config(devices: List[Dict], workers: int = 0) -> str:
+        """
+        Generisanje Cisco IOS-stil konfiguracionih komandi
         
-        return "\n".join(output)
+        Argumenti:
+            devices: Lista rečnika uređaja
+            
+        Vraća:
+            Cisco-stil konfiguraciju kao string
+        """
+        return "".join(ConfigGenerator.iter_cisco_style_config(devices, workers))
     
     @staticmethod
     def generate_json_export(devices: List[Dict]) -> Dict[str, Any]:
@@ -296,15 +381,236 @@ class ConfigGenerator:
             }
         }
 
+    
+    @staticmethod
+    def iter_json_export(devices: Iterable[Dict], workers: int = 0, key_func=None) -> Iterator[str]:
+        """
+        Izvoz topologije kao JSON deo po deo
+        Spojeni delovi su identični json.dumps(generate_json_export(devices), indent=2)
+        
+        Argumenti:
+            devices: Iterabla rečnika uređaja (lista ili kursor)
+            workers: Broj procesa za paralelno renderovanje (0 = serijski)
+            key_func: Ključ sadržaja uređaja za keš renderovanja (None = bez keša)
+            
+        Vraća:
+            Iterator delova JSON teksta
+        """
+        metadata = {
+            "generated_at": datetime.now().isoformat(),
+            "generator": "NetGraph Provisioner",
+            "version": "1.0"
+        }
+        yield '{\n  "metadata": ' + _nested_json(metadata, 1) + ',\n  "topology": {\n    "devices": ['
+        
+        counts = {'router': 0, 'switch': 0, 'server': 0}
+        total_devices = 0
+        connection_ends = 0
+        
+        for device, text in render_devices(devices, "json", workers, key_func=key_func):
+            yield (",\n" if total_devices else "\n") + text
+            total_devices += 1
+            if device['device_type'] in counts:
+                counts[device['device_type']] += 1
+            connection_ends += len(device['connections'])
+        
+        statistics = {
+            "total_devices": total_devices,
+            "routers": counts['router'],
+            "switches": counts['switch'],
+            "servers": counts['server'],
+            "total_connections": connection_ends // 2  # Podeliti sa 2 jer su konekcije dvosmerne
+        }
+        yield ("\n    ]" if total_devices else "]") + ',\n    "statistics": ' + _nested_json(statistics, 2) + "\n  }\n}"
+
+
+class RenderCache:
+    """
+    LRU keš renderovanih blokova konfiguracije, adresiran sadržajem
+    
+    Ključ je (format, heš uređaja + njegovih konekcija i suseda), pa se blok
+    ponovo renderuje samo kada se promeni nešto što utiče na njegov izlaz.
+    """
+    
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+    
+    def get(self, format: str, key: str) -> Optional[str]:
+        with self._lock:
+            text = self._entries.get((format, key))
+            if text is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((format, key))
+            self.hits += 1
+            return text
+    
+    def put(self, format: str, key: str, text: str):
+        size = len(text)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop((format, key), None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._entries[(format, key)] = text
+            self._bytes += size
+            
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "size_bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None
+            }
+
+
+# Singleton instanca (jedna po procesu)
+render_cache = RenderCache(CONFIG_RENDER_CACHE_ENTRIES, CONFIG_RENDER_CACHE_MB * 1024 * 1024)
+
+
+# Renderovanje jednog uređaja po formatu (funkcije na nivou modula da bi mogle u druge procese)
+DEVICE_RENDERERS = {
+    "cisco": ConfigGenerator.render_cisco_device,
+    "diagram": ConfigGenerator.render_diagram_device,
+    "json": ConfigGenerator.render_json_device,
+}
+
+_render_pool: Optional[ProcessPoolExecutor] = None
+_render_pool_workers = 0
+_render_pool_lock = threading.Lock()
+
+
+def _render_shard(format: str, devices: List[Dict]) -> List[Any]:
+    """Renderovanje dela liste uređaja (izvršava se u procesu iz pula)"""
+    renderer = DEVICE_RENDERERS[format]
+    return [renderer(device) for device in devices]
+
+
+def get_render_pool(workers: int) -> ProcessPoolExecutor:
+    """Deljeni pul procesa za renderovanje, pravi se pri prvoj upotrebi"""
+    global _render_pool, _render_pool_workers
+    with _render_pool_lock:
+        if _render_pool is None or _render_pool_workers != workers:
+            if _render_pool is not None:
+                _render_pool.shutdown(wait=False)
+            # spawn: fork iz procesa sa nitima (pozadinski pisac, klijent baze) može da nasledi zaključane brave
+            _render_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _render_pool_workers = workers
+        return _render_pool
+
+
+def shutdown_render_pool():
+    """Gašenje pula procesa (pri gašenju aplikacije)"""
+    global _render_pool, _render_pool_workers
+    with _render_pool_lock:
+        if _render_pool is not None:
+            _render_pool.shutdown(wait=True)
+            _render_pool = None
+            _render_pool_workers = 0
+
+
+def render_devices(devices: Iterable[Dict], format: str, workers: int = 0,
+                   shard_size: int = CONFIG_RENDER_SHARD_SIZE,
+                   key_func: Optional[Callable[[Dict], Optional[str]]] = None) -> Iterator[Tuple[Dict, str]]:
+    """
+    Renderovanje uređaja, serijski ili paralelno u pulu procesa
+    
+    Argumenti:
+        devices: Iterabla rečnika uređaja
+        format: Jedan od 'cisco', 'diagram', 'json'
+        workers: Broj procesa (0 ili 1 = serijski u trenutnom procesu)
+        shard_size: Broj uređaja po delu posla
+        key_func: Ključ sadržaja uređaja za render_cache (None = bez keša);
+                  uređaji bez ključa se uvek renderuju
+        
+    Vraća:
+        Parove (uređaj, tekst) u istom redosledu kao ulaz. U paralelnom režimu
+        unapred se šalje najviše 2 * workers delova, pa se ulaz i dalje čita lenjo.
+    """
+    renderer = DEVICE_RENDERERS[format]
+    use_cache = key_func is not None and render_cache.enabled
+    
+    def lookup(device):
+        key = key_func(device) if use_cache else None
+        return key, (render_cache.get(format, key) if key else None)
+    
+    def store(key, text):
+        if key:
+            render_cache.put(format, key, text)
+    
+    if workers <= 1:
+        for device in devices:
+            key, text = lookup(device)
+            if text is None:
+                text = renderer(device)
+                store(key, text)
+            yield device, text
+        return
+    
+    pool = get_render_pool(workers)
+    devices = iter(devices)
+    pending = deque()
+    
+    while True:
+        shard = list(islice(devices, shard_size))
+        if shard:
+            # U procese idu samo uređaji kojih nema u kešu
+            cached = [lookup(device) for device in shard]
+            misses = [device for device, (_, text) in zip(shard, cached) if text is None]
+            future = pool.submit(_render_shard, format, misses) if misses else None
+            pending.append((shard, cached, future))
+        
+        # Rezultati se vraćaju redom kojim su delovi poslati (deterministički izlaz)
+        if pending and (not shard or len(pending) >= 2 * workers):
+            done_shard, done_cached, future = pending.popleft()
+            rendered = iter(future.result()) if future is not None else iter(())
+            for device, (key, text) in zip(done_shard, done_cached):
+                if text is None:
+                    text = next(rendered)
+                    store(key, text)
+                yield device, text
+        elif not shard:
+            return
+
 
 # Example usage function
-def generate_config_from_graph(devices_data: List[Dict], format: str = "cisco") -> str:
+def generate_config_from_graph(devices_data: List[Dict], format: str = "cisco", workers: int = 0) -> str:
     """
     Glavna funkcija za generisanje konfiguracije u zadatom formatu
     
     Argumenti:
         devices_data: Izlaz iz GraphService.get_port_connection_map()
         format: Jedan od 'cisco', 'diagram', 'json'
+        workers: Broj procesa za paralelno renderovanje (0 = serijski)
         
     Vraća:
         Konfiguracija kao string
@@ -312,11 +618,37 @@ def generate_config_from_graph(devices_data: List[Dict], format: str = "cisco")
     generator = ConfigGenerator()
     
     if format == "cisco":
-        return generator.generate_cisco_style_config(devices_data)
+        return generator.generate_cisco_style_config(devices_data, workers)
     elif format == "diagram":
-        return generator.generate_network_diagram_text(devices_data)
+        return generator.generate_network_diagram_text(devices_data, workers)
     elif format == "json":
-        import json
+        if workers > 1:
+            return "".join(generator.iter_json_export(devices_data, workers))
         return json.dumps(generator.generate_json_export(devices_data), indent=2)
     else:
         raise ValueError(f"Unknown format: {format}")
+
+
+def iter_config_from_graph(devices_data: Iterable[Dict], format: str = "cisco", workers: int = 0,
+                           key_func: Optional[Callable[[Dict], Optional[str]]] = None) -> Iterator[str]:
+    """
+    Strimovanje konfiguracije u zadatom formatu, jedan deo po uređaju
+    
+    Argumenti:
+        devices_data: Iterabla uređaja (npr. GraphService.iter_port_connection_map());
+                      za 'diagram' uređaji moraju biti grupisani po ConfigGenerator.DIAGRAM_LAYERS
+        format: Jedan od 'cisco', 'diagram', 'json'
+        workers: Broj procesa za paralelno renderovanje (0 = serijski)
+        key_func: Ključ sadržaja uređaja za keš renderovanja (None = bez keša)
+        
+    Vraća:
+        Iterator delova konfiguracije
+    """
+    if format == "cisco":
+        return ConfigGenerator.iter_cisco_style_config(devices_data, workers, key_func)
+    elif format == "diagram":
+        return ConfigGenerator.iter_network_diagram_text(devices_data, workers, key_func)
+    elif format == "json":
+        return ConfigGenerator.iter_json_export(devices_data, workers, key_func)
+    else:
+        raise ValueError(f"Unknown format: {format}")
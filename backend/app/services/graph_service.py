@@ -3,9 +3,58 @@
 Graf servis - AQL upiti i graf operacije
 """
 
-from typing import List, Dict
+import hashlib
+from typing import List, Dict, Iterator, Optional, Tuple
 from arango.database import StandardDatabase
 
+from app.services.aql import execute_aql, iter_aql
+
+# Polja uređaja u mapi povezivanja portova (redosled je deo formata)
+PORT_MAP_DEVICE_FIELDS = """{
+    _key: device._key,
+    hostname: device.hostname,
+    device_type: device.device_type,
+    ip_address: device.ip_address,
+    mac_address: device.mac_address,
+    subnet_mask: device.subnet_mask,
+    gateway: device.gateway,
+    ports: device.ports,
+    connections: [],
+    metadata: device.metadata,
+    _content_hash: device.content_hash
+  }"""
+
+PORT_MAP_DEVICE_QUERY = f"""
+FOR device IN devices
+  FILTER @device_type == null OR device.device_type == @device_type
+  RETURN {PORT_MAP_DEVICE_FIELDS}
+"""
+
+# Straničenje po _key koristi primarni indeks
+PORT_MAP_DEVICE_PAGE_QUERY = f"""
+FOR device IN devices
+  FILTER @device_type == null OR device.device_type == @device_type
+  FILTER @device_keys == null OR device._key IN @device_keys
+  SORT device._key
+  LIMIT @offset, @limit
+  RETURN {PORT_MAP_DEVICE_FIELDS}
+"""
+
+# Kompaktni zapis konekcije za spajanje u Pythonu
+PORT_MAP_EDGE_FIELDS = "[e._key, e._from, e._to, e.src_port, e.dst_port, e.cable_type, e.speed, e.duplex, e.vlan_tags, e.content_hash]"
+
+
+# Konekcije na jednom portu uređaja; svaka grana koristi jedinstveni indeks
+# (_from, src_port) odnosno (_to, dst_port) umesto skeniranja kolekcije
+PORT_CONNECTIONS_QUERY = """
+LET device_id = CONCAT('devices/', @device_key)
+FOR e IN UNION(
+    (FOR e IN connections FILTER e._from == device_id AND e.src_port == @port RETURN e),
+    (FOR e IN connections FILTER e._to == device_id AND e.dst_port == @port RETURN e)
+)
+  RETURN e
+"""
+
 
 class GraphService:
     """Servis za izvršavanje AQL graf upita"""
@@ -20,27 +69,176 @@ class GraphService:
         Vraća:
             Listu uređaja sa detaljima njihovih konekcija
         """
+        return list(self.iter_port_connection_map())
+    
+    def _execute_stream(self, name: str, query: str, bind_vars: Dict, batch_size: int = 1000) -> Iterator:
+        """Izvršavanje imenovanog AQL upita preko serverskog kursora, uz zatvaranje kursora na kraju"""
+        return iter_aql(self.db, name, query, bind_vars, batch_size)
+    
+    def iter_port_connection_map(
+        self,
+        device_type: Optional[str] = None,
+        batch_size: int = 1000,
+        with_render_key: bool = False,
+        device_keys: Optional[List[str]] = None,
+        offset: int = 0,
+        limit: Optional[int] = None
+    ) -> Iterator[Dict]:
+        """
+        Mapa povezivanja portova spajanjem konekcija u jednom prolazu
+        
+        Umesto jednog graf prolaza po uređaju (svaka konekcija se obilazi dva puta),
+        kolekcija konekcija se čita jednom i spaja sa uređajima u Pythonu. Izlaz je
+        u istom formatu kao iter_port_connection_map_traversal(); konekcije ka
+        nepostojećim uređajima se preskaču.
+        
+        Argumenti:
+            device_type: Opcioni filter po tipu uređaja
+            batch_size: Broj dokumenata po paketu kursora
+            with_render_key: Dodavanje polja '_render_key' (vidi iter_port_connection_map_traversal)
+            device_keys: Opciona lista ključeva uređaja
+            offset, limit: Straničenje po _key (stabilan redosled)
+            
+        Vraća:
+            Iterator uređaja sa detaljima njihovih konekcija
+        """
+        if device_keys is None and offset == 0 and limit is None:
+            # Cela kolekcija: jedan prolaz kroz konekcije + kompaktna mapa suseda
+            neighbors = self._neighbor_info()
+            wanted = None if device_type is None else {k for k, info in neighbors.items() if info[2] == device_type}
+            adjacency = self._adjacency(
+                self._execute_stream('port_map.edges', f"FOR e IN connections RETURN {PORT_MAP_EDGE_FIELDS}", {}, batch_size),
+                neighbors,
+                wanted
+            )
+            devices = self._execute_stream('port_map.devices', PORT_MAP_DEVICE_QUERY, {'device_type': device_type}, batch_size)
+        else:
+            # Podskup uređaja: konekcije preko edge indeksa, susedi preko primarnog indeksa
+            page_vars = {
+                'device_type': device_type,
+                'device_keys': device_keys,
+                'offset': offset,
+                'limit': limit if limit is not None else 2 ** 53
+            }
+            devices = list(self._execute_stream('port_map.device_page', PORT_MAP_DEVICE_PAGE_QUERY, page_vars, batch_size))
+            ids = [f"devices/{d['_key']}" for d in devices]
+            edges = list(self._execute_stream('port_map.page_edges', f"""
+            FOR e IN UNION_DISTINCT(
+                (FOR x IN connections FILTER x._from IN @ids RETURN x),
+                (FOR x IN connections FILTER x._to IN @ids RETURN x)
+            )
+              RETURN {PORT_MAP_EDGE_FIELDS}
+            """, {'ids': ids}, batch_size))
+            neighbor_keys = {edge[i].split('/')[-1] for edge in edges for i in (1, 2)}
+            neighbors = self._neighbor_info(list(neighbor_keys))
+            adjacency = self._adjacency(edges, neighbors, wanted={d['_key'] for d in devices})
+        
+        for device in devices:
+            device_hash = device.pop('_content_hash')
+            links = adjacency.get(device['_key'], [])
+            device['connections'] = [connection for connection, _ in links]
+            
+            if with_render_key:
+                parts = [part for _, part in links]
+                complete = device_hash is not None and None not in parts
+                device['_render_key'] = (
+                    hashlib.sha1(';'.join([device_hash] + parts).encode('utf-8')).hexdigest()
+                    if complete else None
+                )
+            yield device
+    
+    def _neighbor_info(self, keys: Optional[List[str]] = None) -> Dict[str, Tuple]:
+        """Kompaktni podaci o uređajima potrebni za opis suseda: _key -> (hostname, ip, tip, heš)"""
+        query = """
+        FOR d IN devices
+          FILTER @keys == null OR d._key IN @keys
+          RETURN [d._key, d.hostname, d.ip_address, d.device_type, d.content_hash]
+        """
+        return {row[0]: tuple(row[1:]) for row in self._execute_stream('port_map.neighbors', query, {'keys': keys}, 10000)}
+    
+    @staticmethod
+    def _adjacency(edges, neighbors: Dict[str, Tuple], wanted: Optional[set] = None) -> Dict[str, List[Tuple[Dict, Optional[str]]]]:
+        """
+        Lista konekcija po uređaju (obe strane svake konekcije), uz deo ključa renderovanja
+        """
+        adjacency: Dict[str, List[Tuple[Dict, Optional[str]]]] = {}
+        
+        for key, from_id, to_id, src_port, dst_port, cable_type, speed, duplex, vlan_tags, edge_hash in edges:
+            from_key = from_id.split('/')[-1]
+            to_key = to_id.split('/')[-1]
+            if from_key not in neighbors or to_key not in neighbors:
+                continue
+            
+            # Petlja (konekcija uređaja sa samim sobom) se vidi dva puta, obe strane kao izlazne
+            inbound = (to_key, from_key, src_port, dst_port, 'out') if to_key == from_key \
+                else (to_key, from_key, dst_port, src_port, 'in')
+            for me, other, my_port, neighbor_port, direction in ((from_key, to_key, src_port, dst_port, 'out'), inbound):
+                if wanted is not None and me not in wanted:
+                    continue
+                hostname, ip_address, device_type, neighbor_hash = neighbors[other]
+                part = (
+                    f"{edge_hash}/{direction}/{neighbor_hash}"
+                    if edge_hash is not None and neighbor_hash is not None else None
+                )
+                adjacency.setdefault(me, []).append(({
+                    'neighbor_key': other,
+                    'neighbor_hostname': hostname,
+                    'neighbor_ip': ip_address,
+                    'neighbor_type': device_type,
+                    'my_port': my_port,
+                    'neighbor_port': neighbor_port,
+                    'cable_type': cable_type,
+                    'speed': speed,
+                    'duplex': duplex,
+                    'vlan_tags': vlan_tags
+                }, part))
+        
+        return adjacency
+    
+    def iter_port_connection_map_traversal(self, device_type: Optional[str] = None, batch_size: int = 1000,
+                                           with_render_key: bool = False) -> Iterator[Dict]:
+        """
+        Mapa povezivanja portova preko graf prolaza 1..1 ANY po uređaju
+        (prethodna implementacija, zadržana za poređenje u benchmarks/)
+        
+        Argumenti:
+            device_type: Opcioni filter po tipu uređaja
+            batch_size: Broj uređaja po paketu kursora
+            with_render_key: Dodavanje polja '_render_key' - heš sadržaja uređaja i njegovih
+                             konekcija i suseda (isti kao TopologySnapshot.render_key), ili null
+                             ako neki dokument nema content_hash
+            
+        Vraća:
+            Iterator uređaja sa detaljima njihovih konekcija
+        """
         query = """
         FOR device IN devices
-          LET connections = (
+          FILTER @device_type == null OR device.device_type == @device_type
+          LET links = (
             FOR v, e IN 1..1 ANY device._id
               GRAPH 'network_topology'
-              LET my_port = e._from == device._id ? e.src_port : e.dst_port
-              LET neighbor_port = e._from == device._id ? e.dst_port : e.src_port
+              LET outgoing = e._from == device._id
+              LET my_port = outgoing ? e.src_port : e.dst_port
+              LET neighbor_port = outgoing ? e.dst_port : e.src_port
               RETURN {
-                neighbor_key: v._key,
-                neighbor_hostname: v.hostname,
-                neighbor_ip: v.ip_address,
-                neighbor_type: v.device_type,
-                my_port: my_port,
-                neighbor_port: neighbor_port,
-                cable_type: e.cable_type,
-                speed: e.speed,
-                duplex: e.duplex,
-                vlan_tags: e.vlan_tags
+                connection: {
+                  neighbor_key: v._key,
+                  neighbor_hostname: v.hostname,
+                  neighbor_ip: v.ip_address,
+                  neighbor_type: v.device_type,
+                  my_port: my_port,
+                  neighbor_port: neighbor_port,
+                  cable_type: e.cable_type,
+                  speed: e.speed,
+                  duplex: e.duplex,
+                  vlan_tags: e.vlan_tags
+                },
+                render_part: e.content_hash != null AND v.content_hash != null
+                  ? CONCAT(e.content_hash, '/', outgoing ? 'out' : 'in', '/', v.content_hash)
+                  : null
               }
           )
-          RETURN {
+          LET entry = {
             _key: device._key,
             hostname: device.hostname,
             device_type: device.device_type,
@@ -49,10 +247,54 @@ class GraphService:
             subnet_mask: device.subnet_mask,
             gateway: device.gateway,
             ports: device.ports,
-            connections: connections,
+            connections: links[*].connection,
             metadata: device.metadata
           }
+          LET render_key = device.content_hash != null AND NOT (null IN links[*].render_part)
+            ? SHA1(CONCAT_SEPARATOR(';', APPEND([device.content_hash], links[*].render_part)))
+            : null
+          RETURN @with_render_key ? MERGE(entry, {_render_key: render_key}) : entry
         """
         
-        cursor = self.db.aql.execute(query)
-        return [doc for doc in cursor]
+        return self._execute_stream(
+            'port_map.traversal',
+            query,
+            {'device_type': device_type, 'with_render_key': with_render_key},
+            batch_size
+        )
+
+    def stream_collection(self, collection: str, batch_size: int = 1000) -> Iterator[Dict]:
+        """
+        Čitanje kolekcije preko serverskog kursora, paket po paket
+        
+        Argumenti:
+            collection: Ime kolekcije (devices, connections)
+            batch_size: Broj dokumenata po paketu kursora
+            
+        Vraća:
+            Iterator dokumenata (u memoriji je najviše jedan paket)
+        """
+        return self._execute_stream(
+            f'stream_collection.{collection}',
+            "FOR doc IN @@collection RETURN doc",
+            {'@collection': collection},
+            batch_size
+        )
+
+    def find_port_connections(self, device_key: str, port_name: str) -> List[Dict]:
+        """
+        Konekcije priključene na port uređaja (u oba smera)
+        
+        Argumenti:
+            device_key: Ključ uređaja
+            port_name: Ime porta
+            
+        Vraća:
+            Listu konekcija (najviše jedna ako su jedinstveni indeksi portova prisutni)
+        """
+        return list(execute_aql(
+            self.db,
+            'port_connections',
+            PORT_CONNECTIONS_QUERY,
+            bind_vars={'device_key': device_key, 'port': port_name}
+        ))
@@ -0,0 +1,125 @@
+# backend/app/services/metrics.py
+"""
+Prometheus metrike
+Latencija HTTP zahteva po ruti i latencija, broj izvršavanja i serverska
+statistika AQL upita po imenu upita, izložene na /metrics
+
+Napomena: metrike su po procesu; sa više uvicorn worker-a svaki worker
+ima sopstvene vrednosti (Prometheus ih sabira po instanci).
+"""
+
+import os
+import time
+from typing import Dict, Any, Optional
+
+from prometheus_client import Counter, Histogram, CONTENT_TYPE_LATEST, generate_latest
+from starlette.routing import Match
+
+# Uključivanje/isključivanje merenja HTTP zahteva (middleware)
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+
+AQL_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+MEMORY_BUCKETS = tuple(64 * 1024 * 4 ** i for i in range(8))  # 64 KB - 1 GB
+
+HTTP_REQUEST_DURATION = Histogram(
+    'netgraph_http_request_duration_seconds',
+    'HTTP request latency by route (until the last body chunk is sent)',
+    ['method', 'route', 'status']
+)
+AQL_QUERY_DURATION = Histogram(
+    'netgraph_aql_query_duration_seconds',
+    'AQL query latency seen by the backend (stream cursors are timed until fully read)',
+    ['query'], buckets=AQL_BUCKETS
+)
+AQL_QUERY_ERRORS = Counter('netgraph_aql_query_errors_total', 'Failed AQL queries', ['query'])
+AQL_EXECUTION_TIME = Histogram(
+    'netgraph_aql_execution_seconds',
+    'Server-side AQL execution time reported in cursor statistics',
+    ['query'], buckets=AQL_BUCKETS
+)
+AQL_SCANNED_DOCUMENTS = Counter(
+    'netgraph_aql_scanned_documents_total',
+    'Documents scanned by AQL queries (full collection scans vs index lookups)',
+    ['query', 'scan']
+)
+AQL_WRITES = Counter('netgraph_aql_writes_total', 'Documents written by AQL queries', ['query'])
+AQL_PEAK_MEMORY = Histogram(
+    'netgraph_aql_peak_memory_bytes',
+    'Peak memory usage of AQL queries reported in cursor statistics',
+    ['query'], buckets=MEMORY_BUCKETS
+)
+
+
+def record_aql(name: str, seconds: float, stats: Optional[Dict[str, Any]]):
+    """
+    Beleženje jednog izvršavanja AQL upita
+
+    Argumenti:
+        name: Ime upita (npr. 'statistics', 'port_map')
+        seconds: Trajanje na strani backend-a
+        stats: Statistika kursora (cursor.statistics()), ako je server vratio
+    """
+    AQL_QUERY_DURATION.labels(name).observe(seconds)
+    if not stats:
+        return
+    if stats.get('execution_time') is not None:
+        AQL_EXECUTION_TIME.labels(name).observe(stats['execution_time'])
+    AQL_SCANNED_DOCUMENTS.labels(name, 'full').inc(stats.get('scanned_full') or 0)
+    AQL_SCANNED_DOCUMENTS.labels(name, 'index').inc(stats.get('scanned_index') or 0)
+    AQL_WRITES.labels(name).inc(stats.get('modified') or 0)
+    # python-arango prevodi peakMemoryUsage u peak_memory_usage
+    peak_memory = stats.get('peak_memory_usage', stats.get('peakMemoryUsage'))
+    if peak_memory is not None:
+        AQL_PEAK_MEMORY.labels(name).observe(peak_memory)
+
+
+def record_aql_error(name: str):
+    AQL_QUERY_ERRORS.labels(name).inc()
+
+
+def _route_path(scope) -> str:
+    """Šablon rute (npr. /api/devices/{device_key}) umesto stvarne putanje - ograničen broj labela"""
+    app = scope.get('app')
+    for route in getattr(app, 'routes', []):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return 'unmatched'
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware za latenciju zahteva po ruti
+
+    Meri do slanja poslednjeg dela tela odgovora, tako da se i stream
+    odgovori (izvoz, stream topologije) mere celom dužinom.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_DURATION.labels(scope['method'], _route_path(scope), str(status)).observe(
+                time.perf_counter() - start
+            )
+
+
+def metrics_response() -> tuple:
+    """Telo i Content-Type odgovora za /metrics"""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,229 @@
+# backend/app/services/path_engine.py
+"""
+Mašina za analizu putanja
+Dijkstra (najjeftinija putanja), najmanji broj skokova i Yen-ov algoritam
+za k najkraćih putanja bez petlji, nad snimkom topologije u memoriji
+"""
+
+import heapq
+import os
+from typing import List, Dict, Optional, Tuple, Set, NamedTuple
+
+from app.services.topology_cache import TopologySnapshot
+
+# Podrazumevani model troška na osnovu brzine kabla
+DEFAULT_SPEED_COSTS = {
+    '10G': 1, '25G': 1, '40G': 1, '100G': 1,  # visoka brzina, niska cena
+    '1G': 5,  # standardna cena
+    '100M': 10,  # viša cena
+}
+DEFAULT_UNKNOWN_SPEED_COST = 20  # 10M i nepoznate brzine
+DEFAULT_SPEED = '1G'  # Konekcije bez brzine se tretiraju kao 1G
+
+
+def load_speed_costs() -> Tuple[Dict[str, float], float]:
+    """
+    Učitavanje težina iz okruženja
+
+    PATH_SPEED_COSTS="10G=1,25G=1,40G=1,100G=1,1G=5,100M=10"
+    PATH_UNKNOWN_SPEED_COST=20
+    """
+    costs = dict(DEFAULT_SPEED_COSTS)
+    raw = os.getenv('PATH_SPEED_COSTS', '')
+    for item in raw.split(','):
+        if '=' in item:
+            speed, cost = item.split('=', 1)
+            costs[speed.strip()] = float(cost)
+    unknown_cost = float(os.getenv('PATH_UNKNOWN_SPEED_COST', DEFAULT_UNKNOWN_SPEED_COST))
+    return costs, unknown_cost
+
+
+class Path(NamedTuple):
+    """Putanja kao niz ključeva uređaja i ključeva konekcija između njih"""
+    devices: Tuple[str, ...]
+    connections: Tuple[str, ...]
+    cost: float
+
+    @property
+    def hops(self) -> int:
+        return len(self.connections)
+
+
+class PathEngine:
+    """
+    Pretraga putanja nad listom susedstva snimka topologije
+
+    Putanje se rangiraju leksikografski:
+    - po broju skokova pa po ceni (najkraća putanja)
+    - po ceni pa po broju skokova (najjeftinija putanja)
+    """
+
+    def __init__(self, snapshot: TopologySnapshot, speed_costs: Optional[Dict[str, float]] = None,
+                 unknown_speed_cost: Optional[float] = None):
+        self.snapshot = snapshot
+        if speed_costs is None or unknown_speed_cost is None:
+            env_costs, env_unknown = load_speed_costs()
+            speed_costs = env_costs if speed_costs is None else speed_costs
+            unknown_speed_cost = env_unknown if unknown_speed_cost is None else unknown_speed_cost
+        self.speed_costs = speed_costs
+        self.unknown_speed_cost = unknown_speed_cost
+
+    def edge_cost(self, speed: Optional[str]) -> float:
+        return self.speed_costs.get(speed or DEFAULT_SPEED, self.unknown_speed_cost)
+
+    def _weight(self, speed: Optional[str], by_hops: bool) -> Tuple[float, float]:
+        cost = self.edge_cost(speed)
+        return (1, cost) if by_hops else (cost, 1)
+
+    def _distances_to(self, target: str, by_hops: bool) -> Dict[str, Tuple[float, float]]:
+        """Tačne udaljenosti svih uređaja do cilja (konekcije su neusmerene)"""
+        adjacency = self.snapshot.adjacency
+        best = {target: (0, 0)}
+        heap = [((0, 0), target)]
+        while heap:
+            dist, node = heapq.heappop(heap)
+            if dist > best[node]:
+                continue
+            for adj in adjacency.get(node, ()):
+                w = self._weight(adj.speed, by_hops)
+                candidate = (dist[0] + w[0], dist[1] + w[1])
+                known = best.get(adj.neighbor_key)
+                if known is None or candidate < known:
+                    best[adj.neighbor_key] = candidate
+                    heapq.heappush(heap, (candidate, adj.neighbor_key))
+        return best
+
+    def _search(
+        self,
+        source: str,
+        target: str,
+        by_hops: bool,
+        banned_devices: Set[str] = frozenset(),
+        banned_connections: Set[str] = frozenset(),
+        potential: Optional[Dict[str, Tuple[float, float]]] = None
+    ) -> Optional[Path]:
+        """
+        Dijkstra sa leksikografskim težinama (za by_hops svodi se na BFS sa razrešavanjem po ceni)
+
+        Ako je zadat potencijal (udaljenosti do cilja u grafu bez zabrana), pretraga
+        radi kao A*: zabrane samo povećavaju udaljenosti, pa je heuristika dopustiva
+        i rezultat ostaje tačan, a istražuje se samo okolina najbolje putanje.
+        """
+        adjacency = self.snapshot.adjacency
+        zero = (0, 0)
+        best = {source: zero}
+        previous: Dict[str, Tuple[str, str]] = {}
+        start_priority = potential.get(source) if potential is not None else zero
+        if start_priority is None:
+            return None
+        heap = [(start_priority, zero, source)]
+
+        while heap:
+            _, dist, node = heapq.heappop(heap)
+            if node == target:
+                break
+            if dist > best[node]:
+                continue
+            for adj in adjacency.get(node, ()):
+                neighbor = adj.neighbor_key
+                if neighbor in banned_devices or adj.connection_key in banned_connections:
+                    continue
+                w = self._weight(adj.speed, by_hops)
+                candidate = (dist[0] + w[0], dist[1] + w[1])
+                known = best.get(neighbor)
+                if known is None or candidate < known:
+                    if potential is None:
+                        priority = candidate
+                    else:
+                        h = potential.get(neighbor)
+                        if h is None:
+                            continue  # Cilj nije dostižan iz ovog čvora
+                        priority = (candidate[0] + h[0], candidate[1] + h[1])
+                    best[neighbor] = candidate
+                    previous[neighbor] = (node, adj.connection_key)
+                    heapq.heappush(heap, (priority, candidate, neighbor))
+
+        if target not in best:
+            return None
+
+        devices = [target]
+        connections = []
+        node = target
+        while node != source:
+            node, connection_key = previous[node]
+            devices.append(node)
+            connections.append(connection_key)
+        devices.reverse()
+        connections.reverse()
+        return self._make_path(devices, connections)
+
+    def _make_path(self, devices: List[str], connections: List[str]) -> Path:
+        conns = self.snapshot.connections
+        cost = sum(self.edge_cost(conns[key].get('speed')) for key in connections)
+        return Path(tuple(devices), tuple(connections), cost)
+
+    def _rank(self, path: Path, by_hops: bool) -> Tuple[float, float]:
+        return (path.hops, path.cost) if by_hops else (path.cost, path.hops)
+
+    def shortest_path(self, source: str, target: str) -> Optional[Path]:
+        """Putanja sa najmanjim brojem skokova (pri jednakom broju - najjeftinija)"""
+        return self._search(source, target, by_hops=True)
+
+    def cheapest_path(self, source: str, target: str) -> Optional[Path]:
+        """Putanja sa najmanjom ukupnom cenom (pri jednakoj ceni - najkraća)"""
+        return self._search(source, target, by_hops=False)
+
+    def k_shortest_paths(self, source: str, target: str, k: int, by_hops: bool = True) -> List[Path]:
+        """
+        Yen-ov algoritam za k najboljih putanja bez petlji
+
+        Argumenti:
+            source: Ključ izvornog uređaja
+            target: Ključ odredišnog uređaja
+            k: Maksimalan broj putanja
+            by_hops: Rangiranje po skokovima (True) ili po ceni (False)
+
+        Vraća:
+            Listu putanja sortiranu po rangu
+        """
+        potential = self._distances_to(target, by_hops)
+        first = self._search(source, target, by_hops, potential=potential)
+        if first is None or k <= 0:
+            return []
+
+        found = [first]
+        candidates: List[Tuple[Tuple[float, float], Path]] = []
+        seen = {first.connections}
+
+        while len(found) < k:
+            last = found[-1]
+            for i in range(len(last.devices) - 1):
+                spur_node = last.devices[i]
+                root_devices = last.devices[:i + 1]
+                root_connections = last.connections[:i]
+
+                # Uklanjanje grana koje bi ponovile već pronađene putanje sa istim korenom
+                banned_connections = {
+                    path.connections[i] for path in found
+                    if path.connections[:i] == root_connections and len(path.connections) > i
+                }
+                # Čvorovi korena (osim spur čvora) ne smeju se ponoviti - putanje bez petlji
+                banned_devices = set(root_devices[:-1])
+
+                spur = self._search(spur_node, target, by_hops, banned_devices, banned_connections, potential)
+                if spur is None:
+                    continue
+
+                path = self._make_path(
+                    list(root_devices[:-1]) + list(spur.devices),
+                    list(root_connections) + list(spur.connections)
+                )
+                if path.connections not in seen:
+                    seen.add(path.connections)
+                    heapq.heappush(candidates, (self._rank(path, by_hops), path))
+
+            if not candidates:
+                break
+            found.append(heapq.heappop(candidates)[1])
+
+        return found
@@ -0,0 +1,197 @@
+# backend/app/services/responses.py
+"""
+Brzo kodiranje i kompresija velikih JSON odgovora
+
+FastJSONResponse kodira sadržaj pomoću orjson-a (C/Rust), bez prolaska
+jsonable_encoder-a kroz svaki objekat. Endpoint treba da vrati instancu
+odgovora direktno - za običan rečnik FastAPI i dalje poziva jsonable_encoder.
+
+CompressionMiddleware kompresuje odgovore (brotli ako je instaliran i ako ga
+klijent prihvata, inače gzip) kada su veći od COMPRESSION_MIN_SIZE. Veliki
+odgovori se kompresuju u posebnoj niti da ne bi blokirali event loop, a stream
+odgovori se kompresuju deo po deo.
+"""
+
+import os
+import zlib
+from typing import Any, Optional
+
+import anyio
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # brotli je opcioni - bez njega se koristi samo gzip
+    brotli = None
+
+# Uključivanje/isključivanje kompresije odgovora (middleware)
+COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+# Manji odgovori se šalju nekompresovani (zaglavlja i CPU bi pojeli uštedu)
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+# Nivoi za dinamički sadržaj: viši nivoi malo smanjuju veličinu a višestruko usporavaju
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', '5'))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', '4'))
+# Telo veće od ovoga se kompresuje u niti (anyio thread pool)
+COMPRESSION_THREAD_SIZE = 256 * 1024
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'application/javascript',
+                      'application/xml', 'text/')
+
+
+def _default(obj: Any) -> Any:
+    # Tipovi koje orjson ne poznaje (Pydantic modeli, set, Decimal...) idu kroz FastAPI enkoder
+    return jsonable_encoder(obj)
+
+
+def dumps(content: Any) -> bytes:
+    """JSON kodiranje istim pravilima kao FastJSONResponse"""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON odgovor kodiran orjson-om (isti izlaz kao JSONResponse, bez razmaka)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def select_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Izbor kodiranja iz Accept-Encoding zaglavlja
+
+    Vraća:
+        'br', 'gzip' ili None (klijent ne prihvata nijedno podržano kodiranje)
+    """
+    if not accept_encoding:
+        return None
+
+    weights = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        weight = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+
+    wildcard = weights.get('*', 0.0)
+    supported = ['br', 'gzip'] if brotli is not None else ['gzip']
+    candidates = [(weights.get(name, wildcard), name) for name in supported]
+    # Pri istoj težini prednost ima brotli (redosled u supported)
+    weight, name = max(candidates, key=lambda c: c[0])
+    return name if weight > 0 else None
+
+
+class _Compressor:
+    """Zajednički interfejs za gzip i brotli kompresiju u delovima"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == 'br':
+            self._brotli = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._zlib = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)  # 31 = gzip zaglavlje
+
+    def chunk(self, data: bytes) -> bytes:
+        """Kompresovan deo, odmah poslat klijentu (flush)"""
+        if self.encoding == 'br':
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b'') -> bytes:
+        if self.encoding == 'br':
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush()
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Kompresija celog tela odjednom"""
+    return _Compressor(encoding).finish(data)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware za gzip/brotli kompresiju odgovora
+
+    Kompresuju se samo tekstualni odgovori (JSON, NDJSON, tekst) bez već
+    postavljenog Content-Encoding zaglavlja.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        encoding = select_encoding(Headers(scope=scope).get('accept-encoding'))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, compressor, passthrough
+
+            if message['type'] == 'http.response.start':
+                headers = Headers(raw=message['headers'])
+                content_type = headers.get('content-type', '')
+                passthrough = 'content-encoding' in headers or not content_type.startswith(COMPRESSIBLE_TYPES)
+                if passthrough:
+                    await send(message)
+                else:
+                    # Zaglavlja se šalju uz prvi deo tela, kada je poznata veličina
+                    start_message = message
+                return
+
+            if message['type'] != 'http.response.body' or passthrough:
+                await send(message)
+                return
+
+            body = message.get('body', b'')
+            more_body = message.get('more_body', False)
+
+            if start_message is not None:
+                headers = MutableHeaders(raw=start_message['headers'])
+                headers.add_vary_header('Accept-Encoding')
+
+                if not more_body and len(body) < self.minimum_size:
+                    await send(start_message)
+                    start_message = None
+                    await send(message)
+                    return
+
+                headers['Content-Encoding'] = encoding
+                if not more_body:
+                    # Ceo odgovor u jednoj poruci (JSONResponse, FastJSONResponse)
+                    if len(body) >= COMPRESSION_THREAD_SIZE:
+                        body = await anyio.to_thread.run_sync(compress, body, encoding)
+                    else:
+                        body = compress(body, encoding)
+                    headers['Content-Length'] = str(len(body))
+                    await send(start_message)
+                    start_message = None
+                    await send({'type': 'http.response.body', 'body': body})
+                    return
+
+                # Stream odgovor: dužina nije poznata unapred
+                del headers['Content-Length']
+                compressor = _Compressor(encoding)
+                await send(start_message)
+                start_message = None
+
+            data = compressor.chunk(body) if more_body else compressor.finish(body)
+            await send({'type': 'http.response.body', 'body': data, 'more_body': more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,207 @@
+# backend/app/services/slow_queries.py
+"""
+Evidencija sporih AQL upita
+Upiti duži od SLOW_QUERY_THRESHOLD_MS beleže se u prsten u memoriji procesa,
+zajedno sa planom izvršavanja (explain) i, po želji, profilom ponovnog
+izvršavanja: korišćeni indeksi, skenirani dokumenti i vreme po čvoru plana.
+Plan se snima u pozadinskoj niti, van putanje zahteva.
+"""
+
+import itertools
+import os
+import re
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+# Prag u milisekundama; 0 isključuje evidenciju (podrazumevano)
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv('SLOW_QUERY_THRESHOLD_MS', '0'))
+# Broj zapisa u prstenu (najstariji se izbacuju)
+SLOW_QUERY_LOG_SIZE = int(os.getenv('SLOW_QUERY_LOG_SIZE', '100'))
+# 'explain' (samo plan, bez izvršavanja) ili 'profile' (ponovno izvršavanje upita za čitanje sa profilom)
+SLOW_QUERY_CAPTURE = os.getenv('SLOW_QUERY_CAPTURE', 'explain').lower()
+# Najveći broj snimanja plana koja čekaju; zapisi preko toga ostaju bez plana
+SLOW_QUERY_MAX_PENDING = 8
+
+# Upiti koji menjaju podatke se nikad ne izvršavaju ponovo (samo explain)
+WRITE_PATTERN = re.compile(r'\b(INSERT|UPDATE|REPLACE|REMOVE|UPSERT)\b', re.IGNORECASE)
+# Bind parametri duži od ovoga se u zapisu skraćuju
+BIND_VAR_PREVIEW = 10
+
+
+def _preview_bind_vars(bind_vars: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Bind parametri za prikaz - dugačke liste (npr. ključevi) se skraćuju"""
+    preview = {}
+    for name, value in (bind_vars or {}).items():
+        if isinstance(value, (list, tuple)) and len(value) > BIND_VAR_PREVIEW:
+            preview[name] = {'length': len(value), 'head': list(value[:BIND_VAR_PREVIEW])}
+        else:
+            preview[name] = value
+    return preview
+
+
+def summarize_plan(plan: Dict[str, Any], node_stats: Optional[List[Dict]] = None) -> Dict[str, Any]:
+    """
+    Sažetak plana izvršavanja iz explain-a, opciono sa statistikom čvorova iz profila
+
+    Argumenti:
+        plan: Rezultat db.aql.explain()
+        node_stats: stats['nodes'] iz izvršavanja sa profile=2 (calls, items, runtime po čvoru)
+
+    Vraća:
+        Rečnik sa čvorovima plana, korišćenim indeksima i kolekcijama koje se čitaju punim prolazom
+    """
+    by_id = {node['id']: node for node in (node_stats or [])}
+    nodes = []
+    indexes_used = []
+    full_scans = []
+    for node in plan.get('nodes', []):
+        entry = {
+            'id': node.get('id'),
+            'type': node.get('type'),
+            'estimated_cost': node.get('estimatedCost'),
+            'estimated_items': node.get('estimatedNrItems')
+        }
+        if node.get('collection'):
+            entry['collection'] = node['collection']
+        if node.get('indexes'):
+            entry['indexes'] = [
+                {'name': index.get('name'), 'type': index.get('type'), 'fields': index.get('fields')}
+                for index in node['indexes']
+            ]
+            indexes_used.extend(f"{node.get('collection')}.{index.get('name')}" for index in node['indexes'])
+        if node.get('type') == 'EnumerateCollectionNode':
+            full_scans.append(node.get('collection'))
+        stats = by_id.get(node.get('id'))
+        if stats:
+            entry.update(calls=stats.get('calls'), items=stats.get('items'), runtime=stats.get('runtime'))
+        nodes.append(entry)
+
+    return {
+        'estimated_cost': plan.get('estimatedCost'),
+        'rules': plan.get('rules', []),
+        'indexes_used': indexes_used,
+        'full_scan_collections': full_scans,
+        'nodes': nodes
+    }
+
+
+class SlowQueryLog:
+    """Prsten zapisa sporih upita sa planovima izvršavanja"""
+
+    def __init__(self, threshold_ms: float = SLOW_QUERY_THRESHOLD_MS, size: int = SLOW_QUERY_LOG_SIZE,
+                 capture: str = SLOW_QUERY_CAPTURE):
+        self.threshold_ms = threshold_ms
+        self.capture = capture
+        self._records: deque = deque(maxlen=max(1, size))
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._pending = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms > 0
+
+    def observe(self, db, name: str, query: str, bind_vars: Optional[Dict[str, Any]], seconds: float,
+                stats: Optional[Dict[str, Any]]):
+        """
+        Beleženje upita ako je duži od praga (poziva se posle svakog AQL izvršavanja)
+
+        Argumenti:
+            db: Baza podataka ili transakcija u kojoj je upit izvršen
+            name: Ime upita (isto kao u metrikama)
+            query, bind_vars: Upit i parametri (za explain/profile)
+            seconds: Trajanje na strani backend-a
+            stats: Statistika kursora
+        """
+        duration_ms = seconds * 1000
+        if not self.enabled or duration_ms < self.threshold_ms:
+            return
+
+        stats = {k: v for k, v in (stats or {}).items() if k != 'nodes'}
+        record = {
+            'id': next(self._ids),
+            'name': name,
+            'database': db.name,
+            'timestamp': datetime.now().isoformat(),
+            'duration_ms': round(duration_ms, 3),
+            'query': query.strip(),
+            'bind_vars': _preview_bind_vars(bind_vars),
+            'stats': stats,
+            'capture': 'explain' if self.capture != 'profile' or WRITE_PATTERN.search(query) else 'profile',
+            'status': 'pending',
+            'plan': None
+        }
+
+        with self._lock:
+            self._records.append(record)
+            if self._pending >= SLOW_QUERY_MAX_PENDING:
+                record['status'] = 'skipped'
+                return
+            self._pending += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='slow-query')
+        self._executor.submit(self._capture_plan, record, db.name, query, bind_vars)
+
+    def _capture_plan(self, record: Dict[str, Any], db_name: str, query: str, bind_vars: Optional[Dict[str, Any]]):
+        # Plan se snima preko posebnog handle-a baze: transakcija upita je možda već završena
+        from app.database import arango_connection
+
+        try:
+            db = arango_connection.get_database(db_name)
+            plan = db.aql.explain(query, bind_vars=bind_vars)
+            node_stats = None
+            profile = None
+            if record['capture'] == 'profile':
+                cursor = db.aql.execute(query, bind_vars=bind_vars, profile=2)
+                for _ in cursor:
+                    pass
+                node_stats = (cursor.statistics() or {}).get('nodes')
+                profile = cursor.profile()
+            summary = summarize_plan(plan, node_stats)
+            with self._lock:
+                record['plan'] = summary
+                record['profile'] = profile
+                record['status'] = 'captured'
+        except Exception as e:
+            with self._lock:
+                record['status'] = 'failed'
+                record['error'] = str(e)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def records(self, limit: int = 50, name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Zapisi od najnovijeg, opciono samo za jedno ime upita"""
+        with self._lock:
+            selected = [dict(r) for r in reversed(self._records) if name is None or r['name'] == name]
+        return selected[:limit]
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+    def stop(self):
+        """Otkazivanje snimanja planova koja čekaju (poziva se pri gašenju)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'threshold_ms': self.threshold_ms,
+                'capture': self.capture,
+                'size': self._records.maxlen,
+                'records': len(self._records),
+                'pending': self._pending
+            }
+
+
+# Singleton instanca (jedna po procesu)
+slow_query_log = SlowQueryLog()
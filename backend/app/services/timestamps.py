@@ -0,0 +1,29 @@
+# backend/app/services/timestamps.py
+"""
+Vremenske oznake u UTC-u
+Sva sačuvana vremena (audit unosi, created_at/updated_at, izmene topologije)
+su ISO stringovi u UTC-u sa zonom ('2025-03-14T10:00:00.123456+00:00'), tako
+da se porede kao stringovi i dele po mesecima bez obzira na zonu servera.
+"""
+
+from datetime import datetime, timezone
+
+
+def utc_now() -> str:
+    """Trenutno vreme kao ISO string u UTC-u"""
+    return datetime.now(timezone.utc).isoformat()
+
+
+def to_utc(value: str) -> datetime:
+    """
+    ISO 8601 vreme pretvoreno u UTC
+
+    Vreme bez zone se smatra UTC-om (unosi upisani pre uvođenja zone).
+
+    Izuzeci:
+        ValueError ako vrednost nije ISO 8601 vreme
+    """
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
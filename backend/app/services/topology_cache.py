@@ -0,0 +1,289 @@
+# backend/app/services/topology_cache.py
+"""
+Keš topologije u memoriji procesa
+Snimak grafa (uređaji, konekcije i lista susedstva) po bazi podataka,
+gradi se lenjo pri prvom čitanju a poništava ili dopunjuje pri svakom upisu
+"""
+
+import hashlib
+import threading
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Callable, NamedTuple
+
+from arango.database import StandardDatabase
+
+from app.services.aql import iter_aql
+from app.services.topology_diff import content_hash
+
+
+class AdjacentEdge(NamedTuple):
+    """Jedan unos liste susedstva (pogled na konekciju sa strane jednog uređaja)"""
+    neighbor_key: str
+    connection_key: str
+    my_port: Optional[str]
+    neighbor_port: Optional[str]
+    speed: Optional[str]
+
+
+def _device_key(device_id: str) -> str:
+    return device_id.split('/')[-1]
+
+
+class TopologySnapshot:
+    """
+    Nepromenljiv snimak topologije jedne baze podataka
+
+    Izmene ne menjaju postojeći snimak već prave novi (with_changes), tako da
+    čitaoci koji drže referencu na stari snimak nikada ne vide polovično stanje.
+    """
+
+    def __init__(self, devices: Iterable[Dict], connections: Iterable[Dict]):
+        self.devices: Dict[str, Dict] = {d['_key']: d for d in devices}
+        self.connections: Dict[str, Dict] = {c['_key']: c for c in connections}
+        self.adjacency: Dict[str, List[AdjacentEdge]] = {key: [] for key in self.devices}
+        self.built_at = datetime.now().isoformat()
+        # Revizija baze pročitana pre učitavanja snimka (None - nepoznata)
+        self.revision: Optional[int] = None
+        self._render_keys: Dict[str, str] = {}
+        self._port_entries: Dict[str, Dict] = {}
+
+        for conn in self.connections.values():
+            from_key = _device_key(conn['_from'])
+            to_key = _device_key(conn['_to'])
+            # Konekcije ka nepostojećim uređajima se preskaču (isto kao graf prolaz)
+            if from_key not in self.devices or to_key not in self.devices:
+                continue
+
+            speed = conn.get('speed')
+            self.adjacency[from_key].append(
+                AdjacentEdge(to_key, conn['_key'], conn.get('src_port'), conn.get('dst_port'), speed)
+            )
+            # Petlja se vidi dva puta, obe strane sa portovima kao izlazna konekcija
+            if to_key == from_key:
+                self.adjacency[to_key].append(
+                    AdjacentEdge(from_key, conn['_key'], conn.get('src_port'), conn.get('dst_port'), speed)
+                )
+            else:
+                self.adjacency[to_key].append(
+                    AdjacentEdge(from_key, conn['_key'], conn.get('dst_port'), conn.get('src_port'), speed)
+                )
+
+    def with_changes(
+        self,
+        upsert_devices: Iterable[Dict] = (),
+        remove_devices: Iterable[str] = (),
+        upsert_connections: Iterable[Dict] = (),
+        remove_connections: Iterable[str] = (),
+        revision: Optional[int] = None
+    ) -> 'TopologySnapshot':
+        """Pravljenje novog snimka sa primenjenim izmenama (revision - revizija posle upisa)"""
+        devices = dict(self.devices)
+        connections = dict(self.connections)
+
+        for key in remove_devices:
+            devices.pop(key, None)
+        for doc in upsert_devices:
+            devices[doc['_key']] = doc
+        for key in remove_connections:
+            connections.pop(key, None)
+        for doc in upsert_connections:
+            connections[doc['_key']] = doc
+
+        snapshot = TopologySnapshot(devices.values(), connections.values())
+        snapshot.revision = revision
+        return snapshot
+
+    def _content_hash(self, doc: Dict) -> str:
+        # Dokumenti sačuvani pre uvođenja heša nemaju content_hash
+        return doc.get('content_hash') or content_hash(doc)
+
+    def render_key(self, device_key: str) -> str:
+        """
+        Heš sadržaja uređaja, njegovih konekcija i suseda (ključ keša renderovanja)
+        Isti je kao '_render_key' iz GraphService.iter_port_connection_map(with_render_key=True)
+        """
+        key = self._render_keys.get(device_key)
+        if key is None:
+            parts = [self._content_hash(self.devices[device_key])]
+            for adj in self.adjacency[device_key]:
+                conn = self.connections[adj.connection_key]
+                direction = 'out' if _device_key(conn['_from']) == device_key else 'in'
+                parts.append(f"{self._content_hash(conn)}/{direction}/{self._content_hash(self.devices[adj.neighbor_key])}")
+            key = hashlib.sha1(';'.join(parts).encode('utf-8')).hexdigest()
+            self._render_keys[device_key] = key
+        return key
+
+    def port_connection_entry(self, device_key: str) -> Dict:
+        """
+        Unos mape povezivanja portova za jedan uređaj, u istom formatu kao
+        GraphService.get_port_connection_map(); računa se jednom po snimku
+        """
+        entry = self._port_entries.get(device_key)
+        if entry is not None:
+            return entry
+
+        device = self.devices[device_key]
+        connections = []
+        for adj in self.adjacency[device_key]:
+            neighbor = self.devices[adj.neighbor_key]
+            edge = self.connections[adj.connection_key]
+            connections.append({
+                'neighbor_key': adj.neighbor_key,
+                'neighbor_hostname': neighbor.get('hostname'),
+                'neighbor_ip': neighbor.get('ip_address'),
+                'neighbor_type': neighbor.get('device_type'),
+                'my_port': adj.my_port,
+                'neighbor_port': adj.neighbor_port,
+                'cable_type': edge.get('cable_type'),
+                'speed': adj.speed,
+                'duplex': edge.get('duplex'),
+                'vlan_tags': edge.get('vlan_tags')
+            })
+
+        entry = {
+            '_key': device_key,
+            'hostname': device.get('hostname'),
+            'device_type': device.get('device_type'),
+            'ip_address': device.get('ip_address'),
+            'mac_address': device.get('mac_address'),
+            'subnet_mask': device.get('subnet_mask'),
+            'gateway': device.get('gateway'),
+            'ports': device.get('ports'),
+            'connections': connections,
+            'metadata': device.get('metadata')
+        }
+        self._port_entries[device_key] = entry
+        return entry
+
+    def iter_port_connection_map(self, device_type: Optional[str] = None) -> Iterator[Dict]:
+        """Mapa povezivanja portova iz memorije (opciono samo za jedan tip uređaja)"""
+        for key, device in self.devices.items():
+            if device_type is not None and device.get('device_type') != device_type:
+                continue
+            yield self.port_connection_entry(key)
+
+    def get_port_connection_map(self) -> List[Dict]:
+        return list(self.iter_port_connection_map())
+
+
+class TopologyCache:
+    """
+    Keš snimaka topologije po imenu baze podataka
+
+    Napomena: keš važi samo unutar jednog procesa. Upisi drugih procesa (drugi
+    uvicorn worker) vide samo čitaoci koji prosleđuju reviziju baze (get/memoize
+    sa revision); direktne izmene u bazi mimo API-ja se ne vide dok se snimak
+    ne poništi.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshots: Dict[str, TopologySnapshot] = {}
+        # Brojač generacija sprečava da snimak izgrađen pre upisa bude sačuvan posle njega
+        self._generations: Dict[str, int] = {}
+        # Izvedeni rezultati (npr. statistika) po bazi: (generacija, {ime: (revizija, rezultat)})
+        self._derived: Dict[str, tuple] = {}
+
+    def get(self, db: StandardDatabase, revision: Optional[int] = None) -> TopologySnapshot:
+        """
+        Dobijanje snimka za bazu, uz lenjo učitavanje iz ArangoDB-a
+
+        Argumenti:
+            db: Baza podataka
+            revision: Revizija baze pročitana pre poziva (topology_revision); snimak
+                starije ili nepoznate revizije se ponovo učitava - tako se vide i
+                upisi drugih procesa, a sadržaj nikad nije stariji od vraćenog ETag-a
+        """
+        db_name = db.name
+        with self._lock:
+            snapshot = self._snapshots.get(db_name)
+            generation = self._generations.get(db_name, 0)
+        if snapshot is not None and (revision is None or (snapshot.revision is not None and snapshot.revision >= revision)):
+            return snapshot
+
+        snapshot = TopologySnapshot(
+            iter_aql(db, 'topology_snapshot', "FOR doc IN @@collection RETURN doc", {'@collection': 'devices'}),
+            iter_aql(db, 'topology_snapshot', "FOR doc IN @@collection RETURN doc", {'@collection': 'connections'})
+        )
+        snapshot.revision = revision
+
+        with self._lock:
+            if self._generations.get(db_name, 0) == generation:
+                self._snapshots[db_name] = snapshot
+        return snapshot
+
+    def memoize(self, db_name: str, name: str, compute: Callable[[], Any], revision: Optional[int] = None) -> Any:
+        """
+        Izračunavanje izvedenog rezultata jednom po generaciji baze
+
+        Ne zahteva učitan snimak; svaki upis kroz keš (invalidate/apply_changes)
+        menja generaciju, pa se rezultat ponovo računa pri sledećem čitanju.
+        Sa zadatom revizijom (kao u get) rezultat starije revizije se ne koristi.
+        """
+        with self._lock:
+            generation = self._generations.get(db_name, 0)
+            cached_generation, results = self._derived.get(db_name, (None, {}))
+            if cached_generation == generation and name in results:
+                cached_revision, result = results[name]
+                if revision is None or (cached_revision is not None and cached_revision >= revision):
+                    return result
+
+        result = compute()
+
+        with self._lock:
+            if self._generations.get(db_name, 0) == generation:
+                cached_generation, results = self._derived.get(db_name, (None, {}))
+                if cached_generation != generation:
+                    results = {}
+                results[name] = (revision, result)
+                self._derived[db_name] = (generation, results)
+        return result
+
+    def peek(self, db_name: str, revision: Optional[int] = None) -> Optional[TopologySnapshot]:
+        """
+        Postojeći snimak baze, bez učitavanja (None ako keš nije popunjen)
+
+        Sa zadatom revizijom (kao u get) snimak starije ili nepoznate revizije se
+        ne vraća, pa pozivalac čita iz baze.
+        """
+        with self._lock:
+            snapshot = self._snapshots.get(db_name)
+        if snapshot is None or revision is None:
+            return snapshot
+        if snapshot.revision is None or snapshot.revision < revision:
+            return None
+        return snapshot
+
+    def invalidate(self, db_name: str):
+        """Odbacivanje snimka baze (sledeće čitanje ga ponovo gradi)"""
+        with self._lock:
+            self._generations[db_name] = self._generations.get(db_name, 0) + 1
+            self._snapshots.pop(db_name, None)
+
+    def apply_changes(self, db_name: str, revision: Optional[int] = None, **changes):
+        """
+        Dopunjavanje postojećeg snimka izmenama upisa
+
+        Argumenti:
+            db_name: Ime baze podataka
+            revision: Revizija baze posle upisa
+            changes: upsert_devices, remove_devices, upsert_connections, remove_connections
+        """
+        with self._lock:
+            self._generations[db_name] = self._generations.get(db_name, 0) + 1
+            snapshot = self._snapshots.get(db_name)
+            if snapshot is not None:
+                # Nova revizija važi samo ako snimak sadrži prethodnu (inače je upis drugog procesa preskočen)
+                continuous = revision is not None and snapshot.revision == revision - 1
+                self._snapshots[db_name] = snapshot.with_changes(**changes, revision=revision if continuous else None)
+
+    def clear(self):
+        with self._lock:
+            for db_name in set(self._snapshots) | set(self._derived):
+                self._generations[db_name] = self._generations.get(db_name, 0) + 1
+            self._snapshots.clear()
+            self._derived.clear()
+
+
+# Singleton instanca (jedna po procesu)
+topology_cache = TopologyCache()
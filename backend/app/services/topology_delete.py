@@ -0,0 +1,170 @@
+# backend/app/services/topology_delete.py
+"""
+Kaskadno brisanje uređaja i konekcija
+Uklanjanje uređaja, njihovih konekcija i brisanje IP adresa na portovima
+suseda izvršava se na serveru, u jednoj stream transakciji i sa konstantnim
+brojem poziva bez obzira na broj konekcija
+"""
+
+from typing import List, Dict, Any, Callable, Optional
+
+from arango.database import StandardDatabase
+
+from app.services.aql import execute_aql
+from app.services.audit_counters import AUDIT_COUNTERS_COLLECTION
+from app.services.audit_delta import record_topology_version, removed_keys
+from app.services.audit_writer import make_audit_entry, audit_partition_for, insert_audit_entry
+from app.services.topology_diff import content_hash
+from app.services.topology_revision import bump_revision, TOPOLOGY_CHANGES_COLLECTION
+from app.services.timestamps import utc_now
+from app.services.transactions import run_in_transaction
+
+# Brisanje konekcija (incidentnih uređajima koji se brišu i eksplicitno zadatih)
+# i brisanje IP adrese/maske na portovima preostalih uređaja na drugom kraju
+CASCADE_QUERY = """
+LET device_ids = (FOR key IN @device_keys RETURN CONCAT('devices/', key))
+
+LET deleted_devices = (
+    FOR d IN devices
+        FILTER d._key IN @device_keys
+        RETURN d
+)
+
+LET incident = UNION_DISTINCT(
+    (FOR e IN connections FILTER e._from IN device_ids RETURN e),
+    (FOR e IN connections FILTER e._to IN device_ids RETURN e),
+    (FOR e IN connections FILTER e._key IN @connection_keys RETURN e)
+)
+
+// Portovi koje treba očistiti, grupisani po uređaju koji ostaje
+LET clears = (
+    FOR e IN incident
+        FOR side IN [{id: e._from, port: e.src_port}, {id: e._to, port: e.dst_port}]
+            FILTER side.id NOT IN device_ids
+            COLLECT device_id = side.id INTO ports = side.port
+            RETURN {device_id: device_id, ports: ports}
+)
+
+LET updated_devices = (
+    FOR c IN clears
+        LET d = DOCUMENT(c.device_id)
+        FILTER d != null AND IS_ARRAY(d.ports)
+        FILTER LENGTH(FOR p IN d.ports FILTER p.name IN c.ports AND p.ip_address RETURN 1) > 0
+        UPDATE d WITH {
+            ports: (
+                FOR p IN d.ports
+                    RETURN (p.name IN c.ports AND p.ip_address)
+                        ? MERGE(p, {ip_address: "", subnet_mask: ""})
+                        : p
+            )
+        } IN devices
+        RETURN NEW
+)
+
+LET removed_connections = (
+    FOR e IN incident
+        REMOVE e IN connections
+        RETURN OLD
+)
+
+RETURN {
+    deleted_devices: deleted_devices,
+    updated_devices: updated_devices,
+    removed_connections: removed_connections
+}
+"""
+
+REMOVE_DEVICES_QUERY = "FOR key IN @keys REMOVE key IN devices"
+
+
+class EntityNotFound(LookupError):
+    """Neki od zadatih uređaja ili konekcija ne postoji (transakcija je poništena)"""
+
+    def __init__(self, entity_type: str, keys: List[str]):
+        self.entity_type = entity_type
+        self.keys = keys
+        super().__init__(f"{entity_type.capitalize()} not found: {', '.join(keys)}")
+
+
+def cascade_delete(db: StandardDatabase, device_keys: List[str] = (), connection_keys: List[str] = (),
+                   strict: bool = True,
+                   audit: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Atomsko brisanje uređaja (sa svim njihovim konekcijama) i pojedinačnih konekcija
+
+    Argumenti:
+        db: Baza podataka
+        device_keys: Ključevi uređaja za brisanje
+        connection_keys: Ključevi konekcija za brisanje
+        strict: Ako neki ključ ne postoji, ništa se ne briše (EntityNotFound)
+        audit: Funkcija koja od rezultata pravi 'action', 'entity_type', 'entity_id'
+            i 'entity_data' audit unosa; unos (sa verzijom topologije) se upisuje
+            u istoj transakciji kao i brisanje
+
+    Vraća:
+        Rečnik sa listama 'deleted_devices', 'updated_devices' (susedi sa
+        obrisanim IP adresama i novim content_hash) i 'removed_connections'
+        i 'revision' (nova revizija topologije, None ako ništa nije obrisano)
+    """
+    device_keys = list(dict.fromkeys(device_keys))
+    connection_keys = list(dict.fromkeys(connection_keys))
+    write = ['devices', 'connections', AUDIT_COUNTERS_COLLECTION, TOPOLOGY_CHANGES_COLLECTION]
+    if audit is not None:
+        timestamp = utc_now()
+        audit_partition = audit_partition_for(db, timestamp)
+        write.append(audit_partition)
+
+    def work(txn: StandardDatabase) -> Dict[str, Any]:
+        result = next(execute_aql(txn, 'cascade_delete', CASCADE_QUERY, bind_vars={
+            'device_keys': device_keys,
+            'connection_keys': connection_keys
+        }))
+
+        if strict:
+            found_devices = {d['_key'] for d in result['deleted_devices']}
+            missing = [key for key in device_keys if key not in found_devices]
+            if missing:
+                raise EntityNotFound('device', missing)
+            removed = {c['_key'] for c in result['removed_connections']}
+            missing = [key for key in connection_keys if key not in removed]
+            if missing:
+                raise EntityNotFound('connection', missing)
+
+        # Heš sadržaja se računa isto kao pri čuvanju topologije
+        updated = result['updated_devices']
+        for device in updated:
+            device['content_hash'] = content_hash(device)
+        if updated:
+            txn.collection('devices').update_many(
+                [{'_key': d['_key'], 'content_hash': d['content_hash']} for d in updated]
+            )
+
+        found_keys = [d['_key'] for d in result['deleted_devices']]
+        if found_keys:
+            execute_aql(txn, 'cascade_delete.devices', REMOVE_DEVICES_QUERY, bind_vars={'keys': found_keys})
+
+        removed_connection_keys = [c['_key'] for c in result['removed_connections']]
+        if found_keys or removed_connection_keys or updated:
+            result['revision'] = bump_revision(
+                txn,
+                upserted_devices=[d['_key'] for d in updated],
+                removed_devices=found_keys,
+                removed_connections=removed_connection_keys
+            )
+        else:
+            result['revision'] = None
+
+        if audit is not None:
+            entry = audit(result)
+            # Nova verzija topologije ako su uklonjeni uređaji ili konekcije
+            topology_version = record_topology_version(
+                txn, removed_keys(found_keys), removed_keys(removed_connection_keys)
+            )
+            insert_audit_entry(txn, audit_partition, make_audit_entry(
+                entry['action'], entry['entity_type'], entry['entity_id'],
+                {**entry['entity_data'], **topology_version}, db.name, timestamp
+            ))
+        return result
+
+    # Pri konfliktu sa istovremenim upisom (dokument revizije) brisanje se ponavlja
+    return run_in_transaction(db, write, work)
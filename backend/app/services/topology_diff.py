@@ -0,0 +1,107 @@
+# backend/app/services/topology_diff.py
+"""
+Inkrementalno čuvanje topologije
+Poređenje pristigle topologije sa stanjem u bazi na osnovu _key-a i heša sadržaja
+"""
+
+import hashlib
+import json
+from typing import List, Dict, Any
+
+# Polja koja ne ulaze u heš sadržaja (vremenske oznake i sam heš)
+HASH_EXCLUDED_FIELDS = ('created_at', 'updated_at', 'content_hash', '_id', '_rev')
+
+
+def content_hash(document: Dict[str, Any]) -> str:
+    """
+    Računanje stabilnog heša sadržaja dokumenta
+
+    Argumenti:
+        document: Rečnik uređaja ili konekcije (izlaz model_dump)
+
+    Vraća:
+        SHA1 heš kanonskog JSON zapisa kao heksadecimalni string
+    """
+    payload = {k: v for k, v in document.items() if k not in HASH_EXCLUDED_FIELDS}
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+def diff_documents(incoming: List[Dict[str, Any]], existing: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Razvrstavanje pristiglih dokumenata na nove, izmenjene, nepromenjene i obrisane
+
+    Argumenti:
+        incoming: Lista dokumenata iz zahteva (svaki sa '_key')
+        existing: Mapa _key -> {'content_hash': ..., 'created_at': ...} iz baze
+
+    Vraća:
+        Rečnik sa listama 'insert', 'update', 'remove' (ključevi) i brojem 'unchanged'
+    """
+    to_insert = []
+    to_update = []
+    unchanged = 0
+    seen_keys = set()
+
+    for doc in incoming:
+        key = doc['_key']
+        seen_keys.add(key)
+        doc['content_hash'] = content_hash(doc)
+
+        stored = existing.get(key)
+        if stored is None:
+            to_insert.append(doc)
+        elif stored.get('content_hash') != doc['content_hash']:
+            # Zadržavanje originalnog vremena kreiranja
+            if stored.get('created_at'):
+                doc['created_at'] = stored['created_at']
+            to_update.append(doc)
+        else:
+            unchanged += 1
+
+    to_remove = [key for key in existing if key not in seen_keys]
+
+    return {
+        'insert': to_insert,
+        'update': to_update,
+        'remove': to_remove,
+        'unchanged': unchanged
+    }
+
+
+def find_port_conflicts(connections: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Pronalazak portova na koje je povezano više kablova
+
+    Port uređaja se računa bez obzira na smer konekcije (src_port na _from
+    strani ili dst_port na _to strani), što jedinstveni indeksi u bazi ne
+    mogu da izraze jer pokrivaju samo po jedan smer.
+
+    Argumenti:
+        connections: Lista konekcija (sa _key, _from, _to, src_port, dst_port)
+
+    Vraća:
+        Listu konflikata {'device', 'port', 'connections'}; prazna ako ih nema
+    """
+    usage: Dict[tuple, List[str]] = {}
+    for conn in connections:
+        for device_id, port in ((conn['_from'], conn.get('src_port')), (conn['_to'], conn.get('dst_port'))):
+            if port:
+                usage.setdefault((device_id, port), []).append(conn['_key'])
+
+    return [
+        {'device': device_id.split('/')[-1], 'port': port, 'connections': keys}
+        for (device_id, port), keys in usage.items()
+        if len(keys) > 1
+    ]
+
+
+def summarize_diff(diff: Dict[str, Any]) -> Dict[str, int]:
+    """Brojevi izmena za odgovor API-ja"""
+    return {
+        'inserted': len(diff['insert']),
+        'updated': len(diff['update']),
+        'removed': len(diff['remove']),
+        'unchanged': diff['unchanged']
+    }
+
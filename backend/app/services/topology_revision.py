@@ -0,0 +1,169 @@
+# backend/app/services/topology_revision.py
+"""
+Revizija topologije po bazi podataka
+Brojač koji raste pri svakom upisu koji menja uređaje ili konekcije (čuvanje,
+brisanje). Uvećava se u istoj transakciji kao i sam upis, a čitaoci ga vraćaju
+kao ETag i na If-None-Match odgovaraju sa 304 bez čitanja topologije.
+
+Uz svaku reviziju se u topology_changes beleže ključevi izmenjenih i obrisanih
+uređaja i konekcija, tako da klijent može da preuzme samo izmene od revizije
+koju već ima (GET /api/graph/changes?since=N). Čuva se poslednjih
+TOPOLOGY_CHANGES_RETENTION revizija; za stariju reviziju klijent učitava sve.
+"""
+
+import os
+from typing import List, Dict, Any, Iterable, Optional, NamedTuple
+
+from arango.database import StandardDatabase
+
+from app.services.aql import execute_aql
+from app.services.audit_counters import AUDIT_COUNTERS_COLLECTION
+from app.services.timestamps import utc_now
+
+# Dokument sa brojačem u kolekciji audit_counters
+REVISION_KEY = 'topology_revision'
+# Kolekcija izmena po reviziji (jedan dokument po reviziji)
+TOPOLOGY_CHANGES_COLLECTION = 'topology_changes'
+# Broj poslednjih revizija za koje se čuvaju izmene
+TOPOLOGY_CHANGES_RETENTION = int(os.getenv('TOPOLOGY_CHANGES_RETENTION', '1000'))
+
+# Uvećanje brojača; epoch se upisuje samo pri prvom upisu u bazu
+BUMP_QUERY = """
+UPSERT { _key: @key }
+    INSERT { _key: @key, revision: 1, epoch: DATE_NOW() }
+    UPDATE { revision: OLD.revision + 1 }
+    IN @@counters
+    RETURN NEW
+"""
+
+# Izmene starije od perioda čuvanja (indeks na revision)
+PRUNE_QUERY = """
+FOR c IN @@changes
+    FILTER c.revision <= @cutoff
+    REMOVE c IN @@changes
+"""
+
+CHANGES_QUERY = """
+FOR c IN @@changes
+    FILTER c.revision > @since AND c.revision <= @until
+    SORT c.revision
+    RETURN KEEP(c, 'revision', 'devices', 'connections')
+"""
+
+# Trenutni dokumenti po ključu (primarni indeks); obrisani se ne vraćaju
+DOCUMENTS_QUERY = """
+FOR key IN @keys
+    LET doc = DOCUMENT(@@collection, key)
+    FILTER doc != null
+    RETURN doc
+"""
+
+
+class Revision(NamedTuple):
+    """Trenutna revizija topologije baze"""
+    number: int
+    # Trenutak prvog upisa (ms) - razlikuje ponovo kreiranu bazu istog imena sa istim brojem revizije
+    epoch: int
+
+    def etag(self, db_name: str) -> str:
+        # Slab ETag: isti sadržaj se šalje i nekompresovan i kompresovan
+        return f'W/"{db_name}-{self.epoch}-{self.number}"'
+
+
+def read_revision(db: StandardDatabase) -> Revision:
+    """Trenutna revizija (jedno čitanje dokumenta po ključu); baza bez upisa ima reviziju 0"""
+    doc = db.collection(AUDIT_COUNTERS_COLLECTION).get(REVISION_KEY)
+    if doc is None:
+        return Revision(0, 0)
+    return Revision(doc['revision'], doc.get('epoch', 0))
+
+
+def bump_revision(txn: StandardDatabase, upserted_devices: Iterable[str] = (), removed_devices: Iterable[str] = (),
+                  upserted_connections: Iterable[str] = (), removed_connections: Iterable[str] = ()) -> int:
+    """
+    Uvećanje revizije i beleženje njenih izmena unutar transakcije upisa
+
+    Argumenti:
+        txn: Transakcija (mora imati audit_counters i topology_changes u skupu za upis)
+        upserted_devices, removed_devices: Ključevi dodatih/izmenjenih i obrisanih uređaja
+        upserted_connections, removed_connections: Isto za konekcije
+
+    Vraća:
+        Novi broj revizije
+    """
+    doc = next(execute_aql(txn, 'topology_revision.bump', BUMP_QUERY, bind_vars={
+        'key': REVISION_KEY,
+        '@counters': AUDIT_COUNTERS_COLLECTION
+    }))
+    revision = doc['revision']
+
+    txn.collection(TOPOLOGY_CHANGES_COLLECTION).insert({
+        '_key': str(revision),
+        'revision': revision,
+        'timestamp': utc_now(),
+        'devices': {'upserted': list(upserted_devices), 'removed': list(removed_devices)},
+        'connections': {'upserted': list(upserted_connections), 'removed': list(removed_connections)}
+    })
+    if revision > TOPOLOGY_CHANGES_RETENTION:
+        execute_aql(txn, 'topology_changes.prune', PRUNE_QUERY, bind_vars={
+            'cutoff': revision - TOPOLOGY_CHANGES_RETENTION,
+            '@changes': TOPOLOGY_CHANGES_COLLECTION
+        })
+    return revision
+
+
+def _current_documents(db: StandardDatabase, collection: str, keys: List[str]) -> List[Dict[str, Any]]:
+    if not keys:
+        return []
+    return list(execute_aql(db, 'topology_changes.documents', DOCUMENTS_QUERY, bind_vars={
+        'keys': keys,
+        '@collection': collection
+    }))
+
+
+def read_changes(db: StandardDatabase, since: int, until: int) -> Optional[Dict[str, Any]]:
+    """
+    Izmene topologije posle revizije since, zaključno sa until
+
+    Ključ izmenjen više puta se vraća jednom, sa trenutnim sadržajem (ili kao
+    obrisan ako dokument više ne postoji). Sadržaj može biti i noviji od until -
+    ponovljena primena iste izmene na klijentu je bezopasna.
+
+    Vraća:
+        Rečnik 'devices', 'connections' (trenutni dokumenti), 'removed_devices' i
+        'removed_connections' (ključevi), ili None ako izmene nisu sačuvane za ceo
+        opseg (klijent treba da učita celu topologiju)
+    """
+    entries = list(execute_aql(db, 'topology_changes.since', CHANGES_QUERY, bind_vars={
+        'since': since,
+        'until': until,
+        '@changes': TOPOLOGY_CHANGES_COLLECTION
+    }))
+    if [entry['revision'] for entry in entries] != list(range(since + 1, until + 1)):
+        return None
+
+    result = {}
+    for section, collection in (('devices', 'devices'), ('connections', 'connections')):
+        # Redosled prve pojave ključa, bez duplikata
+        touched = list(dict.fromkeys(
+            key for entry in entries for part in ('upserted', 'removed') for key in entry[section][part]
+        ))
+        documents = _current_documents(db, collection, touched)
+        present = {doc['_key'] for doc in documents}
+        result[section] = documents
+        result[f'removed_{section}'] = [key for key in touched if key not in present]
+    return result
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Poređenje If-None-Match zaglavlja sa ETag-om (slabo poređenje, više vrednosti, '*')"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith('W/') else tag
+
+    return opaque(etag) in {opaque(tag) for tag in if_none_match.split(',')}
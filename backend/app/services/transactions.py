@@ -0,0 +1,68 @@
+# backend/app/services/transactions.py
+"""
+Stream transakcije sa ponavljanjem pri konfliktu upisa
+Svaki upis topologije menja isti dokument revizije u audit_counters, pa dve
+istovremene transakcije dobijaju konflikt (ERR 1200) na tom dokumentu. Server
+tada poništava transakciju; ceo posao se ponavlja u novoj transakciji, sa
+kratkim slučajnim čekanjem da se upisi ne bi ponovo sudarili.
+"""
+
+import os
+import random
+import time
+from typing import Callable, List, TypeVar
+
+from arango.database import StandardDatabase
+from arango.exceptions import ArangoServerError
+
+# ArangoDB kod greške za konflikt upisa (write-write conflict)
+WRITE_CONFLICT = 1200
+# Broj pokušaja transakcije pri konfliktu
+TRANSACTION_ATTEMPTS = int(os.getenv('TRANSACTION_ATTEMPTS', '5'))
+# Osnovno čekanje (u sekundama) pre ponavljanja; udvostručuje se po pokušaju
+TRANSACTION_RETRY_DELAY = float(os.getenv('TRANSACTION_RETRY_DELAY', '0.02'))
+
+T = TypeVar('T')
+
+
+def is_write_conflict(error: Exception) -> bool:
+    """Da li je greška konflikt upisa sa drugom transakcijom"""
+    return isinstance(error, ArangoServerError) and error.error_code == WRITE_CONFLICT
+
+
+def run_in_transaction(db: StandardDatabase, write: List[str], work: Callable[[StandardDatabase], T],
+                       attempts: int = TRANSACTION_ATTEMPTS) -> T:
+    """
+    Izvršavanje posla u stream transakciji, ponovo pri konfliktu upisa
+
+    Posao se pri svakom pokušaju izvršava iz početka, nad novom transakcijom,
+    pa sva čitanja mora da radi kroz prosleđenu transakciju.
+
+    Argumenti:
+        db: Baza podataka
+        write: Kolekcije u skupu za upis
+        work: Funkcija koja prima transakciju i vraća rezultat (bez potvrde)
+        attempts: Najveći broj pokušaja
+
+    Vraća:
+        Rezultat funkcije work iz potvrđene transakcije
+
+    Izuzeci:
+        Greška posla ili potvrde; konflikt upisa tek posle poslednjeg pokušaja
+    """
+    attempts = max(1, attempts)
+    for attempt in range(1, attempts + 1):
+        txn = db.begin_transaction(write=write)
+        try:
+            result = work(txn)
+            txn.commit_transaction()
+            return result
+        except Exception as e:
+            try:
+                txn.abort_transaction()
+            except Exception:
+                # Server je transakciju već poništio (konflikt) - prijavljuje se prvobitna greška
+                pass
+            if not is_write_conflict(e) or attempt == attempts:
+                raise
+        time.sleep(random.uniform(0, TRANSACTION_RETRY_DELAY * 2 ** (attempt - 1)))
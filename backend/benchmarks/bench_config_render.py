@@ -0,0 +1,51 @@
+# backend/benchmarks/bench_config_render.py
+"""
+Merenje renderovanja konfiguracije: serijski naspram paralelnog (pul procesa)
+
+Pokretanje (iz backend direktorijuma):
+    python -m benchmarks.bench_config_render --devices 20000 --workers 4
+"""
+
+import argparse
+import os
+import time
+
+from app.services.config_generator import generate_config_from_graph, shutdown_render_pool
+from benchmarks.synthetic import port_connection_map
+
+
+def measure(devices, format, workers, repeat):
+    best = None
+    output = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = generate_config_from_graph(devices, format, workers)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--devices', type=int, default=20000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    devices = port_connection_map(args.devices)
+    print(f"devices={args.devices} workers={args.workers} (best of {args.repeat})")
+    print(f"{'format':<10}{'serial [s]':>12}{'parallel [s]':>14}{'speedup':>10}  identical")
+
+    try:
+        for format in ('cisco', 'diagram', 'json'):
+            serial, serial_output = measure(devices, format, 0, args.repeat)
+            parallel, parallel_output = measure(devices, format, args.workers, args.repeat)
+            # Vremenska oznaka u zaglavlju se razlikuje između poziva, pa se poredi ostatak
+            identical = serial_output.split('\n', 3)[-1] == parallel_output.split('\n', 3)[-1]
+            print(f"{format:<10}{serial:>12.3f}{parallel:>14.3f}{serial / parallel:>9.2f}x  {identical}")
+    finally:
+        shutdown_render_pool()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+# backend/benchmarks/bench_port_connection_map.py
+"""
+Merenje mape povezivanja portova: graf prolaz po uređaju naspram spajanja u jednom prolazu
+
+Potrebna je pokrenuta ArangoDB instanca (ARANGO_HOST, ARANGO_USER, ARANGO_PASSWORD iz .env).
+Skripta pravi privremenu bazu, puni je sintetičkom topologijom i briše je na kraju.
+
+Pokretanje (iz backend direktorijuma):
+    python -m benchmarks.bench_port_connection_map --devices 5000
+"""
+
+import argparse
+import time
+
+from app.database import create_database, delete_database
+from app.services.graph_service import GraphService
+from benchmarks.synthetic import raw_topology
+
+BENCH_DB_NAME = 'netgraph_bench_port_map'
+
+
+def normalize(entries):
+    """Poređenje nezavisno od redosleda uređaja i konekcija"""
+    result = {}
+    for entry in entries:
+        connections = sorted(entry['connections'], key=lambda c: (c['neighbor_key'], c['my_port'], c['neighbor_port']))
+        result[entry['_key']] = dict(entry, connections=connections)
+    return result
+
+
+def measure(func, repeat):
+    best = None
+    output = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = list(func())
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--devices', type=int, default=5000)
+    parser.add_argument('--links', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    db = create_database(BENCH_DB_NAME)
+    try:
+        devices, connections = raw_topology(args.devices, args.links)
+        db.collection('devices').truncate()
+        db.collection('connections').truncate()
+        db.collection('devices').import_bulk(devices)
+        db.collection('connections').import_bulk(connections)
+
+        service = GraphService(db)
+        traversal, traversal_output = measure(service.iter_port_connection_map_traversal, args.repeat)
+        join, join_output = measure(service.iter_port_connection_map, args.repeat)
+
+        print(f"devices={len(devices)} connections={len(connections)} (best of {args.repeat})")
+        print(f"traversal per device : {traversal:8.3f} s")
+        print(f"single-pass join     : {join:8.3f} s  ({traversal / join:.1f}x)")
+        print(f"identical output     : {normalize(traversal_output) == normalize(join_output)}")
+    finally:
+        delete_database(BENCH_DB_NAME)
+
+
+if __name__ == '__main__':
+    main()
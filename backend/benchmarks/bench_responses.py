@@ -0,0 +1,63 @@
+# backend/benchmarks/bench_responses.py
+"""
+Merenje kodiranja i kompresije odgovora /api/graph/topology
+
+Poredi podrazumevanu FastAPI putanju (jsonable_encoder + JSONResponse) sa
+FastJSONResponse (orjson) i veličinu tela na žici bez kompresije, sa gzip
+i sa brotli kompresijom (nivoi iz COMPRESSION_* podešavanja).
+
+Pokretanje (iz backend direktorijuma):
+    python -m benchmarks.bench_responses --shape leaf-spine --devices 1000 10000 20000
+"""
+
+import argparse
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.services.responses import FastJSONResponse, compress, brotli
+from benchmarks.synthetic import TOPOLOGY_SHAPES, generate_topology
+
+
+def best_of(func, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--shape', choices=list(TOPOLOGY_SHAPES), default='leaf-spine')
+    parser.add_argument('--devices', type=int, nargs='+', default=[1000, 10000, 20000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    encodings = ['gzip', 'br'] if brotli is not None else ['gzip']
+    print(f"shape={args.shape} (best of {args.repeat}){'' if brotli else ' - brotli not installed'}")
+    print(f"{'devices':>8}{'default [s]':>13}{'orjson [s]':>12}{'speedup':>9}{'identity':>12}"
+          + ''.join(f"{name + ' [B]':>12}{name + ' [s]':>10}" for name in encodings))
+
+    for size in args.devices:
+        devices, connections = generate_topology(args.shape, size, args.seed)
+        content = {"topology": {"devices": devices, "connections": connections}}
+
+        default_time, default_body = best_of(lambda: JSONResponse(jsonable_encoder(content)).body, args.repeat)
+        fast_time, fast_body = best_of(lambda: FastJSONResponse(content).body, args.repeat)
+
+        line = (f"{len(devices):>8}{default_time:>13.4f}{fast_time:>12.4f}{default_time / fast_time:>8.1f}x"
+                f"{len(fast_body):>12}")
+        for encoding in encodings:
+            compress_time, compressed = best_of(lambda: compress(fast_body, encoding), args.repeat)
+            line += f"{len(compressed):>12}{compress_time:>10.4f}"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,314 @@
+# backend/benchmarks/bench_suite.py
+"""
+Skup merenja glavnih putanja backend-a nad sintetičkim topologijama
+
+Slučajevi bez baze rade u procesu, nad istim strukturama koje API koristi
+(validacija i diff pri čuvanju, TopologySnapshot, PathEngine, ConfigGenerator).
+Sa --db se dodaju slučajevi koji idu kroz FastAPI aplikaciju nad privremenom
+bazom na lokalnom ArangoDB-u (ARANGO_HOST, ARANGO_USER, ARANGO_PASSWORD iz .env).
+
+Rezultati se mogu sačuvati kao osnova (--save-baseline) i kasnije porediti sa
+njom (--compare); poređenje vraća izlazni kod 1 ako je neki slučaj sporiji od
+osnove za više od --threshold.
+
+Pokretanje (iz backend direktorijuma):
+    python -m benchmarks.bench_suite --shape leaf-spine --devices 1000 10000
+    python -m benchmarks.bench_suite --shape fat-tree --k 16 --db
+    python -m benchmarks.bench_suite --save-baseline
+    python -m benchmarks.bench_suite --compare --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import List, Dict, Callable, Optional, Tuple
+
+from benchmarks.synthetic import TOPOLOGY_SHAPES, generate_topology, mutate_topology
+
+BENCH_DB_NAME = 'netgraph_bench_suite'
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+
+class Workload:
+    """Sintetička topologija i izvedeni podaci, računaju se jednom po veličini"""
+
+    def __init__(self, shape: str, devices: int, seed: int, **options):
+        self.shape = shape
+        self.devices, self.connections = generate_topology(shape, devices, seed, **options)
+        self._snapshot = None
+        self._port_map = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.shape}/{len(self.devices)}"
+
+    def payload(self, devices: Optional[List[Dict]] = None, connections: Optional[List[Dict]] = None) -> Dict:
+        return {'devices': devices or self.devices, 'connections': connections or self.connections}
+
+    def snapshot(self):
+        from app.services.topology_cache import TopologySnapshot
+        if self._snapshot is None:
+            self._snapshot = TopologySnapshot(self.devices, self.connections)
+        return self._snapshot
+
+    def port_map(self) -> List[Dict]:
+        if self._port_map is None:
+            self._port_map = self.snapshot().get_port_connection_map()
+        return self._port_map
+
+    def path_endpoints(self) -> Tuple[str, str]:
+        """Prvi i poslednji server - putanja prolazi kroz ceo fabrik"""
+        servers = [d['_key'] for d in self.devices if d['device_type'] == 'server']
+        return servers[0], servers[-1]
+
+
+# Slučaj: (workload) -> (priprema pre svakog merenja ili None, mereni poziv)
+Case = Callable[[Workload], Tuple[Optional[Callable[[], None]], Callable[[], object]]]
+
+
+def case_save_validate_diff(workload: Workload):
+    """Python deo save_topology: parsiranje tela, validacija, provera portova i diff sa 1% izmena"""
+    from app.main import TopologySave, topology_save_validator
+    from app.services.bulk_ingest import parse_body
+    from app.services.topology_diff import content_hash, diff_documents, find_port_conflicts
+
+    existing_devices = {d['_key']: {'content_hash': content_hash(d)} for d in workload.devices}
+    existing_connections = {c['_key']: {'content_hash': content_hash(c)} for c in workload.connections}
+    body = json.dumps(workload.payload(*mutate_topology(workload.devices, workload.connections))).encode()
+
+    def run():
+        topology = parse_body(body, 'application/json', TopologySave, topology_save_validator)
+        devices_list = topology['devices']
+        connections_list = topology['connections']
+        find_port_conflicts(connections_list)
+        return diff_documents(devices_list, existing_devices), diff_documents(connections_list, existing_connections)
+    return None, run
+
+
+def case_snapshot_build(workload: Workload):
+    """Izgradnja snimka topologije (lista susedstva) iz dokumenata"""
+    from app.services.topology_cache import TopologySnapshot
+    return None, lambda: TopologySnapshot(workload.devices, workload.connections)
+
+
+def case_port_connection_map(workload: Workload):
+    """Mapa povezivanja portova iz snimka u memoriji"""
+    from app.services.topology_cache import TopologySnapshot
+
+    def run():
+        return TopologySnapshot(workload.devices, workload.connections).get_port_connection_map()
+    return None, run
+
+
+def case_config_render(workload: Workload):
+    """Cisco konfiguracija za sve uređaje (serijski)"""
+    from app.services.config_generator import generate_config_from_graph
+    devices = workload.port_map()
+    return None, lambda: generate_config_from_graph(devices, 'cisco')
+
+
+def case_path_analysis(workload: Workload):
+    """Najkraća, najjeftinija i 5 alternativnih putanja između udaljenih servera"""
+    from app.services.path_engine import PathEngine
+    source, target = workload.path_endpoints()
+    engine = PathEngine(workload.snapshot())
+
+    def run():
+        return (engine.shortest_path(source, target), engine.cheapest_path(source, target),
+                engine.k_shortest_paths(source, target, 7))
+    return None, run
+
+
+class DatabaseCases:
+    """Slučajevi kroz FastAPI aplikaciju nad privremenom bazom"""
+
+    def __init__(self):
+        from fastapi.testclient import TestClient
+        from app.database import create_database, DATABASE_HEADER
+        from app.main import app
+
+        self.db = create_database(BENCH_DB_NAME)
+        self.client = TestClient(app)
+        self.client.headers[DATABASE_HEADER] = BENCH_DB_NAME
+
+    def close(self):
+        from app.database import delete_database
+        from app.services.audit_writer import audit_writer
+        audit_writer.flush()
+        delete_database(BENCH_DB_NAME)
+
+    def _post(self, url: str, payload: Dict):
+        response = self.client.post(url, json=payload)
+        response.raise_for_status()
+        return response.json()
+
+    def _get(self, url: str, **params):
+        response = self.client.get(url, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    def _truncate(self):
+        for name in ('devices', 'connections'):
+            self.db.collection(name).truncate()
+
+    def _load(self, workload: Workload):
+        self._truncate()
+        self._post('/api/topology/save', workload.payload())
+
+    def save_full(self, workload: Workload):
+        """POST /api/topology/save u praznu bazu"""
+        payload = workload.payload()
+        return self._truncate, lambda: self._post('/api/topology/save', payload)
+
+    def save_incremental(self, workload: Workload):
+        """POST /api/topology/save sa 1% izmenjenih dokumenata"""
+        payload = workload.payload()
+        changed = workload.payload(*mutate_topology(workload.devices, workload.connections))
+        self._load(workload)
+        return lambda: self._post('/api/topology/save', payload), lambda: self._post('/api/topology/save', changed)
+
+    def port_connection_map(self, workload: Workload):
+        """GraphService.get_port_connection_map (AQL spajanje u jednom prolazu)"""
+        from app.services.graph_service import GraphService
+        self._load(workload)
+        service = GraphService(self.db)
+        return None, service.get_port_connection_map
+
+    def statistics(self, workload: Workload):
+        """GET /api/statistics/network bez keša izvedenih rezultata"""
+        from app.services.topology_cache import topology_cache
+        self._load(workload)
+        return topology_cache.clear, lambda: self._get('/api/statistics/network')
+
+    def path_analysis(self, workload: Workload):
+        """GET /api/paths/analyze uključujući učitavanje snimka topologije"""
+        from app.services.topology_cache import topology_cache
+        self._load(workload)
+        source, target = workload.path_endpoints()
+        return topology_cache.clear, lambda: self._get('/api/paths/analyze', source_key=source, target_key=target)
+
+    def cases(self) -> Dict[str, Case]:
+        return {
+            'db_save_full': self.save_full,
+            'db_save_incremental': self.save_incremental,
+            'db_port_connection_map': self.port_connection_map,
+            'db_statistics': self.statistics,
+            'db_path_analysis': self.path_analysis,
+        }
+
+
+IN_PROCESS_CASES: Dict[str, Case] = {
+    'save_validate_diff': case_save_validate_diff,
+    'snapshot_build': case_snapshot_build,
+    'port_connection_map': case_port_connection_map,
+    'config_render': case_config_render,
+    'path_analysis': case_path_analysis,
+}
+
+
+def measure(setup: Optional[Callable[[], None]], run: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Vreme izvršavanja u sekundama (priprema se ne meri)"""
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return {'min': min(times), 'median': statistics.median(times), 'max': max(times), 'rounds': repeat}
+
+
+def load_baseline(path: str) -> Dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f).get('results', {})
+
+
+def save_baseline(path: str, results: Dict[str, Dict[str, float]]):
+    """Spajanje rezultata sa postojećom osnovom (slučajevi koji nisu mereni ostaju)"""
+    merged = load_baseline(path)
+    merged.update(results)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'created_at': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'machine': platform.platform(),
+            'results': dict(sorted(merged.items()))
+        }, f, indent=2)
+    print(f"Baseline saved to {path} ({len(results)} results)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--shape', choices=list(TOPOLOGY_SHAPES), action='append',
+                        help='Oblik topologije (može više puta; podrazumevano leaf-spine)')
+    parser.add_argument('--devices', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--k', type=int, help='k za fat-tree (zamenjuje --devices)')
+    parser.add_argument('--case', action='append', help='Samo zadati slučajevi (može više puta)')
+    parser.add_argument('--db', action='store_true', help='Uključi slučajeve nad ArangoDB-om')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--compare', action='store_true')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Dozvoljeno usporenje medijane (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    cases: Dict[str, Case] = dict(IN_PROCESS_CASES)
+    database = None
+    if args.db:
+        database = DatabaseCases()
+        cases.update(database.cases())
+    if args.case:
+        unknown = [name for name in args.case if name not in cases]
+        if unknown:
+            parser.error(f"Unknown cases: {', '.join(unknown)} (available: {', '.join(cases)})")
+        cases = {name: cases[name] for name in args.case}
+
+    baseline = load_baseline(args.baseline) if args.compare else {}
+    results: Dict[str, Dict[str, float]] = {}
+    regressions = []
+
+    print(f"{'case':<26}{'topology':<22}{'min [s]':>10}{'median [s]':>12}{'baseline':>10}{'change':>9}")
+    try:
+        for shape in args.shape or ['leaf-spine']:
+            sizes = [None] if shape == 'fat-tree' and args.k else args.devices
+            for size in sizes:
+                options = {'k': args.k} if size is None else {}
+                workload = Workload(shape, size or 0, args.seed, **options)
+                for name, case in cases.items():
+                    setup, run = case(workload)
+                    result = measure(setup, run, args.repeat)
+                    key = f"{name}/{workload.name}"
+                    results[key] = result
+
+                    line = f"{name:<26}{workload.name:<22}{result['min']:>10.4f}{result['median']:>12.4f}"
+                    reference = baseline.get(key)
+                    if reference:
+                        change = result['median'] / reference['median'] - 1
+                        line += f"{reference['median']:>10.4f}{change:>+8.0%}"
+                        if change > args.threshold:
+                            regressions.append((key, change))
+                            line += "  ⚠️"
+                    print(line)
+    finally:
+        if database is not None:
+            database.close()
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+    if regressions:
+        print(f"⚠️ {len(regressions)} regressions over {args.threshold:.0%}:")
+        for key, change in regressions:
+            print(f"  {key}: {change:+.0%}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,509 @@
+# backend/benchmarks/synthetic.py
+"""
+Sintetički podaci za merenja - uređaji u formatu GraphService.get_port_connection_map()
+i realistične topologije (leaf-spine, fat-tree, kampus, hub-and-spoke) u formatu
+zahteva POST /api/topology/save
+"""
+
+import copy
+import math
+import random
+from typing import List, Dict, Optional, Tuple, Callable
+
+
+def port_connection_map(device_count: int, links_per_device: int = 4, seed: int = 42) -> List[Dict]:
+    """
+    Generisanje mape povezivanja portova za zadati broj uređaja
+
+    Argumenti:
+        device_count: Broj uređaja
+        links_per_device: Prosečan broj konekcija po uređaju
+        seed: Seme generatora slučajnih brojeva (ponovljivi rezultati)
+
+    Vraća:
+        Listu uređaja sa konekcijama, portovima, VLAN-ovima i statičkim rutama
+    """
+    rng = random.Random(seed)
+    types = ['router', 'switch', 'l3_switch', 'server']
+    speeds = ['1G', '10G', '25G', '100M']
+
+    devices = []
+    for i in range(device_count):
+        device_type = rng.choice(types)
+        ports = []
+        for p in range(links_per_device + 2):
+            ports.append({
+                'name': f'GigabitEthernet0/{p}',
+                'type': 'ethernet',
+                'ip_address': f'10.{i // 250 % 250}.{i % 250}.{p + 1}' if device_type != 'switch' else None,
+                'subnet_mask': '255.255.255.0',
+                'mode': 'trunk' if device_type == 'switch' and p % 2 else ('access' if device_type == 'switch' else None),
+                'vlan': '10,20,30' if device_type == 'switch' else None,
+                'is_routed': device_type == 'l3_switch' and p == 0
+            })
+        ports.append({'name': 'Loopback0', 'type': 'loopback', 'ip_address': f'192.168.{i % 250}.1'})
+
+        devices.append({
+            '_key': f'dev{i}',
+            'hostname': f'{device_type}-{i}',
+            'device_type': device_type,
+            'ip_address': f'172.16.{i // 250 % 250}.{i % 250}',
+            'mac_address': None,
+            'subnet_mask': '255.255.255.0',
+            'gateway': None,
+            'router_id': f'1.1.{i // 250 % 250}.{i % 250}',
+            'ports': ports,
+            'vlans': [{'vlan_id': v, 'name': f'VLAN{v}'} for v in (10, 20, 30)] if device_type != 'server' else [],
+            'static_routes': [
+                {'destination_network': '0.0.0.0', 'subnet_mask': '0.0.0.0', 'next_hop': '10.0.0.1', 'metric': 5}
+            ] if device_type in ('router', 'l3_switch') else [],
+            'connections': [],
+            'metadata': {'rack': f'R{i // 40}'}
+        })
+
+    # Konekcije se dodaju na oba kraja, kao u mapi povezivanja portova
+    for i, device in enumerate(devices):
+        for p in range(links_per_device // 2):
+            j = rng.randrange(device_count)
+            if j == i:
+                continue
+            neighbor = devices[j]
+            speed = rng.choice(speeds)
+            my_port = f'GigabitEthernet0/{p}'
+            neighbor_port = f'GigabitEthernet0/{links_per_device // 2 + p}'
+            for a, b, pa, pb in ((device, neighbor, my_port, neighbor_port), (neighbor, device, neighbor_port, my_port)):
+                a['connections'].append({
+                    'neighbor_key': b['_key'],
+                    'neighbor_hostname': b['hostname'],
+                    'neighbor_ip': b['ip_address'],
+                    'neighbor_type': b['device_type'],
+                    'my_port': pa,
+                    'neighbor_port': pb,
+                    'cable_type': 'Cat6',
+                    'speed': speed,
+                    'duplex': 'auto',
+                    'vlan_tags': None
+                })
+
+    return devices
+
+
+def raw_topology(device_count: int, links_per_device: int = 4, seed: int = 42):
+    """
+    Generisanje dokumenata za kolekcije devices i connections
+
+    Argumenti:
+        device_count: Broj uređaja
+        links_per_device: Prosečan broj konekcija po uređaju
+        seed: Seme generatora slučajnih brojeva
+
+    Vraća:
+        (lista uređaja, lista konekcija) spremnih za insert_many
+    """
+    from app.services.topology_diff import content_hash
+
+    entries = port_connection_map(device_count, links_per_device, seed)
+    devices = []
+    for entry in entries:
+        device = {k: v for k, v in entry.items() if k != 'connections'}
+        device['content_hash'] = content_hash(device)
+        devices.append(device)
+
+    # Svaka konekcija je upisana na oba kraja; zadržava se samo izlazna strana
+    connections = []
+    seen = set()
+    for entry in entries:
+        for conn in entry['connections']:
+            pair = (entry['_key'], conn['my_port'], conn['neighbor_key'], conn['neighbor_port'])
+            mirror = (conn['neighbor_key'], conn['neighbor_port'], entry['_key'], conn['my_port'])
+            if mirror in seen:
+                seen.discard(mirror)
+                continue
+            seen.add(pair)
+            edge = {
+                '_key': f'conn{len(connections)}',
+                '_from': f"devices/{entry['_key']}",
+                '_to': f"devices/{conn['neighbor_key']}",
+                'src_port': conn['my_port'],
+                'dst_port': conn['neighbor_port'],
+                'cable_type': conn['cable_type'],
+                'speed': conn['speed'],
+                'duplex': conn['duplex'],
+                'status': 'active',
+                'vlan_tags': conn['vlan_tags']
+            }
+            edge['content_hash'] = content_hash(edge)
+            connections.append(edge)
+
+    return devices, connections
+
+
+# Adresni prostori (celobrojni zapis IPv4 adresa)
+LINK_BASE = 10 << 24                   # 10.0.0.0/9 - /30 mreže za rutirane linkove
+HOST_BASE = (10 << 24) + (128 << 16)   # 10.128.0.0/9 - mreže krajnjih uređaja
+LOOPBACK_BASE = (100 << 24) + (64 << 16)  # 100.64.0.0/10 - loopback / router ID
+
+CABLE_TYPES = {'100M': 'Cat5e', '1G': 'Cat6', '10G': 'Fiber-MM', '25G': 'DAC', '40G': 'Fiber-MM', '100G': 'Fiber-SM'}
+
+# Parametri oblika (broj uređaja je približan, oblik se zaokružuje na celu jedinicu)
+SERVERS_PER_LEAF = 40
+LEAF_SPINE_POD_LEAVES = 32
+LEAF_SPINE_POD_SPINES = 4
+HOSTS_PER_ACCESS = 24
+ACCESS_PER_BUILDING = 10
+HOSTS_PER_SITE = 4
+SPOKES_PER_HUB_PAIR = 500
+
+
+def _ip(value: int) -> str:
+    return f"{value >> 24 & 255}.{value >> 16 & 255}.{value >> 8 & 255}.{value & 255}"
+
+
+def _mask(prefix: int) -> str:
+    return _ip((0xFFFFFFFF << (32 - prefix)) & 0xFFFFFFFF)
+
+
+class TopologyBuilder:
+    """
+    Sakupljanje uređaja i konekcija sintetičke topologije
+
+    Svaki port nosi najviše jednu konekciju (kao što zahtevaju jedinstveni indeksi
+    portova), rutirani linkovi dobijaju /30 mreže, a segmenti krajnjih uređaja
+    sopstvenu mrežu, VLAN i gateway.
+    """
+
+    def __init__(self, seed: int = 42):
+        self.rng = random.Random(seed)
+        self.devices: List[Dict] = []
+        self.connections: List[Dict] = []
+        self._next_port: Dict[str, int] = {}
+        self._link_subnets = 0
+        self._host_addresses = 0
+
+    def add_device(self, key: str, device_type: str, role: str, **metadata) -> Dict:
+        index = len(self.devices)
+        device = {
+            '_key': key,
+            'hostname': key,
+            'device_type': device_type,
+            'ip_address': None,
+            'mac_address': f"02:00:{index >> 24 & 255:02x}:{index >> 16 & 255:02x}:{index >> 8 & 255:02x}:{index & 255:02x}",
+            'subnet_mask': '255.255.255.0',
+            'gateway': None,
+            'router_id': None,
+            'ports': [],
+            'subnets': [],
+            'static_routes': [],
+            'vlans': [],
+            'metadata': {'role': role, **metadata}
+        }
+        if device_type in ('router', 'l3_switch'):
+            loopback = _ip(LOOPBACK_BASE + index)
+            device['ip_address'] = loopback
+            device['subnet_mask'] = '255.255.255.255'
+            device['router_id'] = loopback
+            device['ports'].append({
+                'name': 'Loopback0', 'type': 'loopback',
+                'ip_address': loopback, 'subnet_mask': '255.255.255.255'
+            })
+        self.devices.append(device)
+        self._next_port[key] = 0
+        return device
+
+    def _take_port(self, device: Dict, speed: str, **fields) -> Dict:
+        index = self._next_port[device['_key']]
+        self._next_port[device['_key']] = index + 1
+        name = f"eth{index}" if device['device_type'] == 'server' else f"GigabitEthernet0/{index}"
+        port = {'name': name, 'type': 'ethernet', 'speed': speed, 'status': 'up', **fields}
+        device['ports'].append(port)
+        return port
+
+    def link(self, a: Dict, b: Dict, speed: str = '10G', routed: bool = False,
+             a_port: Optional[Dict] = None, b_port: Optional[Dict] = None,
+             vlan_tags: Optional[List[int]] = None) -> Tuple[Dict, Dict]:
+        """
+        Povezivanje dva uređaja preko sledećih slobodnih portova
+
+        Argumenti:
+            a, b: Uređaji (a je _from strana)
+            speed: Brzina linka
+            routed: Rutirani link sa /30 mrežom na oba kraja
+            a_port, b_port: Dodatna polja portova (mode, vlan, ip_address...)
+            vlan_tags: VLAN-ovi na trunk linku
+
+        Vraća:
+            Par portova (a, b)
+        """
+        pa = self._take_port(a, speed, **(a_port or {}))
+        pb = self._take_port(b, speed, **(b_port or {}))
+        if routed:
+            base = LINK_BASE + 4 * self._link_subnets
+            self._link_subnets += 1
+            for port, device, offset in ((pa, a, 1), (pb, b, 2)):
+                port['ip_address'] = _ip(base + offset)
+                port['subnet_mask'] = '255.255.255.252'
+                port['is_routed'] = device['device_type'] == 'l3_switch'
+        self.connections.append({
+            '_key': f"c{len(self.connections)}",
+            '_from': f"devices/{a['_key']}",
+            '_to': f"devices/{b['_key']}",
+            'src_port': pa['name'],
+            'dst_port': pb['name'],
+            'cable_type': CABLE_TYPES.get(speed, 'Cat6'),
+            'speed': speed,
+            'duplex': 'full',
+            'status': 'active',
+            'vlan_tags': vlan_tags
+        })
+        return pa, pb
+
+    def allocate_subnet(self, hosts: int) -> Tuple[int, int]:
+        """Mreža za zadati broj krajnjih uređaja (+ mreža, gateway, broadcast); vraća (adresa, prefiks)"""
+        size = 1 << max(2, math.ceil(math.log2(hosts + 3)))
+        # Poravnanje na veličinu bloka
+        network = HOST_BASE + (-(-self._host_addresses // size)) * size
+        self._host_addresses = network - HOST_BASE + size
+        return network, 32 - (size.bit_length() - 1)
+
+    def add_segment(self, gateway: Dict, switch: Dict, hosts: int, vlan_id: int, prefix: str,
+                    gateway_port: Optional[Dict] = None) -> Tuple[str, str]:
+        """
+        Segment krajnjih uređaja (servera) na pristupnom sviču
+
+        Argumenti:
+            gateway: Uređaj sa gateway adresom (SVI na L3 sviču ili port rutera)
+            switch: Svič na koji se povezuju serveri (može biti isti kao gateway)
+            hosts: Broj servera
+            vlan_id: VLAN segmenta
+            prefix: Prefiks imena servera
+            gateway_port: Fizički port rutera koji nosi gateway adresu (umesto SVI)
+
+        Vraća:
+            (mreža, maska) segmenta
+        """
+        network, prefix_len = self.allocate_subnet(hosts)
+        mask = _mask(prefix_len)
+        gateway_ip = _ip(network + 1)
+        if gateway_port is None:
+            gateway_port = {'name': f"Vlan{vlan_id}", 'type': 'vlan', 'is_svi': True}
+            gateway['ports'].append(gateway_port)
+        gateway_port['ip_address'] = gateway_ip
+        gateway_port['subnet_mask'] = mask
+        gateway['subnets'].append({'network': _ip(network), 'mask': mask, 'gateway': gateway_ip, 'vlan_id': vlan_id})
+        for device in {id(gateway): gateway, id(switch): switch}.values():
+            if device['device_type'] != 'router' and all(v['vlan_id'] != vlan_id for v in device['vlans']):
+                device['vlans'].append({'vlan_id': vlan_id, 'name': f"SERVERS_{vlan_id}"})
+
+        for h in range(hosts):
+            host = self.add_device(f"{prefix}-h{h}", 'server', 'host')
+            host_ip = _ip(network + 2 + h)
+            host['ip_address'] = host_ip
+            host['subnet_mask'] = mask
+            host['gateway'] = gateway_ip
+            self.link(switch, host, '1G',
+                      a_port={'mode': 'access', 'vlan': str(vlan_id)},
+                      b_port={'ip_address': host_ip, 'subnet_mask': mask})
+        return _ip(network), mask
+
+    @staticmethod
+    def add_route(device: Dict, network: str, mask: str, next_hop: str, metric: int = 1):
+        device['static_routes'].append({
+            'destination_network': network, 'subnet_mask': mask, 'next_hop': next_hop, 'metric': metric
+        })
+
+
+def leaf_spine(devices: int, builder: TopologyBuilder) -> TopologyBuilder:
+    """
+    Leaf-spine fabrik; iznad LEAF_SPINE_POD_LEAVES leaf svičeva prelazi u
+    petostepeni Clos (podovi povezani super-spine ravnima)
+    """
+    leaves = max(2, round(devices / (SERVERS_PER_LEAF + 1)))
+    pods = math.ceil(leaves / LEAF_SPINE_POD_LEAVES)
+    spines_per_pod = 2 if pods == 1 and leaves <= 8 else LEAF_SPINE_POD_SPINES
+    servers = max(1, min(SERVERS_PER_LEAF, devices // leaves - 1))
+
+    super_spines = []
+    if pods > 1:
+        super_spines = [builder.add_device(f"ss{i}", 'l3_switch', 'super-spine') for i in range(spines_per_pod)]
+
+    leaf_index = 0
+    for pod in range(pods):
+        spines = [builder.add_device(f"p{pod}-s{i}", 'l3_switch', 'spine', pod=pod) for i in range(spines_per_pod)]
+        for plane, spine in enumerate(spines):
+            if super_spines:
+                _, super_port = builder.link(spine, super_spines[plane], '100G', routed=True)
+                builder.add_route(spine, '0.0.0.0', '0.0.0.0', super_port['ip_address'])
+        pod_leaves = min(LEAF_SPINE_POD_LEAVES, leaves - leaf_index)
+        for _ in range(pod_leaves):
+            leaf = builder.add_device(f"p{pod}-l{leaf_index}", 'l3_switch', 'leaf', pod=pod)
+            for spine in spines:
+                _, spine_port = builder.link(leaf, spine, '100G', routed=True)
+                # ECMP: podrazumevana ruta preko svakog spine-a
+                builder.add_route(leaf, '0.0.0.0', '0.0.0.0', spine_port['ip_address'])
+            builder.add_segment(leaf, leaf, servers, 10, leaf['_key'])
+            leaf_index += 1
+    return builder
+
+
+def fat_tree_size(k: int) -> int:
+    """Broj uređaja fat-tree topologije: 5k²/4 svičeva + k³/4 servera"""
+    return 5 * k * k // 4 + k ** 3 // 4
+
+
+def fat_tree_k(devices: int) -> int:
+    """Paran k čiji je fat-tree najbliži zadatom broju uređaja"""
+    k = 2
+    while fat_tree_size(k + 2) <= devices:
+        k += 2
+    if abs(fat_tree_size(k + 2) - devices) < abs(fat_tree_size(k) - devices):
+        k += 2
+    return k
+
+
+def fat_tree(devices: int, builder: TopologyBuilder, k: Optional[int] = None) -> TopologyBuilder:
+    """Fat-tree sa k-portnim svičevima: (k/2)² core, k podova sa k/2 agregacionih i k/2 edge svičeva"""
+    k = k or fat_tree_k(devices)
+    if k < 2 or k % 2:
+        raise ValueError("Fat-tree k must be an even number >= 2")
+    half = k // 2
+
+    cores = [builder.add_device(f"core{i}", 'l3_switch', 'core') for i in range(half * half)]
+    for pod in range(k):
+        aggs = [builder.add_device(f"p{pod}-a{i}", 'l3_switch', 'aggregation', pod=pod) for i in range(half)]
+        for i, agg in enumerate(aggs):
+            for core in cores[i * half:(i + 1) * half]:
+                _, core_port = builder.link(agg, core, '40G', routed=True)
+                builder.add_route(agg, '0.0.0.0', '0.0.0.0', core_port['ip_address'])
+        for e in range(half):
+            edge = builder.add_device(f"p{pod}-e{e}", 'l3_switch', 'edge', pod=pod)
+            for agg in aggs:
+                _, agg_port = builder.link(edge, agg, '10G', routed=True)
+                builder.add_route(edge, '0.0.0.0', '0.0.0.0', agg_port['ip_address'])
+            builder.add_segment(edge, edge, half, 10 + e, edge['_key'])
+    return builder
+
+
+def campus(devices: int, builder: TopologyBuilder) -> TopologyBuilder:
+    """Troslojni kampus: core par, distribucioni par po zgradi, pristupni L2 svičevi sa korisnicima"""
+    access_total = max(1, round((devices - 4) / (HOSTS_PER_ACCESS + 1)))
+    hosts = max(1, min(HOSTS_PER_ACCESS, (devices - 4) // access_total - 1))
+    buildings = math.ceil(access_total / ACCESS_PER_BUILDING)
+
+    edge = [builder.add_device(f"wan{i}", 'router', 'wan-edge') for i in range(2)]
+    cores = [builder.add_device(f"core{i}", 'l3_switch', 'core') for i in range(2)]
+    builder.link(cores[0], cores[1], '40G', routed=True)
+    for router in edge:
+        # Izlaz ka provajderu i povratna ruta za mreže krajnjih uređaja preko core para
+        builder.add_route(router, '0.0.0.0', '0.0.0.0', '203.0.113.1')
+        for metric, core in enumerate(cores, start=1):
+            router_port, core_port = builder.link(router, core, '10G', routed=True)
+            builder.add_route(router, _ip(HOST_BASE), '255.128.0.0', core_port['ip_address'], metric)
+            builder.add_route(core, '0.0.0.0', '0.0.0.0', router_port['ip_address'])
+
+    access_index = 0
+    for b in range(buildings):
+        dists = [builder.add_device(f"b{b}-d{i}", 'l3_switch', 'distribution', building=b) for i in range(2)]
+        builder.link(dists[0], dists[1], '10G', vlan_tags=[])
+        for dist in dists:
+            for core in cores:
+                _, core_port = builder.link(dist, core, '10G', routed=True)
+                builder.add_route(dist, '0.0.0.0', '0.0.0.0', core_port['ip_address'])
+        for a in range(min(ACCESS_PER_BUILDING, access_total - access_index)):
+            vlan_id = 100 + a
+            access = builder.add_device(f"b{b}-a{a}", 'switch', 'access', building=b)
+            for dist in dists:
+                builder.link(access, dist, '10G',
+                             a_port={'mode': 'trunk', 'vlan': str(vlan_id)},
+                             b_port={'mode': 'trunk', 'vlan': str(vlan_id)},
+                             vlan_tags=[vlan_id])
+            dists[1]['vlans'].append({'vlan_id': vlan_id, 'name': f"SERVERS_{vlan_id}"})
+            builder.add_segment(dists[0], access, hosts, vlan_id, access['_key'])
+            access_index += 1
+    return builder
+
+
+def hub_spoke(devices: int, builder: TopologyBuilder) -> TopologyBuilder:
+    """WAN hub-and-spoke: parovi hub rutera, lokacije sa ruterom, svičem i serverima"""
+    site_size = HOSTS_PER_SITE + 2
+    sites = max(1, round((devices - 2) / site_size))
+    hosts = max(1, min(HOSTS_PER_SITE, (devices - 2) // sites - 2))
+    pairs = math.ceil(sites / SPOKES_PER_HUB_PAIR)
+
+    hub_pairs = []
+    for p in range(pairs):
+        hubs = [builder.add_device(f"hub{p}-{i}", 'router', 'hub') for i in range(2)]
+        builder.link(hubs[0], hubs[1], '10G', routed=True)
+        # Parovi hub-ova su povezani sa prvim parom (WAN jezgro)
+        if hub_pairs:
+            for hub, core in zip(hubs, hub_pairs[0]):
+                _, core_port = builder.link(hub, core, '10G', routed=True)
+                builder.add_route(hub, '0.0.0.0', '0.0.0.0', core_port['ip_address'])
+        hub_pairs.append(hubs)
+
+    for s in range(sites):
+        hubs = hub_pairs[s // SPOKES_PER_HUB_PAIR]
+        router = builder.add_device(f"site{s}-r", 'router', 'spoke', site=s)
+        switch = builder.add_device(f"site{s}-sw", 'switch', 'access', site=s)
+
+        wan_ports = [builder.link(router, hub, '100M', routed=True) for hub in hubs]
+        for metric, (_, hub_port) in zip((1, 10), wan_ports):
+            builder.add_route(router, '0.0.0.0', '0.0.0.0', hub_port['ip_address'], metric)
+
+        lan_port, _ = builder.link(router, switch, '1G', b_port={'mode': 'access', 'vlan': '10'})
+        network, mask = builder.add_segment(router, switch, hosts, 10, f"site{s}", gateway_port=lan_port)
+        # Hub-ovi znaju za LAN svake lokacije (statičko rutiranje umesto dinamičkog protokola)
+        for hub, (router_port, _) in zip(hubs, wan_ports):
+            builder.add_route(hub, network, mask, router_port['ip_address'])
+    return builder
+
+
+TOPOLOGY_SHAPES: Dict[str, Callable[..., TopologyBuilder]] = {
+    'leaf-spine': leaf_spine,
+    'fat-tree': fat_tree,
+    'campus': campus,
+    'hub-spoke': hub_spoke,
+}
+
+
+def generate_topology(shape: str, devices: int, seed: int = 42, **options) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Generisanje realistične topologije u formatu zahteva za čuvanje
+
+    Broj uređaja je približan: oblik se gradi od celih jedinica (leaf sa
+    serverima, pod, zgrada, lokacija). Za 1M uređaja potrebno je nekoliko GB memorije.
+
+    Argumenti:
+        shape: 'leaf-spine', 'fat-tree', 'campus' ili 'hub-spoke'
+        devices: Ciljani broj uređaja (100 - 1.000.000)
+        seed: Seme generatora (ponovljivi rezultati)
+        options: Parametri oblika (npr. k=16 za fat-tree)
+
+    Vraća:
+        (lista uređaja, lista konekcija) - isti oblik kao TopologySave
+    """
+    if shape not in TOPOLOGY_SHAPES:
+        raise ValueError(f"Unknown topology shape '{shape}', expected one of {', '.join(TOPOLOGY_SHAPES)}")
+    builder = TOPOLOGY_SHAPES[shape](devices, TopologyBuilder(seed), **options)
+    return builder.devices, builder.connections
+
+
+def mutate_topology(devices: List[Dict], connections: List[Dict], fraction: float = 0.01,
+                    seed: int = 7) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Kopija topologije sa izmenjenim delom uređaja i konekcija (inkrementalno čuvanje)
+
+    Menjaju se samo opisna polja, tako da portovi ostaju jedinstveni.
+    """
+    rng = random.Random(seed)
+    devices = list(devices)
+    connections = list(connections)
+    for docs, field in ((devices, 'metadata'), (connections, 'status')):
+        count = max(1, int(len(docs) * fraction)) if docs else 0
+        for i in rng.sample(range(len(docs)), count):
+            doc = copy.deepcopy(docs[i])
+            if field == 'metadata':
+                doc['metadata'] = {**(doc.get('metadata') or {}), 'revision': rng.randrange(1 << 30)}
+            else:
+                doc['status'] = 'inactive' if doc.get('status') == 'active' else 'active'
+            docs[i] = doc
+    return devices, connections
@@ -0,0 +1,32 @@
+# backend/tests/fakes.py
+"""Zajedničke zamene za ArangoDB objekte u testovima (server nije potreban)"""
+
+from arango.exceptions import ArangoServerError
+from arango.request import Request
+from arango.response import Response
+
+from app.services.transactions import WRITE_CONFLICT
+
+
+def write_conflict() -> ArangoServerError:
+    """Greška koju server vraća pri konfliktu upisa (ERR 1200)"""
+    resp = Response('POST', '/_api/cursor', {}, 409, 'Conflict', '')
+    resp.error_code = WRITE_CONFLICT
+    resp.error_message = 'write-write conflict'
+    return ArangoServerError(resp, Request('POST', '/_api/cursor'))
+
+
+class FakeCursor:
+    """Kursor nad listom dokumenata (iterator, kao arango Cursor)"""
+
+    def __init__(self, docs):
+        self._docs = iter(docs)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._docs)
+
+    def statistics(self):
+        return {}
@@ -0,0 +1,126 @@
+# backend/tests/test_audit_delta.py
+"""
+Verzije topologije u evidenciji revizije: delta ključeva, kontrolne tačke i
+rekonstrukcija koja prijavljuje verziju koja nedostaje
+"""
+
+import pytest
+
+from app.services import audit_delta
+from app.services.audit_delta import (
+    key_delta, removed_keys, record_topology_version, reconstruct_topology_keys, TOPOLOGY_STATE_KEY
+)
+
+NO_CHANGE = {'added': [], 'removed': []}
+
+
+class FakeCounters:
+    def __init__(self):
+        self.docs = {}
+
+    def get(self, key):
+        return self.docs.get(key)
+
+    def insert(self, doc, overwrite=False):
+        self.docs[doc['_key']] = doc
+
+
+class FakeTransaction:
+    """Transakcija sa audit_counters i trenutnim ključevima kolekcija"""
+
+    def __init__(self, keys):
+        self.counters = FakeCounters()
+        self.keys = keys
+
+    def collection(self, name):
+        return self.counters
+
+
+@pytest.fixture
+def txn(monkeypatch):
+    txn = FakeTransaction({'devices': ['r1', 'r2'], 'connections': ['c1']})
+    monkeypatch.setattr(audit_delta, 'execute_aql',
+                        lambda db, name, query, bind_vars: iter(db.keys[bind_vars['@collection']]))
+    return txn
+
+
+def test_key_delta():
+    assert key_delta({'r1': {}, 'r2': {}}, ['r2', 'r3']) == {'added': ['r3'], 'removed': ['r1']}
+    assert removed_keys(['r2', 'r1', 'r2']) == {'added': [], 'removed': ['r1', 'r2']}
+
+
+def test_first_version_is_checkpoint_from_collections(txn):
+    data = record_topology_version(txn, NO_CHANGE, NO_CHANGE, interval=3)
+
+    assert data == {'version': 1, 'snapshot': 'checkpoint', 'device_keys': ['r1', 'r2'], 'connection_keys': ['c1']}
+    # Stanje nosi samo broj verzije
+    assert txn.counters.docs[TOPOLOGY_STATE_KEY] == {'_key': TOPOLOGY_STATE_KEY, 'version': 1}
+
+
+def test_unchanged_keys_make_no_version(txn):
+    record_topology_version(txn, NO_CHANGE, NO_CHANGE, interval=3)
+
+    assert record_topology_version(txn, NO_CHANGE, NO_CHANGE, interval=3) == {}
+    assert txn.counters.docs[TOPOLOGY_STATE_KEY]['version'] == 1
+
+
+def test_deltas_between_checkpoints(txn):
+    added = {'added': ['r3'], 'removed': []}
+    record_topology_version(txn, NO_CHANGE, NO_CHANGE, interval=3)
+
+    snapshots = [record_topology_version(txn, added, NO_CHANGE, interval=3)['snapshot'] for _ in range(3)]
+
+    assert snapshots == ['delta', 'delta', 'checkpoint']
+
+
+def versioned(version, timestamp, **data):
+    return {'action': 'bulk_save', 'timestamp': timestamp, 'entity_data': {'version': version, **data}}
+
+
+def history_database(monkeypatch, entries):
+    """Baza sa jednom particijom; upiti se izvršavaju nad listom unosa"""
+    def execute_aql(db, name, query, bind_vars):
+        if 'base' in bind_vars:
+            found = [e for e in entries if bind_vars['base'] < e['entity_data']['version'] <= bind_vars['version']]
+            return iter(sorted(found, key=lambda e: e['entity_data']['version']))
+        found = [e for e in entries
+                 if e['entity_data']['snapshot'] == 'checkpoint' and e['entity_data']['version'] <= bind_vars['version']]
+        return iter(sorted(found, key=lambda e: -e['entity_data']['version'])[:bind_vars['limit']])
+
+    monkeypatch.setattr(audit_delta, 'execute_aql', execute_aql)
+    monkeypatch.setattr(audit_delta, 'list_partitions', lambda db: ['audit_log_2025_01'])
+    return object()
+
+
+HISTORY = [
+    versioned(1, '2025-01-01T00:00:00+00:00', snapshot='checkpoint', device_keys=['r1'], connection_keys=[]),
+    versioned(2, '2025-01-02T00:00:00+00:00', snapshot='delta',
+              devices={'added': ['r2'], 'removed': []}, connections={'added': ['c1'], 'removed': []}),
+    versioned(3, '2025-01-03T00:00:00+00:00', snapshot='delta',
+              devices={'added': [], 'removed': ['r1']}, connections={'added': [], 'removed': ['c1']}),
+]
+
+
+def test_reconstruct_applies_deltas_from_checkpoint(monkeypatch):
+    db = history_database(monkeypatch, HISTORY)
+
+    result = reconstruct_topology_keys(db, 3)
+
+    assert result['checkpoint_version'] == 1
+    assert result['timestamp'] == '2025-01-03T00:00:00+00:00'
+    assert result['device_keys'] == ['r2']
+    assert result['connection_keys'] == []
+
+
+def test_reconstruct_reports_missing_version(monkeypatch):
+    db = history_database(monkeypatch, [HISTORY[0], HISTORY[2]])
+
+    with pytest.raises(LookupError, match='version 2'):
+        reconstruct_topology_keys(db, 3)
+
+
+def test_reconstruct_reports_missing_last_version(monkeypatch):
+    db = history_database(monkeypatch, HISTORY[:2])
+
+    with pytest.raises(LookupError, match='version 3'):
+        reconstruct_topology_keys(db, 3)
@@ -0,0 +1,98 @@
+# backend/tests/test_audit_partitions.py
+"""
+Mesečne particije: UTC mesec particije i arhiviranje koje posle prekida ne
+umanjuje brojače drugi put
+"""
+
+import gzip
+import json
+
+import pytest
+
+from app.services import audit_counters, audit_partitions
+from app.services.audit_partitions import partition_for, archive_partition, ARCHIVE_MARKER_PREFIX
+
+PARTITION = 'audit_log_2025_01'
+
+
+@pytest.mark.parametrize('timestamp, partition', [
+    ('2025-03-14T10:00:00+00:00', 'audit_log_2025_03'),
+    ('2025-04-01T01:00:00+02:00', 'audit_log_2025_03'),
+    ('2025-03-31T23:30:00-01:00', 'audit_log_2025_04'),
+    ('2025-03-14T10:00:00', 'audit_log_2025_03'),
+])
+def test_partition_is_utc_month(timestamp, partition):
+    assert partition_for(timestamp) == partition
+
+
+class FakeCounters:
+    def __init__(self):
+        self.docs = {}
+
+    def get(self, key):
+        return self.docs.get(key)
+
+    def insert(self, doc, overwrite=False):
+        self.docs[doc['_key']] = doc
+
+    def delete(self, key, ignore_missing=False):
+        self.docs.pop(key, None)
+
+
+class FakeDatabase:
+    name = 'netgraph_test'
+
+    def __init__(self):
+        self.counters = FakeCounters()
+        self.partitions = {PARTITION: [{'_key': '1', 'action': 'create'}, {'_key': '2', 'action': 'delete'}]}
+        self.fail_delete = False
+
+    def collection(self, name):
+        assert name == audit_counters.AUDIT_COUNTERS_COLLECTION
+        return self.counters
+
+    def begin_transaction(self, write):
+        return self
+
+    def commit_transaction(self):
+        pass
+
+    def abort_transaction(self):
+        pass
+
+    def delete_collection(self, name, ignore_missing=False):
+        if self.fail_delete:
+            raise RuntimeError('server unavailable')
+        self.partitions.pop(name, None)
+
+
+@pytest.fixture
+def database(monkeypatch):
+    db = FakeDatabase()
+    db.deltas = []
+    monkeypatch.setattr(audit_counters, 'collection_counts',
+                        lambda db, name: {'total': len(db.partitions[name]), 'by_action': {}, 'by_entity_type': {}})
+    monkeypatch.setattr(audit_counters, 'apply_delta', lambda txn, delta: db.deltas.append(delta['total']))
+    monkeypatch.setattr(audit_partitions, 'iter_aql', lambda db, name, query, bind_vars, batch_size: iter(
+        db.partitions[bind_vars['@collection']]
+    ))
+    return db
+
+
+def test_archive_subtracts_counters_once_after_interrupted_drop(database, tmp_path):
+    database.fail_delete = True
+    with pytest.raises(RuntimeError):
+        archive_partition(database, PARTITION, str(tmp_path))
+    # Brojači su umanjeni, oznaka ostaje dok particija postoji
+    assert database.deltas == [-2]
+    assert ARCHIVE_MARKER_PREFIX + PARTITION in database.counters.docs
+
+    database.fail_delete = False
+    result = archive_partition(database, PARTITION, str(tmp_path))
+
+    assert database.deltas == [-2]
+    assert PARTITION not in database.partitions
+    assert database.counters.docs == {}
+    assert result['entries'] == 2
+    with gzip.open(result['path'], 'rt', encoding='utf-8') as archive:
+        assert [json.loads(line)['_key'] for line in archive] == ['1', '2']
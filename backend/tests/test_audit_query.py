@@ -0,0 +1,77 @@
+# backend/tests/test_audit_query.py
+"""
+Straničenje evidencije: kursor, vremena iz upita i stabilan tekst upita
+"""
+
+import base64
+import json
+
+import pytest
+
+from app.services.audit_query import (
+    encode_cursor, decode_cursor, normalize_timestamp, build_page_query, split_page
+)
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor('2025-03-14T10:00:00.123456+00:00', 'čvor-42')
+
+    assert '=' not in cursor
+    assert decode_cursor(cursor) == ('2025-03-14T10:00:00.123456+00:00', 'čvor-42')
+
+
+def raw_cursor(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode('utf-8')).decode('ascii')
+
+
+@pytest.mark.parametrize('cursor', [
+    'not a cursor',
+    raw_cursor(['2025-03-14T10:00:00+00:00']),
+    raw_cursor(['2025-03-14T10:00:00+00:00', 42]),
+    raw_cursor({'timestamp': 'x', 'key': 'y'}),
+])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('2025-03-14T12:00:00+02:00', '2025-03-14T10:00:00+00:00'),
+    ('2025-03-14T10:00:00', '2025-03-14T10:00:00+00:00'),
+    (None, None),
+])
+def test_normalize_timestamp_to_utc(value, expected):
+    assert normalize_timestamp(value, 'since') == expected
+
+
+def test_normalize_timestamp_names_invalid_parameter():
+    with pytest.raises(ValueError, match="'until'"):
+        normalize_timestamp('yesterday', 'until')
+
+
+def test_page_query_text_depends_only_on_given_filters():
+    first, first_vars = build_page_query('audit_log_2025_03', 50, action='create', since='2025-03-01T00:00:00+00:00')
+    second, second_vars = build_page_query('audit_log_2025_02', 10, action='delete', since='2025-02-01T00:00:00+00:00')
+
+    assert first == second
+    assert first_vars['limit'] == 51
+    assert second_vars['action'] == 'delete'
+    assert build_page_query('audit_log_2025_03', 50)[0] != first
+
+
+def test_page_query_continues_after_cursor():
+    query, bind_vars = build_page_query('audit_log_2025_03', 50, cursor=encode_cursor('2025-03-14T10:00:00+00:00', 'k9'))
+
+    assert 'doc._key < @cursor_key' in query
+    assert bind_vars['cursor_ts'] == '2025-03-14T10:00:00+00:00'
+    assert bind_vars['cursor_key'] == 'k9'
+
+
+def test_split_page_cursor_points_at_last_returned_entry():
+    entries = [{'_key': str(i), 'timestamp': f'2025-03-14T10:00:0{9 - i}+00:00'} for i in range(4)]
+
+    page, cursor = split_page(entries, 3)
+
+    assert page == entries[:3]
+    assert decode_cursor(cursor) == ('2025-03-14T10:00:07+00:00', '2')
+    assert split_page(entries, 4) == (entries, None)
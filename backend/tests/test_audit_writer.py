@@ -0,0 +1,96 @@
+# backend/tests/test_audit_writer.py
+"""
+Upis audit događaja: ponavljanje pri konfliktu na dokumentu brojača i
+brojanje samo stvarno upisanih događaja
+"""
+
+import pytest
+
+from app.services import audit_writer, transactions
+from app.services.audit_writer import write_audit_entries, failed_results
+from tests.fakes import write_conflict
+
+
+class FakeCollection:
+    def __init__(self, database):
+        self.database = database
+
+    def insert_many(self, docs):
+        return [ValueError('unique constraint violated') if doc.get('duplicate') else {'_key': doc['entity_id']}
+                for doc in docs]
+
+
+class FakeTransaction:
+    def __init__(self, database):
+        self.database = database
+
+    def collection(self, name):
+        return FakeCollection(self.database)
+
+    def commit_transaction(self):
+        self.database.committed += 1
+
+    def abort_transaction(self):
+        # Server je transakciju već poništio posle konflikta
+        raise RuntimeError('transaction not found')
+
+
+class FakeDatabase:
+    name = 'netgraph_test'
+
+    def __init__(self):
+        self.transactions = 0
+        self.committed = 0
+
+    def begin_transaction(self, write):
+        self.transactions += 1
+        return FakeTransaction(self)
+
+
+def entry(key, duplicate=False):
+    return {'action': 'create', 'entity_type': 'device', 'entity_id': key,
+            'timestamp': '2026-10-18T10:00:00+00:00', 'duplicate': duplicate}
+
+
+class CounterRecorder:
+    """Zamena za increment_counters: beleži brojane događaje, prvih N poziva daje konflikt"""
+
+    def __init__(self):
+        self.counted = []
+        self.conflicts = 0
+
+    def __call__(self, txn, entries):
+        if self.conflicts:
+            self.conflicts -= 1
+            raise write_conflict()
+        self.counted.append([e['entity_id'] for e in entries])
+
+
+@pytest.fixture
+def counters(monkeypatch):
+    recorder = CounterRecorder()
+    monkeypatch.setattr(audit_writer, 'increment_counters', recorder)
+    monkeypatch.setattr(audit_writer, 'ensure_partitions', lambda db, names: False)
+    monkeypatch.setattr(transactions, 'TRANSACTION_RETRY_DELAY', 0.001)
+    return recorder
+
+
+def test_counter_conflict_is_retried(counters):
+    db = FakeDatabase()
+    counters.conflicts = 2
+
+    write_audit_entries(db, [entry('r1'), entry('r2')])
+
+    assert db.transactions == 3
+    assert db.committed == 1
+    assert counters.counted == [['r1', 'r2']]
+
+
+def test_only_inserted_entries_are_counted(counters):
+    db = FakeDatabase()
+
+    result = write_audit_entries(db, [entry('r1'), entry('r2', duplicate=True), entry('r3')])
+
+    assert counters.counted == [['r1', 'r3']]
+    assert len(failed_results(result)) == 1
+    assert list(result) == ['audit_log_2026_10']
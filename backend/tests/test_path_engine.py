@@ -0,0 +1,111 @@
+# backend/tests/test_path_engine.py
+"""
+Pretraga putanja: redosled po skokovima i ceni, razrešavanje jednakih
+putanja i Yen-ov algoritam za k putanja bez petlji
+"""
+
+import pytest
+
+from app.services.path_engine import PathEngine, DEFAULT_SPEED_COSTS, DEFAULT_UNKNOWN_SPEED_COST
+from app.services.topology_cache import TopologySnapshot
+
+
+def connection(key, src, dst, speed):
+    return {'_key': key, '_from': f'devices/{src}', '_to': f'devices/{dst}', 'speed': speed}
+
+
+# a-d direktno sporim kablom, a-b-d brzim, a-c-d standardnim; e nije povezan
+#
+#       b           (c1, c2: 100G, cena 1)
+#     /   \
+#   a ----- d       (c3: 100M, cena 10)
+#     \   /
+#       c           (c4, c5: 1G, cena 5)
+TOPOLOGY = TopologySnapshot(
+    [{'_key': key} for key in 'abcde'],
+    [
+        connection('c1', 'a', 'b', '100G'),
+        connection('c2', 'b', 'd', '100G'),
+        connection('c3', 'a', 'd', '100M'),
+        connection('c4', 'a', 'c', '1G'),
+        connection('c5', 'c', 'd', '1G'),
+    ]
+)
+
+
+@pytest.fixture
+def engine():
+    return PathEngine(TOPOLOGY, DEFAULT_SPEED_COSTS, DEFAULT_UNKNOWN_SPEED_COST)
+
+
+def test_shortest_path_prefers_fewer_hops(engine):
+    path = engine.shortest_path('a', 'd')
+
+    assert path.devices == ('a', 'd')
+    assert path.connections == ('c3',)
+    assert (path.hops, path.cost) == (1, 10)
+
+
+def test_cheapest_path_prefers_lower_cost(engine):
+    path = engine.cheapest_path('a', 'd')
+
+    assert path.devices == ('a', 'b', 'd')
+    assert (path.hops, path.cost) == (2, 2)
+
+
+def test_equal_hops_are_ranked_by_cost():
+    # Dve putanje sa dva skoka; jeftinija (preko m2) pobeđuje iako je m1 prvi u listi susedstva
+    snapshot = TopologySnapshot(
+        [{'_key': key} for key in ('x', 'm1', 'm2', 'z')],
+        [
+            connection('x-m1', 'x', 'm1', '100M'),
+            connection('m1-z', 'm1', 'z', '100M'),
+            connection('x-m2', 'x', 'm2', '10G'),
+            connection('m2-z', 'm2', 'z', '10G'),
+        ]
+    )
+    engine = PathEngine(snapshot, DEFAULT_SPEED_COSTS, DEFAULT_UNKNOWN_SPEED_COST)
+
+    path = engine.shortest_path('x', 'z')
+
+    assert path.devices == ('x', 'm2', 'z')
+    assert (path.hops, path.cost) == (2, 2)
+
+
+def test_unreachable_device_has_no_path(engine):
+    assert engine.shortest_path('a', 'e') is None
+    assert engine.k_shortest_paths('a', 'e', 3) == []
+
+
+def test_k_shortest_by_hops(engine):
+    paths = engine.k_shortest_paths('a', 'd', 5)
+
+    assert [p.connections for p in paths] == [('c3',), ('c1', 'c2'), ('c4', 'c5')]
+
+
+def test_k_shortest_by_cost_breaks_ties_by_hops(engine):
+    # c3 i c4-c5 imaju istu cenu (10); kraća putanja ide prva
+    paths = engine.k_shortest_paths('a', 'd', 3, by_hops=False)
+
+    assert [p.connections for p in paths] == [('c1', 'c2'), ('c3',), ('c4', 'c5')]
+    assert [p.cost for p in paths] == [2, 10, 10]
+
+
+def test_k_shortest_limits_and_has_no_loops(engine):
+    paths = engine.k_shortest_paths('a', 'd', 2)
+
+    assert len(paths) == 2
+    for path in paths:
+        assert len(set(path.devices)) == len(path.devices)
+
+
+def test_parallel_connections_are_separate_paths():
+    snapshot = TopologySnapshot(
+        [{'_key': 'a'}, {'_key': 'b'}],
+        [connection('fast', 'a', 'b', '10G'), connection('slow', 'a', 'b', '1G')]
+    )
+    engine = PathEngine(snapshot, DEFAULT_SPEED_COSTS, DEFAULT_UNKNOWN_SPEED_COST)
+
+    paths = engine.k_shortest_paths('a', 'b', 3, by_hops=False)
+
+    assert [p.connections for p in paths] == [('fast',), ('slow',)]
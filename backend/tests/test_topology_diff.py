@@ -0,0 +1,66 @@
+# backend/tests/test_topology_diff.py
+"""
+Inkrementalno čuvanje: heš sadržaja, razvrstavanje dokumenata i konflikti portova
+"""
+
+from app.services.topology_diff import content_hash, diff_documents, find_port_conflicts, summarize_diff
+
+
+def device(key, hostname, **fields):
+    return {'_key': key, 'hostname': hostname, **fields}
+
+
+def test_content_hash_ignores_timestamps_and_key_order():
+    doc = device('r1', 'core-1', ip_address='10.0.0.1')
+    stored = {'ip_address': '10.0.0.1', 'hostname': 'core-1', '_key': 'r1',
+              'created_at': '2025-01-01T00:00:00+00:00', '_rev': 'abc'}
+
+    assert content_hash(doc) == content_hash(stored)
+    assert content_hash(doc) != content_hash(device('r1', 'core-2', ip_address='10.0.0.1'))
+
+
+def test_diff_sorts_documents_by_change():
+    unchanged = device('r1', 'core-1')
+    existing = {
+        'r1': {'content_hash': content_hash(unchanged), 'created_at': 'T1'},
+        'r2': {'content_hash': 'stale', 'created_at': 'T2'},
+        'r3': {'content_hash': 'gone', 'created_at': 'T3'},
+    }
+
+    diff = diff_documents([device('r1', 'core-1'), device('r2', 'edge-2'), device('r4', 'new')], existing)
+
+    assert [d['_key'] for d in diff['insert']] == ['r4']
+    assert [d['_key'] for d in diff['update']] == ['r2']
+    assert diff['remove'] == ['r3']
+    assert diff['unchanged'] == 1
+    assert summarize_diff(diff) == {'inserted': 1, 'updated': 1, 'removed': 1, 'unchanged': 1}
+
+
+def test_diff_keeps_creation_time_and_sets_hash():
+    incoming = device('r2', 'edge-2')
+
+    diff = diff_documents([incoming], {'r2': {'content_hash': 'stale', 'created_at': 'T2'}})
+
+    assert diff['update'][0]['created_at'] == 'T2'
+    assert diff['update'][0]['content_hash'] == content_hash(device('r2', 'edge-2'))
+
+
+def connection(key, src, src_port, dst, dst_port):
+    return {'_key': key, '_from': f'devices/{src}', 'src_port': src_port, '_to': f'devices/{dst}', 'dst_port': dst_port}
+
+
+def test_port_conflicts_cover_both_directions():
+    connections = [
+        connection('c1', 'r1', 'eth0', 'r2', 'eth0'),
+        # Isti port r2/eth0, ali sa _from strane
+        connection('c2', 'r2', 'eth0', 'r3', 'eth1'),
+        connection('c3', 'r1', 'eth1', 'r3', None),
+    ]
+
+    assert find_port_conflicts(connections) == [{'device': 'r2', 'port': 'eth0', 'connections': ['c1', 'c2']}]
+
+
+def test_connections_without_ports_do_not_conflict():
+    connections = [connection('c1', 'r1', None, 'r2', None), connection('c2', 'r1', None, 'r2', None)]
+
+    assert find_port_conflicts(connections) == []
@@ -0,0 +1,93 @@
+# backend/tests/test_topology_revision.py
+"""
+Izmene topologije po reviziji: provera neprekidnog opsega, spajanje ključeva
+izmenjenih više puta i poređenje ETag-a
+"""
+
+import pytest
+
+from app.services.topology_revision import read_changes, etag_matches, Revision
+
+from tests.fakes import FakeCursor
+
+
+def change(revision, devices=(), removed_devices=(), connections=(), removed_connections=()):
+    return {
+        'revision': revision,
+        'devices': {'upserted': list(devices), 'removed': list(removed_devices)},
+        'connections': {'upserted': list(connections), 'removed': list(removed_connections)}
+    }
+
+
+class FakeAql:
+    """Izmene po reviziji i trenutni dokumenti; upiti se izvršavaju nad listama"""
+
+    def __init__(self, changes, documents):
+        self.changes = changes
+        self.documents = documents
+
+    def execute(self, query, bind_vars=None, **kwargs):
+        if '@changes' in bind_vars:
+            return FakeCursor(sorted(
+                (c for c in self.changes if bind_vars['since'] < c['revision'] <= bind_vars['until']),
+                key=lambda c: c['revision']
+            ))
+        docs = self.documents[bind_vars['@collection']]
+        return FakeCursor([docs[key] for key in bind_vars['keys'] if key in docs])
+
+
+class FakeDatabase:
+    def __init__(self, changes, documents=None):
+        self.aql = FakeAql(changes, documents or {'devices': {}, 'connections': {}})
+
+
+def test_changes_merge_keys_and_report_removed():
+    db = FakeDatabase(
+        [
+            change(4, devices=['r1', 'r2'], connections=['c1']),
+            change(5, devices=['r1'], removed_devices=['r2'], removed_connections=['c1']),
+            change(6, devices=['r3']),
+        ],
+        {'devices': {'r1': {'_key': 'r1'}, 'r3': {'_key': 'r3'}}, 'connections': {}}
+    )
+
+    result = read_changes(db, 3, 6)
+
+    assert [d['_key'] for d in result['devices']] == ['r1', 'r3']
+    assert result['removed_devices'] == ['r2']
+    assert result['connections'] == []
+    assert result['removed_connections'] == ['c1']
+
+
+def test_missing_revision_requires_full_reload():
+    db = FakeDatabase([change(4, devices=['r1']), change(6, devices=['r3'])])
+
+    assert read_changes(db, 3, 6) is None
+
+
+def test_pruned_start_requires_full_reload():
+    db = FakeDatabase([change(5, devices=['r1']), change(6, devices=['r3'])])
+
+    assert read_changes(db, 3, 6) is None
+
+
+def test_no_changes_since_current_revision():
+    result = read_changes(FakeDatabase([]), 6, 6)
+
+    assert result == {'devices': [], 'removed_devices': [], 'connections': [], 'removed_connections': []}
+
+
+ETAG = Revision(7, 1700000000000).etag('netgraph_test')
+
+
+@pytest.mark.parametrize('if_none_match, matches', [
+    (None, False),
+    ('', False),
+    ('*', True),
+    (ETAG, True),
+    (ETAG[2:], True),
+    (f'W/"other", {ETAG}', True),
+    ('W/"netgraph_test-1700000000000-6"', False),
+])
+def test_etag_matches(if_none_match, matches):
+    assert etag_matches(if_none_match, ETAG) is matches
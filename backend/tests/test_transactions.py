@@ -0,0 +1,169 @@
+# backend/tests/test_transactions.py
+"""
+Ponavljanje transakcije pri konfliktu upisa na dokumentu revizije topologije
+ArangoDB nije potreban - lažna baza simulira zaključavanje dokumenta brojača
+kao stream transakcije (druga transakcija koja ga menja dobija ERR 1200).
+"""
+
+import threading
+
+import pytest
+from arango.exceptions import ArangoServerError, TransactionAbortError
+from arango.request import Request
+from arango.response import Response
+
+from app.services import transactions
+from app.services.topology_revision import bump_revision, TOPOLOGY_CHANGES_COLLECTION
+from app.services.transactions import run_in_transaction, WRITE_CONFLICT
+from tests.fakes import FakeCursor, write_conflict
+
+WRITE = ['devices', 'connections', 'audit_counters', TOPOLOGY_CHANGES_COLLECTION]
+
+
+class FakeServer:
+    """Dokument revizije i izmene po reviziji; samo jedna otvorena transakcija sme da menja brojač"""
+
+    def __init__(self):
+        self.revision = 0
+        self.changes = {}
+        self.holder = None
+        self.conflicts = 0
+        self.conflicted = threading.Event()
+        self.lock = threading.Lock()
+
+
+class FakeTransaction:
+    name = 'netgraph_test'
+
+    def __init__(self, server: FakeServer):
+        self.server = server
+        self.aql = self
+        self.revision = None
+        self.changes = {}
+
+    # txn.aql.execute
+    def execute(self, query, bind_vars=None, **kwargs):
+        assert 'UPSERT' in query
+        with self.server.lock:
+            if self.server.holder not in (None, self):
+                self.server.conflicts += 1
+                self.server.conflicted.set()
+                raise write_conflict()
+            self.server.holder = self
+            self.revision = self.server.revision + 1
+        return FakeCursor([{'revision': self.revision}])
+
+    def collection(self, name):
+        assert name == TOPOLOGY_CHANGES_COLLECTION
+        return self
+
+    def insert(self, doc):
+        self.changes[doc['revision']] = doc
+
+    def commit_transaction(self):
+        with self.server.lock:
+            if self.revision is not None:
+                self.server.revision = self.revision
+                self.server.changes.update(self.changes)
+            if self.server.holder is self:
+                self.server.holder = None
+
+    def abort_transaction(self):
+        with self.server.lock:
+            if self.server.holder is self:
+                self.server.holder = None
+
+
+class FakeDatabase:
+    name = 'netgraph_test'
+
+    def __init__(self):
+        self.server = FakeServer()
+        self.transactions = 0
+
+    def begin_transaction(self, write):
+        assert set(WRITE) <= set(write)
+        self.transactions += 1
+        return FakeTransaction(self.server)
+
+
+@pytest.fixture(autouse=True)
+def fast_retry(monkeypatch):
+    monkeypatch.setattr(transactions, 'TRANSACTION_RETRY_DELAY', 0.001)
+
+
+def test_concurrent_writers_get_distinct_revisions():
+    db = FakeDatabase()
+    results = {}
+    errors = []
+    holding = threading.Event()
+
+    def first(txn):
+        revision = bump_revision(txn, upserted_devices=['r1'])
+        holding.set()
+        # Brojač ostaje zaključan dok drugi upis ne dobije konflikt
+        db.server.conflicted.wait(5)
+        return revision
+
+    def second(txn):
+        return bump_revision(txn, upserted_devices=['r2'])
+
+    def writer(name, work):
+        try:
+            results[name] = run_in_transaction(db, WRITE, work, attempts=50)
+        except Exception as e:
+            errors.append(e)
+
+    first_thread = threading.Thread(target=writer, args=('first', first))
+    first_thread.start()
+    assert holding.wait(5)
+    second_thread = threading.Thread(target=writer, args=('second', second))
+    second_thread.start()
+    first_thread.join(5)
+    second_thread.join(5)
+
+    assert not errors
+    assert db.server.conflicts >= 1
+    assert results == {'first': 1, 'second': 2}
+    assert db.server.revision == 2
+    assert db.server.changes[1]['devices']['upserted'] == ['r1']
+    assert db.server.changes[2]['devices']['upserted'] == ['r2']
+
+
+def test_conflict_raised_after_last_attempt():
+    db = FakeDatabase()
+
+    def conflicting(txn):
+        raise write_conflict()
+
+    with pytest.raises(ArangoServerError) as error:
+        run_in_transaction(db, WRITE, conflicting, attempts=3)
+    assert error.value.error_code == WRITE_CONFLICT
+    assert db.transactions == 3
+
+
+def test_other_errors_are_not_retried():
+    db = FakeDatabase()
+
+    def failing(txn):
+        raise ValueError('invalid topology')
+
+    with pytest.raises(ValueError):
+        run_in_transaction(db, WRITE, failing, attempts=3)
+    assert db.transactions == 1
+
+
+def test_abort_failure_keeps_original_error():
+    db = FakeDatabase()
+
+    class AbortedTransaction(FakeTransaction):
+        def abort_transaction(self):
+            raise TransactionAbortError(Response('DELETE', '/', {}, 404, 'Not Found', ''), Request('DELETE', '/'))
+
+    def failing(txn):
+        raise ValueError('invalid topology')
+
+    db.begin_transaction = lambda write: AbortedTransaction(db.server)
+
+    with pytest.raises(ValueError):
+        run_in_transaction(db, WRITE, failing, attempts=2)
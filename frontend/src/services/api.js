@@ -10,15 +10,69 @@ const api = axios.create({
   }
 })
 
+// Baza izabrana na ovom klijentu (čuva se u pregledaču, važi i posle ponovnog učitavanja)
+const DATABASE_STORAGE_KEY = 'netgraph.database'
+
+export function useDatabase(databaseName) {
+  // Svi naredni zahtevi ovog klijenta idu na izabranu bazu, nezavisno od drugih korisnika
+  api.defaults.headers.common['X-NetGraph-Database'] = databaseName
+  localStorage.setItem(DATABASE_STORAGE_KEY, databaseName)
+}
+
+const storedDatabase = localStorage.getItem(DATABASE_STORAGE_KEY)
+if (storedDatabase) {
+  api.defaults.headers.common['X-NetGraph-Database'] = storedDatabase
+}
+
 // Operacije Topologije
 export async function saveTopologyAPI(topology) {
   const response = await api.post('/topology/save', topology)
   return response.data
 }
 
+// Poslednje učitano stanje topologije sa servera (za delta sinhronizaciju)
+let topologyState = null
+
+function topologyFromState() {
+  return {
+    devices: Array.from(topologyState.devices.values()),
+    connections: Array.from(topologyState.connections.values())
+  }
+}
+
+// Prvo učitavanje (ili posle full_reload) preuzima celu topologiju, a sledeća
+// samo izmene od poznate revizije (/graph/changes) i primenjuju ih na stanje.
+// Vraća { topology, revision, changes } - changes je null pri punom učitavanju.
 export async function loadTopologyAPI() {
+  const database = api.defaults.headers.common['X-NetGraph-Database'] || null
+
+  if (topologyState && topologyState.database === database) {
+    const response = await api.get('/graph/changes', {
+      params: { since: topologyState.revision, epoch: topologyState.epoch }
+    })
+    const delta = response.data
+
+    if (!delta.full_reload) {
+      delta.removed_devices.forEach(key => topologyState.devices.delete(key))
+      delta.removed_connections.forEach(key => topologyState.connections.delete(key))
+      delta.devices.forEach(device => topologyState.devices.set(device._key, device))
+      delta.connections.forEach(conn => topologyState.connections.set(conn._key, conn))
+      topologyState.revision = delta.revision
+
+      return { topology: topologyFromState(), revision: delta.revision, changes: delta }
+    }
+  }
+
   const response = await api.get('/graph/topology')
-  return response.data
+  const { topology, revision, epoch } = response.data
+  topologyState = {
+    database,
+    revision,
+    epoch,
+    devices: new Map(topology.devices.map(device => [device._key, device])),
+    connections: new Map(topology.connections.map(conn => [conn._key, conn]))
+  }
+  return { topology: topologyFromState(), revision, changes: null }
 }
 
 // Operacije nad Uređajima
@@ -33,6 +87,12 @@ export async function deleteConnectionAPI(connectionKey) {
   return response.data
 }
 
+// Masovno brisanje (uređaji sa svojim konekcijama + pojedinačne konekcije, jedna transakcija)
+export async function bulkDeleteAPI(deviceKeys = [], connectionKeys = []) {
+  const response = await api.post('/topology/delete', { device_keys: deviceKeys, connection_keys: connectionKeys })
+  return response.data
+}
+
 // Izvoz Konfiguracije
 export async function exportConfigAPI(format = 'cisco', startDeviceKey = null) {
   const response = await api.post('/export/config', 
@@ -55,19 +115,23 @@ export async function createDatabaseAPI(name, description = '') {
 
 export async function connectDatabaseAPI(databaseName) {
   const response = await api.post('/databases/connect', null, { params: { database_name: databaseName } })
+  useDatabase(databaseName)
   return response.data
 }
 
+// Baza sačuvana na ovom klijentu, inače podrazumevana baza servera
 export async function getCurrentDatabaseAPI() {
   const response = await api.get('/databases/current')
   return response.data
 }
 
 // Operacije Evidencije Revizije
-export async function getAuditLogAPI(limit = 100, action = null, entity_type = null) {
+export async function getAuditLogAPI(limit = 100, action = null, entity_type = null, cursor = null) {
   const params = { limit }
   if (action) params.action = action
   if (entity_type) params.entity_type = entity_type
+  // Kursor iz prethodnog odgovora (next_cursor) vraća sledeću, stariju stranicu
+  if (cursor) params.cursor = cursor
   
   const response = await api.get('/audit-log', { params })
   return response.data